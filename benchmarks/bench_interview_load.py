@@ -0,0 +1,75 @@
+# bench_interview_load.py
+# ================================================================
+# 면접 분석 엔드포인트 부하 벤치마크
+# - 가짜 OpenAI 서버(고정 지연)를 띄우고 동시 요청 수를 늘려가며 처리량을 측정합니다.
+# - 이벤트 루프가 막히지 않는다면 처리량은 동시 요청 수에 비례해 증가해야 합니다.
+# - 실행: python -m benchmarks.bench_interview_load --latency 0.5 --levels 1,4,16,64
+# ================================================================
+
+import os
+import time
+import asyncio
+import argparse
+
+FAKE_PORT = 9100
+
+
+def build_payload(i: int) -> dict:
+    return {
+        "answerId": i,
+        "questionText": "가장 어려웠던 프로젝트 경험을 말씀해 주세요.",
+        # 답변마다 내용을 달리해 분석 캐시에 걸리지 않게 합니다.
+        "transcript": f"음 저는 팀 프로젝트 {i}에서 배포 자동화를 맡아 빌드 시간을 절반으로 줄였습니다.",
+        "resumeContent": "백엔드 개발자 지원. Spring Boot 기반 프로젝트 3건 수행.",
+        "meta": {"id": 1, "userId": 1, "jobApplied": "백엔드 개발자", "questionId": i},
+    }
+
+
+async def run_level(http, concurrency: int, rounds: int) -> float:
+    """concurrency 개의 요청을 rounds 번 보내고 초당 처리량을 반환합니다."""
+    total = concurrency * rounds
+    started = time.perf_counter()
+    for r in range(rounds):
+        responses = await asyncio.gather(*[
+            http.post("/interview/analysis/interview/run", json=build_payload(r * concurrency + i))
+            for i in range(concurrency)
+        ])
+        for resp in responses:
+            resp.raise_for_status()
+    elapsed = time.perf_counter() - started
+    return total / elapsed
+
+
+async def main(levels, rounds: int):
+    import httpx
+    from fastapi import FastAPI
+    from routers.interview_ai import interview_router
+
+    app = FastAPI()
+    app.include_router(interview_router, prefix="/interview")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as http:
+        print(f"{'concurrency':>12} | {'req/s':>8}")
+        print("-" * 24)
+        for level in levels:
+            throughput = await run_level(http, level, rounds)
+            print(f"{level:>12} | {throughput:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.5, help="가짜 서버 응답 지연(초)")
+    parser.add_argument("--levels", default="1,4,16,64", help="측정할 동시 요청 수 목록")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    from benchmarks.fake_openai_server import start_in_thread
+    start_in_thread(FAKE_PORT, latency=args.latency)
+
+    # 라우터 import 전에 가짜 서버 주소와 키를 주입해야 클라이언트가 이를 사용합니다.
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{FAKE_PORT}/v1"
+    os.environ.setdefault("INTERVIEW_OPENAI_KEY", "sk-fake")
+    os.environ.setdefault("INTERVIEW_FINEDTUNED_MODEL_ID", "ft:fake-model")
+
+    asyncio.run(main([int(x) for x in args.levels.split(",")], args.rounds))
@@ -0,0 +1,170 @@
+# bench_job_queue.py
+# ================================================================
+# 비동기 작업 큐(/jobs) 검증
+# - sync vs async : 이력서 피드백 동기 요청의 응답 시간과 작업 제출(202) 응답 시간 비교, 모든 작업 완료까지 시간
+# - voice+webhook : 녹음 파일 STT 작업 → 완료 시 callbackUrl(가짜 서버 /_webhooks)로 결과 POST, 스풀 파일 삭제
+# - queue full    : 대기 작업이 JOB_MAX_PENDING을 넘으면 503 + Retry-After
+# - restart       : 실행 중에 소비자를 멈추면(stop) 작업이 대기열로 돌아가고, 다시 시작하면 완료됨
+# - 실행: python -m benchmarks.bench_job_queue --jobs 30
+# ================================================================
+
+import io
+import os
+import time
+import wave
+import asyncio
+import argparse
+import tempfile
+from collections import Counter
+
+FAKE_PORT = 9104
+
+
+def resume_payload(i: int) -> dict:
+    # 내용을 달리해 single-flight로 합쳐지지 않게 합니다.
+    return {"userId": i, "resumeContent": f"백엔드 개발자 지원합니다. 프로젝트 {i}에서 결제 시스템을 개선했습니다."}
+
+
+def tiny_wav() -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\x00\x00" * 16000)
+    return buf.getvalue()
+
+
+async def wait_all(http, job_ids, timeout: float = 120.0) -> Counter:
+    deadline = time.monotonic() + timeout
+    pending = set(job_ids)
+    statuses = Counter()
+    while pending and time.monotonic() < deadline:
+        for job_id in list(pending):
+            job = (await http.get(f"/jobs/{job_id}")).json()
+            if job["status"] in ("succeeded", "failed"):
+                statuses[job["status"]] += 1
+                pending.discard(job_id)
+        await asyncio.sleep(0.1)
+    statuses["unfinished"] += len(pending)
+    return statuses
+
+
+def p50_max(values) -> str:
+    values = sorted(values)
+    return f"{values[len(values) // 2] * 1000:.0f}ms / {values[-1] * 1000:.0f}ms"
+
+
+async def main(jobs: int, spool_dir: str):
+    import httpx
+    import main_api
+    from routers.async_jobs import job_queue
+    from benchmarks.fake_openai_server import FAULT_COUNTS, WEBHOOKS
+
+    transport = httpx.ASGITransport(app=main_api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as http:
+        # queue full: 소비자를 띄우기 전에 한도를 작게 잡고 넘치게 제출
+        job_queue.max_pending = 5
+        codes = Counter()
+        retry_after = set()
+        queued_ids = []
+        for i in range(8):
+            resp = await http.post("/jobs/resume/feedback", json=resume_payload(1000 + i))
+            codes[resp.status_code] += 1
+            if resp.status_code == 202:
+                queued_ids.append(resp.json()["jobId"])
+            else:
+                retry_after.add(resp.headers.get("retry-after"))
+        print("[queue full (JOB_MAX_PENDING=5, 8건 제출)]")
+        print(f"  응답 코드       : {dict(codes)}, Retry-After={sorted(retry_after)}")
+        job_queue.max_pending = 500
+
+        await job_queue.start()
+        await wait_all(http, queued_ids)
+
+        # sync vs async
+        started = time.perf_counter()
+        sync_resp = await http.post("/resume/resume/feedback", json=resume_payload(0))
+        sync_sec = time.perf_counter() - started
+
+        before = FAULT_COUNTS["requests"]
+        submit_latencies, job_ids = [], []
+
+        async def submit(i: int):
+            t = time.perf_counter()
+            resp = await http.post("/jobs/resume/feedback", json=resume_payload(i))
+            submit_latencies.append(time.perf_counter() - t)
+            job_ids.append(resp.json()["jobId"])
+
+        started = time.perf_counter()
+        await asyncio.gather(*[submit(i + 1) for i in range(jobs)])
+        statuses = await wait_all(http, job_ids)
+        total_sec = time.perf_counter() - started
+        sample = (await http.get(f"/jobs/{job_ids[0]}")).json()
+        print(f"[sync vs async (이력서 피드백 {jobs}건, 소비자 {job_queue.workers}개)]")
+        print(f"  동기 요청 1건   : {sync_resp.status_code}, {sync_sec * 1000:.0f}ms")
+        print(f"  제출 p50 / max  : {p50_max(submit_latencies)}")
+        print(f"  전체 완료       : {dict(statuses)}, {total_sec:.1f}s, 업스트림 요청 {FAULT_COUNTS['requests'] - before}건")
+        print(f"  결과 키         : {sorted(sample['result'])}")
+
+        # voice + webhook
+        files = {"file": ("answer.wav", tiny_wav(), "audio/wav")}
+        data = {"meta": '{"interviewId": 7, "questionId": 1}',
+                "callbackUrl": f"http://127.0.0.1:{FAKE_PORT}/_webhooks"}
+        resp = await http.post("/jobs/voice/analyze", files=files, data=data)
+        job_id = resp.json()["jobId"]
+        await wait_all(http, [job_id])
+        for _ in range(50):
+            if any(w["body"]["jobId"] == job_id for w in WEBHOOKS):
+                break
+            await asyncio.sleep(0.1)
+        hook = next((w for w in WEBHOOKS if w["body"]["jobId"] == job_id), None)
+        print("[voice + webhook]")
+        print(f"  제출            : {resp.status_code}, Location={resp.headers.get('location')}")
+        print(f"  웹훅            : {'수신' if hook else '없음'}"
+              + (f", status={hook['body']['status']}, result={hook['body']['result']}" if hook else ""))
+        print(f"  남은 스풀 파일  : {len(os.listdir(spool_dir))}개")
+
+        # restart: 실행 중에 멈추면 대기열로 돌아가고 다시 시작하면 완료
+        restart_ids = [
+            (await http.post("/jobs/resume/feedback", json=resume_payload(2000 + i))).json()["jobId"]
+            for i in range(job_queue.workers)
+        ]
+        await asyncio.sleep(0.2)
+        await job_queue.stop()
+        stopped = (await http.get("/jobs/stats")).json()["by_status"]
+        await job_queue.start()
+        statuses = await wait_all(http, restart_ids)
+        print("[restart (실행 중 stop → start)]")
+        print(f"  stop 직후 상태  : {stopped}")
+        print(f"  재시작 후       : {dict(statuses)}")
+
+        stats = (await http.get("/jobs/stats")).json()
+        print(f"[stats] {stats}")
+        await job_queue.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=30, help="제출할 이력서 피드백 작업 수")
+    parser.add_argument("--workers", type=int, default=4, help="소비자 태스크 수 (JOB_WORKERS)")
+    parser.add_argument("--latency", type=float, default=0.3, help="가짜 서버 응답 지연(초)")
+    args = parser.parse_args()
+
+    from benchmarks.fake_openai_server import start_in_thread
+    start_in_thread(FAKE_PORT, latency=args.latency)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 라우터 import 전에 가짜 서버 주소, 키, 작업 큐 위치를 주입해야 합니다.
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{FAKE_PORT}/v1"
+        os.environ.setdefault("RESUME_OPENAI_KEY", "sk-fake")
+        os.environ.setdefault("QUESTION_VOICE_OPENAI_KEY", "sk-fake")
+        os.environ.setdefault("QUESTION_BANK_SQLITE_PATH", "")
+        os.environ.setdefault("SINGLEFLIGHT_SQLITE_PATH", "")
+        os.environ["JOB_QUEUE_SQLITE_PATH"] = os.path.join(tmp, "job_queue.sqlite3")
+        os.environ["JOB_SPOOL_DIR"] = os.path.join(tmp, "spool")
+        os.environ["JOB_WORKERS"] = str(args.workers)
+        # 웹훅은 루프백의 가짜 서버로 받으므로 허용 호스트로 지정합니다. (지정하지 않으면 내부 주소라 거절)
+        os.environ.setdefault("JOB_WEBHOOK_ALLOWED_HOSTS", "127.0.0.1")
+
+        asyncio.run(main(args.jobs, os.environ["JOB_SPOOL_DIR"]))
@@ -0,0 +1,89 @@
+# bench_question_load.py
+# ================================================================
+# 질문 생성 엔드포인트 부하 벤치마크 (동시 사용자 N명, closed loop)
+# - 각 사용자는 응답을 받자마자 다음 요청을 보냅니다. (자소서 포함 → 항상 LLM 경로)
+# - 동시에 sync 엔드포인트(스레드풀에서 실행)의 지연도 측정해 스레드풀이 고갈되지 않는지 확인합니다.
+# - 503(부하 차단)은 Retry-After만큼 쉬었다가 다시 시도합니다.
+# - 실행: python -m benchmarks.bench_question_load --users 200 --duration 15 --latency 0.5
+# ================================================================
+
+import os
+import time
+import asyncio
+import argparse
+from collections import Counter
+
+FAKE_PORT = 9101
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def user_loop(http, user_id: int, deadline: float, latencies, codes: Counter) -> None:
+    i = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        resp = await http.post("/question/api/questions", json={
+            "major": "컴퓨터공학",
+            "job_title": "백엔드 개발자",
+            "cover_letter": f"사용자 {user_id}의 {i}번째 자기소개서입니다.",
+        })
+        codes[resp.status_code] += 1
+        if resp.status_code == 200:
+            latencies.append(time.perf_counter() - started)
+        elif resp.status_code == 503:
+            await asyncio.sleep(float(resp.headers.get("Retry-After", 1)))
+        i += 1
+
+
+async def probe_loop(http, deadline: float, latencies) -> None:
+    """sync 엔드포인트 지연 (스레드풀이 막히면 여기서 드러납니다)"""
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await http.get("/question/api/questions/generation/stats")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.1)
+
+
+async def main(users: int, duration: float):
+    import httpx
+    import main_api
+
+    latencies, probe_latencies, codes = [], [], Counter()
+    transport = httpx.ASGITransport(app=main_api.app)
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300, limits=limits) as http:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(
+            probe_loop(http, deadline, probe_latencies),
+            *[user_loop(http, u, deadline, latencies, codes) for u in range(users)],
+        )
+
+    print(f"동시 사용자 {users}명, {duration:.0f}초")
+    print(f"  응답 코드      : {dict(codes)}")
+    print(f"  성공 처리량    : {len(latencies) / duration:.1f} req/s")
+    print(f"  성공 지연 p50/p95/p99 : "
+          f"{percentile(latencies, .5):.2f}s / {percentile(latencies, .95):.2f}s / {percentile(latencies, .99):.2f}s")
+    print(f"  sync 엔드포인트 p50/p99 : "
+          f"{percentile(probe_latencies, .5) * 1000:.1f}ms / {percentile(probe_latencies, .99) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.5, help="가짜 서버 응답 지연(초)")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=15)
+    args = parser.parse_args()
+
+    from benchmarks.fake_openai_server import start_in_thread
+    start_in_thread(FAKE_PORT, latency=args.latency)
+
+    # 라우터 import 전에 가짜 서버 주소와 키를 주입해야 클라이언트가 이를 사용합니다.
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{FAKE_PORT}/v1"
+    os.environ.setdefault("QUESTION_VOICE_OPENAI_KEY", "sk-fake")
+
+    asyncio.run(main(args.users, args.duration))
@@ -0,0 +1,132 @@
+# bench_rate_limit.py
+# ================================================================
+# 키×모델 토큰 버킷(core.rate_limit) 검증
+# - 429 storm : 가짜 서버가 초당 max_rps건만 받을 때, 제한 없이 보내면 429가 쏟아지고
+#               버킷(rpm)을 켜면 호출 전에 기다려 429 없이 모두 성공
+# - priority  : 버킷이 모자랄 때 나중에 온 대화형 요청이 먼저 와 있던 백그라운드 요청보다 먼저 들어감
+# - workers   : 같은 SQLite 파일을 쓰는 RateLimiter 두 개(워커 두 개 흉내)가 한도 하나를 나눠 씀
+# - 실행: python -m benchmarks.bench_rate_limit --requests 30 --rps 4
+# ================================================================
+
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+from collections import Counter
+
+FAKE_PORT = 9106
+
+
+def build_payload(i: int) -> dict:
+    return {
+        "answerId": i,
+        "questionText": "가장 어려웠던 프로젝트 경험을 말씀해 주세요.",
+        "transcript": f"저는 팀 프로젝트 {i}에서 배포 자동화를 맡아 빌드 시간을 절반으로 줄였습니다.",
+        "resumeContent": "백엔드 개발자 지원. Spring Boot 기반 프로젝트 3건 수행.",
+        "meta": {"id": 1, "userId": 1, "jobApplied": "백엔드 개발자", "questionId": i},
+    }
+
+
+async def storm(http, start: int, count: int):
+    from benchmarks.fake_openai_server import FAULT_COUNTS
+    before = dict(FAULT_COUNTS)
+    started = time.perf_counter()
+    responses = await asyncio.gather(*[
+        http.post("/interview/analysis/interview/run", json=build_payload(start + i)) for i in range(count)
+    ])
+    elapsed = time.perf_counter() - started
+    codes = Counter(r.status_code for r in responses)
+    return codes, FAULT_COUNTS["requests"] - before["requests"], FAULT_COUNTS["rate_limited"] - before["rate_limited"], elapsed
+
+
+async def run_priority(rps: float):
+    from core.rate_limit import BACKGROUND, INTERACTIVE, Limit, RateLimiter
+
+    limiter = RateLimiter(sqlite_path=None, limits={"*:*": Limit(rpm=rps * 60, burst_sec=1)})
+    order, waits = [], {INTERACTIVE: [], BACKGROUND: []}
+
+    async def one(tag: str, priority: int):
+        waited = await limiter.acquire("BENCH_KEY", "gpt-4o-mini", priority=priority)
+        order.append(tag)
+        waits[priority].append(waited)
+
+    background = [asyncio.create_task(one(f"B{i}", BACKGROUND)) for i in range(12)]
+    await asyncio.sleep(0.05)  # 백그라운드가 먼저 줄을 선 뒤 대화형이 도착
+    interactive = [asyncio.create_task(one(f"I{i}", INTERACTIVE)) for i in range(6)]
+    await asyncio.gather(*background, *interactive)
+
+    print(f"[priority (rpm={rps * 60:.0f}, 백그라운드 12건이 먼저 대기 → 대화형 6건 도착)]")
+    print(f"  통과 순서       : {' '.join(order)}")
+    for priority, name in ((INTERACTIVE, "interactive"), (BACKGROUND, "background")):
+        w = waits[priority]
+        print(f"  {name:<15} : 평균 대기 {sum(w) / len(w):.2f}s, 최대 {max(w):.2f}s")
+
+
+async def run_workers(rps: float, per_worker: int):
+    from core.rate_limit import Limit, RateLimiter
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rate_limit.sqlite3")
+        limits = {"*:*": Limit(rpm=rps * 60, burst_sec=1)}
+        workers = [RateLimiter(sqlite_path=path, limits=limits) for _ in range(2)]
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            w.acquire("BENCH_KEY", "gpt-4o-mini") for w in workers for _ in range(per_worker)
+        ])
+        elapsed = time.perf_counter() - started
+    total = per_worker * len(workers)
+    print(f"[workers (SQLite 공유, 워커 2개 × {per_worker}건, rpm={rps * 60:.0f})]")
+    print(f"  전체 통과 시간  : {elapsed:.2f}s (기대값 ≈ {(total - rps) / rps:.2f}s, 워커별 버킷이면 절반)")
+
+
+async def main(requests: int, rps: float):
+    import httpx
+    import main_api
+    from core.rate_limit import Limit, limiter
+    from benchmarks.fake_openai_server import configure_faults
+
+    configure_faults(max_rps=rps)
+    transport = httpx.ASGITransport(app=main_api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as http:
+        limiter.limits = {}
+        codes, upstream, limited, elapsed = await storm(http, 0, requests)
+        print(f"[429 storm: 제한 없음 (가짜 서버 초당 {rps:.0f}건, 동시 {requests}건)]")
+        print(f"  응답 코드       : {dict(codes)}, {elapsed:.1f}s")
+        print(f"  업스트림 요청 수: {upstream} (그중 429 {limited}건)")
+
+        # 가짜 서버는 1초 창으로 세므로 (순간 허용량 + 1초 동안 채워지는 양)이 초당 한도를 넘지 않게 잡습니다.
+        await asyncio.sleep(1.5)
+        limiter.limits = {"*:*": Limit(rpm=rps * 60 * 0.75, burst_sec=0.25)}
+        codes, upstream, limited, elapsed = await storm(http, 1000, requests)
+        print(f"[429 storm: 버킷 rpm={rps * 60 * 0.75:.0f}, burst 0.25s]")
+        print(f"  응답 코드       : {dict(codes)}, {elapsed:.1f}s")
+        print(f"  업스트림 요청 수: {upstream} (그중 429 {limited}건)")
+        print(f"  버킷 통계       : {limiter.stats()['buckets']}")
+    configure_faults(max_rps=0)
+
+    await run_priority(rps)
+    await run_workers(rps, per_worker=8)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=30, help="동시 요청 수")
+    parser.add_argument("--rps", type=float, default=4, help="가짜 서버가 초당 받는 요청 수")
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 서버 응답 지연(초)")
+    args = parser.parse_args()
+
+    from benchmarks.fake_openai_server import start_in_thread
+    start_in_thread(FAKE_PORT, latency=args.latency)
+
+    # 라우터 import 전에 가짜 서버 주소와 키를 주입해야 합니다. (캐시/합치기/워커 공유는 끔)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{FAKE_PORT}/v1"
+    os.environ.setdefault("INTERVIEW_OPENAI_KEY", "sk-fake")
+    os.environ.setdefault("INTERVIEW_FINEDTUNED_MODEL_ID", "ft:fake-model")
+    os.environ.setdefault("QUESTION_BANK_SQLITE_PATH", "")
+    os.environ.setdefault("SINGLEFLIGHT_SQLITE_PATH", "")
+    os.environ.setdefault("RATE_LIMIT_SQLITE_PATH", "")
+    # 대화형 최대 대기 시간: 동시 요청이 모두 버킷을 통과할 수 있을 만큼
+    os.environ.setdefault("RATE_LIMIT_MAX_WAIT_SEC", str(args.requests / args.rps + 5))
+
+    asyncio.run(main(args.requests, args.rps))
@@ -0,0 +1,95 @@
+# bench_resume_incremental.py
+# ================================================================
+# 수정 후 재검토(항목 단위 재사용, routers.resume_edit.run_incremental_pipeline) 검증
+# - 같은 사용자가 이력서를 제출 → 항목 하나만 고쳐 다시 제출 → 그대로 다시 제출
+# - 전체 분석(RESUME_HISTORY 끔)과 업스트림 요청 수 / 입력 토큰 / 지연을 비교합니다.
+# - 실행: python -m benchmarks.bench_resume_incremental --items 8
+# ================================================================
+
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+FAKE_PORT = 9107
+
+
+def build_resume(items: int, edited: int = -1) -> str:
+    parts = ["[기본 정보] 홍길동, 컴퓨터공학과 4학년, 백엔드 개발자 지원."]
+    for i in range(items):
+        detail = "결제 모듈을 맡아 응답 시간을 30% 줄였습니다." if i != edited else "결제 모듈을 맡아 캐시를 도입해 응답 시간을 120ms에서 80ms로 줄였습니다."
+        parts.append(
+            f"[프로젝트 {i + 1}] 팀원 4명과 함께 {i + 1}번째 서비스를 개발했습니다. Spring Boot와 MySQL로 API 서버를 구축했습니다. "
+            f"{detail} 배포 파이프라인을 GitHub Actions로 자동화해 배포 시간을 절반으로 줄였습니다. "
+            f"장애 대응 문서를 작성하고 주간 회고를 주도했습니다. 이 경험으로 협업과 책임감을 배웠습니다."
+        )
+    return " ".join(parts)
+
+
+def input_tokens() -> tuple:
+    """(입력 토큰, 그중 prompt caching으로 재사용된 토큰)"""
+    from core.token_metrics import usage_stats
+    stats = usage_stats().values()
+    return sum(b["input_tokens"] for b in stats), sum(b["cached_input_tokens"] for b in stats)
+
+
+async def submit(http, user_id: int, resume: str, label: str):
+    from benchmarks.fake_openai_server import FAULT_COUNTS
+    requests_before, tokens_before = FAULT_COUNTS["requests"], input_tokens()
+    started = time.perf_counter()
+    resp = await http.post("/resume/resume/feedback", json={"userId": user_id, "resumeContent": resume})
+    elapsed = time.perf_counter() - started
+    tokens, cached = (after - before for after, before in zip(input_tokens(), tokens_before))
+    print(f"  {label:<14}: {resp.status_code}, 업스트림 {FAULT_COUNTS['requests'] - requests_before:>3}건, "
+          f"입력 토큰 {tokens:>6} (캐시 {cached:>6}), {elapsed * 1000:6.0f}ms, "
+          f"Server-Timing={resp.headers.get('server-timing', '')[:48]}")
+    return resp.json()
+
+
+async def main(items: int):
+    import httpx
+    import main_api
+    from routers.resume_edit import resume_history
+
+    transport = httpx.ASGITransport(app=main_api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as http:
+        original, revised = build_resume(items), build_resume(items, edited=items // 2)
+
+        print(f"[전체 분석 (기록 끔, 항목 {items + 1}개 이력서)]")
+        sqlite_path, resume_history.sqlite_path = resume_history.sqlite_path, None
+        await submit(http, 1, original, "첫 제출")
+        await submit(http, 1, revised, "한 항목 수정")
+        resume_history.sqlite_path = sqlite_path
+
+        print("[항목 단위 재사용 (기록 켬)]")
+        first = await submit(http, 2, original, "첫 제출")
+        second = await submit(http, 2, revised, "한 항목 수정")
+        await submit(http, 2, revised, "그대로 재제출")
+        await submit(http, 3, revised, "다른 사용자")
+
+        print(f"  피드백 길이     : 첫 제출 {len(first['feedback'])}자, 수정 후 {len(second['feedback'])}자")
+        print(f"[stats] {resume_history.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=8, help="이력서 프로젝트 항목 수")
+    parser.add_argument("--latency", type=float, default=0.3, help="가짜 서버 응답 지연(초)")
+    args = parser.parse_args()
+
+    from benchmarks.fake_openai_server import start_in_thread
+    start_in_thread(FAKE_PORT, latency=args.latency)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 라우터 import 전에 가짜 서버 주소, 키, 기록 위치를 주입해야 합니다. (질문 은행/워커 공유는 끔)
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{FAKE_PORT}/v1"
+        os.environ.setdefault("RESUME_OPENAI_KEY", "sk-fake")
+        os.environ.setdefault("QUESTION_BANK_SQLITE_PATH", "")
+        os.environ.setdefault("SINGLEFLIGHT_SQLITE_PATH", "")
+        os.environ.setdefault("RATE_LIMIT_SQLITE_PATH", "")
+        # 첫 제출은 항목별 호출이 한꺼번에 나가므로 기본 TPM 버킷에서 기다리지 않게 한도를 넉넉히 잡습니다.
+        os.environ.setdefault("OPENAI_RATE_LIMITS", '{"*:*": {"rpm": 5000, "tpm": 2000000}}')
+        os.environ["RESUME_HISTORY_SQLITE_PATH"] = os.path.join(tmp, "resume_history.sqlite3")
+
+        asyncio.run(main(args.items))
@@ -0,0 +1,114 @@
+# bench_singleflight.py
+# ================================================================
+# 진행 중인 같은 요청 합치기(core.singleflight) 검증
+# - local  : 같은 답변 분석 요청 N건을 동시에 보냄 → 업스트림 호출 1건, 나머지는 coalesced_local
+# - distinct: 서로 다른 답변 N건 → 합치지 않고 N건 모두 호출
+# - resume : 같은 이력서 피드백 N건 동시 → 파이프라인 1회(업스트림 3건)
+# - remote : 같은 SQLite 파일을 쓰는 SingleFlight 두 개(워커 두 개 흉내) → 한쪽만 실행
+# - 실행: python -m benchmarks.bench_singleflight --duplicates 20
+# ================================================================
+
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+from collections import Counter
+
+FAKE_PORT = 9103
+
+
+def build_payload(i: int) -> dict:
+    return {
+        "answerId": i,
+        "questionText": "가장 어려웠던 프로젝트 경험을 말씀해 주세요.",
+        "transcript": f"저는 팀 프로젝트 {i}에서 배포 자동화를 맡아 빌드 시간을 절반으로 줄였습니다.",
+        "resumeContent": "백엔드 개발자 지원. Spring Boot 기반 프로젝트 3건 수행.",
+        "meta": {"id": 1, "userId": 1, "jobApplied": "백엔드 개발자", "questionId": i},
+    }
+
+
+async def burst(http, path: str, payloads) -> Counter:
+    responses = await asyncio.gather(*[http.post(path, json=p) for p in payloads])
+    return Counter(r.status_code for r in responses)
+
+
+def report(title: str, codes: Counter, upstream: int, flight: dict) -> None:
+    print(f"[{title}]")
+    print(f"  응답 코드       : {dict(codes)}")
+    print(f"  업스트림 요청 수: {upstream}")
+    print(f"  합치기          : executed={flight['executed']}, coalesced_local={flight['coalesced_local']}, "
+          f"coalesced_remote={flight['coalesced_remote']}, ratio={flight['coalesced_ratio']}")
+
+
+async def run_remote(sqlite_path: str, duplicates: int) -> None:
+    from core.singleflight import SingleFlight
+
+    worker_a = SingleFlight("bench_worker_a", sqlite_path=sqlite_path, poll_interval_sec=0.01)
+    worker_b = SingleFlight("bench_worker_b", sqlite_path=sqlite_path, poll_interval_sec=0.01)
+    calls = Counter()
+
+    async def slow_llm(worker: str):
+        calls[worker] += 1
+        await asyncio.sleep(0.3)
+        return {"answer": 42}
+
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        (worker_a if i % 2 == 0 else worker_b).do("same-key", lambda w=("a" if i % 2 == 0 else "b"): slow_llm(w))
+        for i in range(duplicates)
+    ])
+    print("[remote (SQLite 공유, 워커 2개)]")
+    print(f"  실제 실행 수    : {dict(calls)} ({(time.perf_counter() - started) * 1000:.0f}ms)")
+    for flight in (worker_a, worker_b):
+        s = flight.stats()
+        print(f"  {s['name']:<15} : executed={s['executed']}, local={s['coalesced_local']}, remote={s['coalesced_remote']}")
+
+
+async def main(duplicates: int):
+    import httpx
+    import main_api
+    from benchmarks.fake_openai_server import FAULT_COUNTS
+    from core.singleflight import singleflight_stats
+
+    transport = httpx.ASGITransport(app=main_api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as http:
+        before = FAULT_COUNTS["requests"]
+        codes = await burst(http, "/interview/analysis/interview/run", [build_payload(1)] * duplicates)
+        report("local (같은 답변 동시 요청)", codes, FAULT_COUNTS["requests"] - before,
+               singleflight_stats()["interview_analysis"])
+
+        before = FAULT_COUNTS["requests"]
+        codes = await burst(http, "/interview/analysis/interview/run",
+                            [build_payload(100 + i) for i in range(duplicates)])
+        report("distinct (서로 다른 답변)", codes, FAULT_COUNTS["requests"] - before,
+               singleflight_stats()["interview_analysis"])
+
+        before = FAULT_COUNTS["requests"]
+        resume = {"userId": 1, "resumeContent": "백엔드 개발자 지원합니다. 결제 시스템 개선 경험이 있습니다."}
+        codes = await burst(http, "/resume/resume/feedback", [resume] * duplicates)
+        report("resume (같은 이력서 동시 요청)", codes, FAULT_COUNTS["requests"] - before,
+               singleflight_stats()["resume_feedback"])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        await run_remote(os.path.join(tmp, "singleflight.sqlite3"), duplicates)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duplicates", type=int, default=20, help="시나리오별 동시 요청 수")
+    parser.add_argument("--latency", type=float, default=0.3, help="가짜 서버 응답 지연(초)")
+    args = parser.parse_args()
+
+    from benchmarks.fake_openai_server import start_in_thread
+    start_in_thread(FAKE_PORT, latency=args.latency)
+
+    # 라우터 import 전에 가짜 서버 주소와 키를 주입해야 합니다. (분석 캐시/워커 간 합치기는 끔)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{FAKE_PORT}/v1"
+    os.environ.setdefault("INTERVIEW_OPENAI_KEY", "sk-fake")
+    os.environ.setdefault("INTERVIEW_FINEDTUNED_MODEL_ID", "ft:fake-model")
+    os.environ.setdefault("RESUME_OPENAI_KEY", "sk-fake")
+    os.environ.setdefault("QUESTION_BANK_SQLITE_PATH", "")
+    os.environ.setdefault("SINGLEFLIGHT_SQLITE_PATH", "")
+
+    asyncio.run(main(args.duplicates))
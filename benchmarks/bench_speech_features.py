@@ -0,0 +1,155 @@
+# bench_speech_features.py
+# ================================================================
+# 전사문 발화 지표(core.speech_features) 검증
+# - matcher : 간투사 찾기. 순수 파이썬 Aho-Corasick 오토마톤(참고용) vs 현재 방식(긴 말 우선 정규식 하나)
+#             두 방식의 결과가 같은지 확인하고 전사문 한 건당 시간을 비교합니다.
+# - analysis: /interview/analysis/interview/run 응답의 fillerCount/timeMs가 모델 값이 아니라 로컬 계산값인지,
+#             프롬프트에 발화 지표 힌트가 들어가는지 확인합니다. (가짜 서버 모델은 항상 fillerCount=2)
+# - 실행: python -m benchmarks.bench_speech_features --words 400 --repeat 200
+# ================================================================
+
+import os
+import time
+import random
+import asyncio
+import argparse
+from collections import deque
+from typing import Dict, List, Tuple
+
+FAKE_PORT = 9108
+
+WORDS = [
+    "저는", "프로젝트에서", "배포를", "맡았습니다.", "어", "음", "어어", "그", "그,", "약간", "약간의", "서버를",
+    "만들었고", "막", "팀원과", "협업했습니다.", "이제", "결과적으로", "응답", "시간을", "줄였습니다.", "그 뭐냐",
+    "어떤", "음악", "뭐랄까", "저는", "API를", "30%", "개선했습니다",
+]
+
+
+class AhoCorasickMatcher:
+    """참고용: 같은 규칙(어절 경계, 늘인 글자, 긴 말 우선)을 순수 파이썬 Aho-Corasick으로 구현"""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.out[state].append(index)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fail = self.fail[state]
+                while fail and ch not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[nxt] = self.goto[fail].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        found, state, n = [], 0, len(text)
+        for i, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for index in self.out[state]:
+                start = i + 1 - len(self.patterns[index])
+                if start > 0 and (text[start - 1].isalnum() or text[start - 1] == "_"):
+                    continue
+                end = i + 1
+                while end < n and text[end] == ch:
+                    end += 1
+                if end < n and (text[end].isalnum() or text[end] == "_"):
+                    continue
+                found.append((start, end, index))
+        found.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        chosen, last_end = [], -1
+        for start, end, index in found:
+            if start >= last_end:
+                chosen.append((start, end, index))
+                last_end = end
+        return chosen
+
+
+def build_transcript(words: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def bench(fn, text: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def run_matcher(words: int, repeat: int) -> None:
+    from core.speech_features import _matcher, extract_speech_features
+
+    reference = AhoCorasickMatcher(_matcher.patterns)
+    for seed in range(50):
+        text = build_transcript(words, seed)
+        expected = [(s, e, i) for s, e, i in reference.find(text)]
+        actual = [(m.start(), m.end(), m.lastindex - 1) for m in _matcher._regex.finditer(text)]
+        assert expected == actual, f"결과가 서로 다릅니다. (seed={seed})"
+
+    text = build_transcript(words, 0)
+    ac_us = bench(reference.find, text, repeat)
+    print(f"[matcher (어절 {words}개 전사문, {repeat}회 평균, 50개 입력에서 결과 일치)]")
+    print(f"  Aho-Corasick (순수 파이썬) : {ac_us:8.1f} µs")
+    regex_us = bench(_matcher.find, text, repeat)
+    print(f"  정규식 (현재)              : {regex_us:8.1f} µs  ({ac_us / regex_us:.2f}x)")
+    print(f"  전체 지표 계산             : {bench(lambda t: extract_speech_features(t, 120000), text, repeat):8.1f} µs")
+
+
+async def run_analysis() -> None:
+    import httpx
+    import main_api
+    from routers.interview_ai import AnswerDispatch, build_analysis_messages
+
+    payload = {
+        "answerId": 1,
+        "questionText": "가장 어려웠던 프로젝트 경험을 말씀해 주세요.",
+        "transcript": "어 저는 음 그 프로젝트에서 약간 어어 배포를 맡았습니다. 그, 그러니까 막 서버를 저는 저는 만들었고 음 응답 시간을 30% 줄였습니다.",
+        "resumeContent": "백엔드 개발자 지원. Spring Boot 기반 프로젝트 3건 수행.",
+        "meta": {"id": 1, "userId": 1, "jobApplied": "백엔드 개발자", "questionId": 1},
+        "audioDurationMs": 14500,
+    }
+    transport = httpx.ASGITransport(app=main_api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as http:
+        resp = await http.post("/interview/analysis/interview/run", json=payload)
+    body = resp.json()
+    hint = next(line for line in build_analysis_messages(AnswerDispatch.model_validate(payload))[1]["content"].splitlines()
+                if line.startswith("발화 지표"))
+    print("[analysis (가짜 모델 출력 fillerCount=2, timeMs=0)]")
+    print(f"  응답            : {resp.status_code}, fillerCount={body.get('fillerCount')}, timeMs={body.get('timeMs')}")
+    print(f"  프롬프트 힌트   : {hint}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--words", type=int, default=400, help="전사문 어절 수")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    run_matcher(args.words, args.repeat)
+
+    from benchmarks.fake_openai_server import start_in_thread
+    start_in_thread(FAKE_PORT, latency=0.05)
+
+    # 라우터 import 전에 가짜 서버 주소와 키를 주입해야 합니다. (캐시/합치기/워커 공유는 끔)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{FAKE_PORT}/v1"
+    os.environ.setdefault("INTERVIEW_OPENAI_KEY", "sk-fake")
+    os.environ.setdefault("INTERVIEW_FINEDTUNED_MODEL_ID", "ft:fake-model")
+    os.environ.setdefault("QUESTION_BANK_SQLITE_PATH", "")
+    os.environ.setdefault("SINGLEFLIGHT_SQLITE_PATH", "")
+    os.environ.setdefault("RATE_LIMIT_SQLITE_PATH", "")
+    asyncio.run(run_analysis())
@@ -0,0 +1,79 @@
+# bench_text_normalize.py
+# ================================================================
+# 입력 텍스트 정규화 마이크로 벤치마크
+# - 기존 방식: replace 연쇄 + split/join (호출마다 전체 문자열을 다시 훑고 복사)
+# - 현재 방식: core.text_normalize.normalize_text (들어 있는 문자만 replace + split/join 1회)
+# - 참고용: str.translate(dict) + 정규식 1회 방식 (CPython에서는 오히려 느림)
+# - 실행: python -m benchmarks.bench_text_normalize --size-kb 50 --repeat 200
+# ================================================================
+
+import re
+import time
+import random
+import argparse
+
+from core.text_normalize import normalize_text
+
+
+def legacy_clean(value: str) -> str:
+    """이전 ResumeInput.clean_resume_content (작은따옴표 치환은 의도대로 고친 형태)"""
+    value = value.replace('“', '"').replace('”', '"')
+    value = value.replace('‘', "'").replace('’', "'")
+    value = value.replace('\u200b', ' ')
+    value = value.replace('\xa0', ' ')
+    value = value.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
+    return ' '.join(value.split())
+
+
+_TRANSLATION = str.maketrans({
+    '“': '"', '”': '"', '„': '"', '‟': '"', '‘': "'", '’': "'", '‚': "'", '‛': "'",
+    '\u200b': ' ', '\u200c': None, '\u200d': None, '\u2060': None, '\ufeff': None,
+})
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def translate_regex_clean(value: str) -> str:
+    return _WHITESPACE_RE.sub(" ", value.translate(_TRANSLATION)).strip()
+
+
+def build_input(size_kb: int, seed: int = 0) -> str:
+    """이력서처럼 한글 문장 + 따옴표/NBSP/제로폭 공백/개행이 섞인 텍스트"""
+    rng = random.Random(seed)
+    pieces = [
+        "저는 백엔드 개발자로서 ", "“대용량 트래픽”을 처리한 경험이 있습니다. ", "‘주도적으로’ 문제를 해결했고",
+        "\xa0", "\u200b", "\n", "\r\n", "\t", "  ", "API 응답 시간을 40% 단축했습니다. ",
+    ]
+    out, size = [], 0
+    while size < size_kb * 1024:
+        piece = rng.choice(pieces)
+        out.append(piece)
+        size += len(piece.encode("utf-8"))
+    return "".join(out)
+
+
+def bench(fn, text: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-kb", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"입력 {args.size_kb}KB, {args.repeat}회 평균 (배수는 기존 방식 대비 속도)")
+    for label, text in [
+        ("특수문자 포함", build_input(args.size_kb)),
+        ("일반 한글 텍스트", build_input(args.size_kb).translate(_TRANSLATION).replace("\xa0", " ")),
+        ("ASCII 텍스트", ("Designed REST APIs and cut latency by 40%.\n" * 2000)[:args.size_kb * 1024]),
+    ]:
+        assert legacy_clean(text) == normalize_text(text) == translate_regex_clean(text), "결과가 서로 다릅니다."
+        legacy_us = bench(legacy_clean, text, args.repeat)
+        print(f"[{label}]")
+        print(f"  replace 연쇄 (기존)       : {legacy_us:8.1f} µs")
+        for name, fn in [("normalize_text (현재)", normalize_text), ("translate + regex", translate_regex_clean)]:
+            elapsed = bench(fn, text, args.repeat)
+            print(f"  {name:<24}: {elapsed:8.1f} µs  ({legacy_us / elapsed:.2f}x)")
@@ -0,0 +1,116 @@
+# bench_upstream_faults.py
+# ================================================================
+# 업스트림 장애 시나리오 검증 (가짜 OpenAI 서버 장애 주입 + core.upstream)
+# - flaky      : 요청의 30%가 500/503 → 재시도로 대부분 성공해야 함
+# - rate_limit : 요청의 50%가 429 + Retry-After → Retry-After 이상 기다렸다 재시도
+# - outage     : 모든 요청이 503 → 브레이커가 열린 뒤에는 업스트림 호출 없이 즉시 503
+# - recovery   : 장애 해제 후 open 시간이 지나면 시험 호출 한 건으로 브레이커가 닫힘
+# - resume     : 피드백 단계가 실패하면 두 재생성 단계는 호출하지 않고 건너뜀(skipped)
+# - 실행: python -m benchmarks.bench_upstream_faults --requests 40
+# ================================================================
+
+import os
+import time
+import asyncio
+import argparse
+from collections import Counter
+
+FAKE_PORT = 9102
+BREAKER_OPEN_SEC = 2
+
+
+def build_payload(i: int) -> dict:
+    return {
+        "answerId": i,
+        "questionText": "가장 어려웠던 프로젝트 경험을 말씀해 주세요.",
+        # 답변마다 내용을 달리해 분석 캐시에 걸리지 않게 합니다.
+        "transcript": f"저는 팀 프로젝트 {i}에서 배포 자동화를 맡아 빌드 시간을 절반으로 줄였습니다.",
+        "resumeContent": "백엔드 개발자 지원. Spring Boot 기반 프로젝트 3건 수행.",
+        "meta": {"id": 1, "userId": 1, "jobApplied": "백엔드 개발자", "questionId": i},
+    }
+
+
+async def run_analyses(http, start: int, count: int, concurrency: int = 8):
+    codes, latencies = Counter(), []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            resp = await http.post("/interview/analysis/interview/run", json=build_payload(i))
+            latencies.append(time.perf_counter() - started)
+            codes[resp.status_code] += 1
+
+    await asyncio.gather(*[one(start + i) for i in range(count)])
+    return codes, sorted(latencies)
+
+
+def report(title: str, codes: Counter, latencies, upstream_before: int, upstream_after: int) -> None:
+    from core.upstream import upstream_stats
+    breaker = upstream_stats()["breakers"].get("INTERVIEW_OPENAI_KEY", {})
+    median = latencies[len(latencies) // 2] if latencies else 0.0
+    print(f"[{title}]")
+    print(f"  응답 코드       : {dict(codes)}")
+    print(f"  지연 p50 / max  : {median * 1000:.0f}ms / {(latencies[-1] if latencies else 0) * 1000:.0f}ms")
+    print(f"  업스트림 요청 수: {upstream_after - upstream_before}")
+    print(f"  브레이커        : state={breaker.get('state')}, opened={breaker.get('opened')}, rejected={breaker.get('rejected')}")
+
+
+async def main(requests: int):
+    import httpx
+    import main_api
+    from benchmarks.fake_openai_server import FAULT_COUNTS, configure_faults
+
+    transport = httpx.ASGITransport(app=main_api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as http:
+        n = 0
+        scenarios = [
+            ("flaky (30% 500/503)", dict(rate=0.3, statuses=[500, 503], retry_after=None)),
+            ("rate_limit (50% 429, Retry-After 0.3s)", dict(rate=0.5, statuses=[429], retry_after=0.3)),
+            ("outage (100% 503)", dict(rate=1.0, statuses=[503], retry_after=None)),
+        ]
+        for title, faults in scenarios:
+            configure_faults(**faults)
+            before = FAULT_COUNTS["requests"]
+            codes, latencies = await run_analyses(http, n, requests)
+            n += requests
+            report(title, codes, latencies, before, FAULT_COUNTS["requests"])
+
+        # 장애 해제 → open 시간이 지나면 시험 호출 한 건 후 닫혀야 합니다.
+        configure_faults(rate=0.0)
+        await asyncio.sleep(BREAKER_OPEN_SEC + 0.5)
+        # (half-open에서는 시험 호출 한 건만 보내고 나머지는 503이므로, 한 건을 먼저 보낸 뒤 나머지를 보냅니다)
+        before = FAULT_COUNTS["requests"]
+        probe_codes, _ = await run_analyses(http, n, 1)
+        codes, latencies = await run_analyses(http, n + 1, requests - 1)
+        n += requests
+        report("recovery (시험 호출 1건 후)", probe_codes + codes, latencies, before, FAULT_COUNTS["requests"])
+
+        # 이력서 파이프라인: 피드백이 실패하면 재생성 단계는 호출되지 않아야 합니다.
+        configure_faults(rate=1.0, statuses=[500])
+        before = FAULT_COUNTS["requests"]
+        resp = await http.post("/resume/resume/feedback", json={"userId": 1, "resumeContent": "백엔드 개발자 지원합니다."})
+        print("[resume pipeline (피드백 단계 500)]")
+        print(f"  응답 코드       : {resp.status_code}, Server-Timing: {resp.headers.get('server-timing')}")
+        print(f"  업스트림 요청 수: {FAULT_COUNTS['requests'] - before} (피드백 재시도만, 재생성 호출 없음)")
+        configure_faults(rate=0.0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=40, help="시나리오별 요청 수")
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 서버 응답 지연(초)")
+    args = parser.parse_args()
+
+    from benchmarks.fake_openai_server import start_in_thread
+    start_in_thread(FAKE_PORT, latency=args.latency)
+
+    # 라우터 import 전에 가짜 서버 주소, 키, 브레이커 설정을 주입해야 합니다.
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{FAKE_PORT}/v1"
+    os.environ.setdefault("INTERVIEW_OPENAI_KEY", "sk-fake")
+    os.environ.setdefault("INTERVIEW_FINEDTUNED_MODEL_ID", "ft:fake-model")
+    os.environ.setdefault("RESUME_OPENAI_KEY", "sk-fake")
+    os.environ.setdefault("QUESTION_BANK_SQLITE_PATH", "")
+    os.environ.setdefault("UPSTREAM_BREAKER_OPEN_SEC", str(BREAKER_OPEN_SEC))
+
+    asyncio.run(main(args.requests))
@@ -0,0 +1,127 @@
+# bench_voice_interview_fused.py
+# ================================================================
+# 음성 답변 한 건 처리: 두 번 호출 vs 한 번 호출(/interview/analysis/interview/audio) 비교
+# - two-hop: POST /voice/analyze → 받은 answerText로 POST /interview/analysis/interview/run (백엔드가 하던 방식)
+# - fused  : POST /interview/analysis/interview/audio (같은 프로세스에서 STT → 분석)
+# - 실제 TCP를 거치도록 main_api를 uvicorn으로 띄우고, 클라이언트가 보낸 바이트 수와 지연(p50/p95)을 잽니다.
+# - 실행: python -m benchmarks.bench_voice_interview_fused --answers 30
+# ================================================================
+
+import io
+import os
+import json
+import time
+import wave
+import asyncio
+import argparse
+import threading
+
+FAKE_PORT = 9109
+APP_PORT = 9110
+
+
+def make_wav(seconds: float) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\x00\x00" * int(16000 * seconds))
+    return buf.getvalue()
+
+
+def dispatch_fields(i: int, resume: str) -> dict:
+    return {
+        "answerId": i,
+        "questionText": f"가장 어려웠던 프로젝트 경험 {i}번을 말씀해 주세요.",
+        "resumeContent": resume,
+        "meta": {"id": 1, "userId": 1, "jobApplied": "백엔드 개발자", "questionId": i},
+    }
+
+
+def percentile(values, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+async def two_hop(http, i: int, audio: bytes, resume: str) -> int:
+    meta = json.dumps({"interviewId": 1, "questionId": i})
+    stt = await http.post("/voice/analyze", data={"meta": meta}, files={"file": ("a.wav", audio, "audio/wav")})
+    body = {**dispatch_fields(i, resume), "transcript": stt.json()["answerText"]}
+    resp = await http.post("/interview/analysis/interview/run", json=body)
+    return resp.status_code
+
+
+async def fused(http, i: int, audio: bytes, resume: str) -> int:
+    data = {"dispatch": json.dumps(dispatch_fields(i, resume), ensure_ascii=False)}
+    resp = await http.post("/interview/analysis/interview/audio", data=data, files={"file": ("a.wav", audio, "audio/wav")})
+    return resp.status_code
+
+
+async def main(answers: int, audio_sec: float, resume_kb: int):
+    import httpx
+
+    audio = make_wav(audio_sec)
+    resume = ("백엔드 개발자 지원. Spring Boot 기반 결제 시스템을 개선해 응답 시간을 40% 줄였습니다. " * 200)[:resume_kb * 1024 // 3]
+    sent = {"bytes": 0}
+
+    async def count_request(request):
+        sent["bytes"] += int(request.headers.get("content-length", 0))
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{APP_PORT}", timeout=60,
+                                 event_hooks={"request": [count_request]}) as http:
+        # 첫 요청(클라이언트 생성 등) 제외
+        await fused(http, -1, audio, resume)
+        for name, fn in [("two-hop", two_hop), ("fused", fused)]:
+            sent["bytes"] = 0
+            latencies, codes = [], set()
+            for i in range(answers):
+                # 답변마다 질문이 다르도록 번호를 바꿔 분석 캐시를 피합니다.
+                started = time.perf_counter()
+                codes.add(await fn(http, i + (0 if name == "two-hop" else 10000), audio, resume))
+                latencies.append(time.perf_counter() - started)
+            print(f"[{name}] 답변 {answers}건 (오디오 {audio_sec:.0f}s, 이력서 {len(resume)}자)")
+            print(f"  응답 코드       : {sorted(codes)}")
+            print(f"  지연 p50 / p95  : {percentile(latencies, 0.5):.1f}ms / {percentile(latencies, 0.95):.1f}ms")
+            print(f"  보낸 바이트/건  : {sent['bytes'] / answers:,.0f}")
+
+        resp = await http.post(
+            "/interview/analysis/interview/audio",
+            data={"dispatch": json.dumps(dispatch_fields(99999, resume), ensure_ascii=False)},
+            files={"file": ("a.wav", audio, "audio/wav")},
+        )
+        body = resp.json()
+        print(f"[sample] Server-Timing={resp.headers.get('server-timing')}")
+        print(f"  timingsMs={body['timingsMs']}, timeMs={body['analysis']['timeMs']}, fillerCount={body['analysis']['fillerCount']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--answers", type=int, default=30)
+    parser.add_argument("--audio-sec", type=float, default=20)
+    parser.add_argument("--resume-kb", type=int, default=6, help="이력서 크기(KB, UTF-8)")
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 서버 응답 지연(초)")
+    args = parser.parse_args()
+
+    from benchmarks.fake_openai_server import start_in_thread
+    start_in_thread(FAKE_PORT, latency=args.latency)
+
+    # 라우터 import 전에 가짜 서버 주소와 키를 주입해야 합니다. (캐시/합치기/워커 공유는 끔)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{FAKE_PORT}/v1"
+    os.environ.setdefault("INTERVIEW_OPENAI_KEY", "sk-fake")
+    os.environ.setdefault("QUESTION_VOICE_OPENAI_KEY", "sk-fake")
+    os.environ.setdefault("INTERVIEW_FINEDTUNED_MODEL_ID", "ft:fake-model")
+    os.environ.setdefault("QUESTION_BANK_SQLITE_PATH", "")
+    os.environ.setdefault("SINGLEFLIGHT_SQLITE_PATH", "")
+    os.environ.setdefault("RATE_LIMIT_SQLITE_PATH", "")
+    # 앞 단계가 기본 RPM 버킷을 비워 뒤 단계만 기다리지 않도록 한도를 넉넉히 잡습니다.
+    os.environ.setdefault("OPENAI_RATE_LIMITS", '{"*:*": {"rpm": 60000, "tpm": 100000000}}')
+
+    import uvicorn
+    import main_api
+    server = uvicorn.Server(uvicorn.Config(main_api.app, host="127.0.0.1", port=APP_PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    asyncio.run(main(args.answers, args.audio_sec, args.resume_kb))
@@ -0,0 +1,99 @@
+# bench_voice_upload_memory.py
+# ================================================================
+# /voice/analyze 요청당 최대 메모리 사용량 벤치마크
+# - 가짜 OpenAI 서버로 Whisper 호출을 대신하고, tracemalloc으로 요청 하나 동안의 peak를 잽니다.
+# - baseline: 기존 방식(file.read() + BytesIO)과 같은 핸들러를 함께 측정해 비교합니다.
+# - 실행: python -m benchmarks.bench_voice_upload_memory --sizes-mb 1,5,20
+# ================================================================
+
+import os
+import json
+import wave
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from io import BytesIO
+
+FAKE_PORT = 9103
+
+
+def make_wav(path: str, size_mb: float) -> None:
+    """지정 크기의 16-bit 모노 무음 WAV 파일을 만듭니다."""
+    frames = int(size_mb * 1024 * 1024 / 2)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        chunk = b"\x00\x00" * 16000
+        for _ in range(frames // 16000):
+            w.writeframes(chunk)
+
+
+def build_app():
+    from fastapi import FastAPI, UploadFile, File, Form
+    from openai import OpenAI
+    from routers.voice_ai import voice_router, VOICE_MAX_UPLOAD_BYTES
+    from core.upload_limit import UploadSizeLimitMiddleware
+
+    app = FastAPI()
+    app.include_router(voice_router, prefix="/voice")
+
+    @app.post("/baseline/analyze")
+    async def baseline_analyze(meta: str = Form(...), file: UploadFile = File(...)):
+        # 변경 전 방식: 업로드 전체를 bytes로 읽고 BytesIO로 한 번 더 감쌉니다.
+        client = OpenAI(api_key=os.environ["QUESTION_VOICE_OPENAI_KEY"])
+        contents = await file.read()
+        audio_bytes = BytesIO(contents)
+        audio_bytes.name = file.filename
+        transcription = client.audio.transcriptions.create(model="whisper-1", file=audio_bytes, language="ko")
+        return {"answerText": transcription.text}
+
+    app.add_middleware(UploadSizeLimitMiddleware, limits={"/voice/analyze": VOICE_MAX_UPLOAD_BYTES})
+    return app
+
+
+async def measure(http, path: str, wav_path: str) -> tuple:
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    with open(wav_path, "rb") as f:
+        resp = await http.post(
+            path,
+            data={"meta": json.dumps({"interviewId": 1})},
+            files={"file": ("answer.wav", f, "audio/wav")},
+        )
+    _, peak = tracemalloc.get_traced_memory()
+    return resp.status_code, (peak - before) / (1024 * 1024)
+
+
+async def main(sizes_mb):
+    import httpx
+
+    app = build_app()
+    transport = httpx.ASGITransport(app=app)
+    tracemalloc.start()
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as http:
+        print(f"{'size(MB)':>9} | {'path':<18} | {'status':>6} | {'peak(MB)':>9}")
+        print("-" * 52)
+        for size in sizes_mb:
+            with tempfile.TemporaryDirectory() as tmp:
+                wav_path = os.path.join(tmp, "answer.wav")
+                make_wav(wav_path, size)
+                for path in ("/baseline/analyze", "/voice/analyze"):
+                    status, peak_mb = await measure(http, path, wav_path)
+                    print(f"{size:>9} | {path:<18} | {status:>6} | {peak_mb:>9.2f}")
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes-mb", default="1,5,20")
+    args = parser.parse_args()
+
+    from benchmarks.fake_openai_server import start_in_thread
+    start_in_thread(FAKE_PORT, latency=0.05)
+
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{FAKE_PORT}/v1"
+    os.environ.setdefault("QUESTION_VOICE_OPENAI_KEY", "sk-fake")
+
+    asyncio.run(main([float(x) for x in args.sizes_mb.split(",")]))
@@ -0,0 +1,249 @@
+# fake_openai_server.py
+# ================================================================
+# 로컬 부하 테스트용 가짜 OpenAI 서버
+# - 실제 API 대신 지정한 지연(latency) 후 고정 응답을 돌려줍니다.
+# - 지원 경로: /v1/chat/completions, /v1/responses (stream 포함), /v1/audio/transcriptions
+# - 같은 system/instructions prefix가 다시 오면 usage의 cached_tokens를 채워 prompt caching을 흉내 냅니다.
+# - 장애 주입: /v1/* 요청 중 일정 비율을 오류(429/500/503 등, Retry-After 포함)로 돌려주거나 응답을 지연(hang)시킵니다.
+#   환경 변수(FAKE_OPENAI_FAULT_*) 또는 실행 중 POST /_faults {"rate": 1.0, "statuses": [503]} 로 바꿀 수 있습니다.
+#   GET /_faults 는 현재 설정과 주입 횟수를 돌려줍니다.
+# - 속도 제한 흉내: max_rps를 주면 최근 1초 동안 그보다 많은 /v1/* 요청은 429 + Retry-After: 1
+# - 웹훅 수신: POST /_webhooks 로 받은 본문을 WEBHOOKS에 쌓습니다. (비동기 작업 callbackUrl 검증용)
+# - 실행: python -m benchmarks.fake_openai_server --port 9100 --latency 0.5
+# ================================================================
+
+import os
+import time
+import json
+import random
+import asyncio
+import argparse
+import threading
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FAKE_LATENCY_SEC = float(os.environ.get("FAKE_OPENAI_LATENCY_SEC", 0.5))
+# 질문 생성 요청에 형식이 틀린(번호 매긴 자유 텍스트) 응답을 돌려줄 비율 (수리 재시도 테스트용)
+FAKE_BAD_OUTPUT_RATE = float(os.environ.get("FAKE_OPENAI_BAD_OUTPUT_RATE", 0.0))
+
+fake_app = FastAPI(title="Fake OpenAI")
+
+# 장애 주입 설정 (rate: 오류 응답 비율, hang_rate: hang_sec만큼 지연시킬 비율)
+FAULTS = {
+    "rate": float(os.environ.get("FAKE_OPENAI_FAULT_RATE", 0.0)),
+    "statuses": [int(s) for s in os.environ.get("FAKE_OPENAI_FAULT_STATUSES", "500,503").split(",") if s],
+    "retry_after": os.environ.get("FAKE_OPENAI_FAULT_RETRY_AFTER") or None,
+    "hang_rate": float(os.environ.get("FAKE_OPENAI_HANG_RATE", 0.0)),
+    "hang_sec": float(os.environ.get("FAKE_OPENAI_HANG_SEC", 30)),
+    "max_rps": float(os.environ.get("FAKE_OPENAI_MAX_RPS", 0)),
+}
+FAULT_COUNTS = {"requests": 0, "errors": 0, "hangs": 0, "rate_limited": 0}
+_recent_requests = []
+WEBHOOKS = []
+
+
+def configure_faults(**changes) -> None:
+    """같은 프로세스에서 띄운 가짜 서버의 장애 주입 설정을 바꿉니다. (벤치마크/검증 스크립트용)"""
+    FAULTS.update(changes)
+
+
+@fake_app.middleware("http")
+async def inject_faults(request: Request, call_next):
+    if not request.url.path.startswith("/v1/"):
+        return await call_next(request)
+    FAULT_COUNTS["requests"] += 1
+    if FAULTS["max_rps"]:
+        now = time.monotonic()
+        _recent_requests[:] = [t for t in _recent_requests if now - t < 1.0]
+        if len(_recent_requests) >= FAULTS["max_rps"]:
+            FAULT_COUNTS["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429, headers={"Retry-After": "1"},
+                content={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+            )
+        _recent_requests.append(now)
+    if FAULTS["hang_rate"] and random.random() < FAULTS["hang_rate"]:
+        FAULT_COUNTS["hangs"] += 1
+        await asyncio.sleep(FAULTS["hang_sec"])
+    if FAULTS["rate"] and random.random() < FAULTS["rate"]:
+        FAULT_COUNTS["errors"] += 1
+        status = random.choice(FAULTS["statuses"])
+        headers = {"Retry-After": str(FAULTS["retry_after"])} if FAULTS["retry_after"] is not None else {}
+        return JSONResponse(
+            status_code=status, headers=headers,
+            content={"error": {"message": f"injected fault ({status})", "type": "server_error", "code": None}},
+        )
+    return await call_next(request)
+
+
+@fake_app.get("/_faults")
+async def get_faults():
+    return {**FAULTS, "counts": FAULT_COUNTS}
+
+
+@fake_app.post("/_faults")
+async def set_faults(request: Request):
+    configure_faults(**await request.json())
+    return {**FAULTS, "counts": FAULT_COUNTS}
+
+@fake_app.post("/_webhooks")
+async def receive_webhook(request: Request):
+    WEBHOOKS.append({"headers": dict(request.headers), "body": await request.json()})
+    return {"ok": True}
+
+# 면접 분석 모델이 돌려줄 고정 JSON (AnswerAnalysisResult 스키마)
+FAKE_ANALYSIS = {
+    "score": 80,
+    "timeMs": 45000,
+    "fluency": 4,
+    "contentDepth": 4,
+    "structure": 3,
+    "fillerCount": 2,
+    "improvements": ["성과를 수치로 제시하세요."],
+    "strengths": ["경험이 구체적입니다."],
+    "risks": [],
+}
+
+
+
+def _fake_questions(n: int, repair: bool) -> str:
+    """질문 생성 요청에 대한 응답 (호출마다 다른 질문). 수리 요청이 아니면 일정 비율로 형식이 틀린 응답"""
+    questions = [f"면접 질문 {random.randint(0, 10**6)}번: 가장 어려웠던 문제는 무엇인가요?" for _ in range(n)]
+    if not repair and random.random() < FAKE_BAD_OUTPUT_RATE:
+        return "면접 질문 목록:\n" + "\n".join(f"{i}. {q}" for i, q in enumerate(questions, start=1))
+    return json.dumps({"questions": questions}, ensure_ascii=False)
+
+
+# 이미 본 prefix (prompt caching 흉내)
+_seen_prefixes = set()
+
+
+def _fake_usage(prefix: str, total_text: str, output_text: str, responses_api: bool = False) -> dict:
+    # 토큰 수는 대략 글자 수 / 2로 계산합니다.
+    input_tokens = max(1, len(total_text) // 2)
+    cached = len(prefix) // 2 if prefix in _seen_prefixes else 0
+    _seen_prefixes.add(prefix)
+    output_tokens = max(1, len(output_text) // 2)
+    if responses_api:
+        return {
+            "input_tokens": input_tokens, "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_tokens_details": {"cached_tokens": cached},
+            "output_tokens_details": {"reasoning_tokens": 0},
+        }
+    return {
+        "prompt_tokens": input_tokens, "completion_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+        "prompt_tokens_details": {"cached_tokens": cached},
+    }
+
+
+def _sse_stream(events):
+    async def gen():
+        for event in events:
+            await asyncio.sleep(FAKE_LATENCY_SEC / max(len(events), 1))
+            yield event
+    return StreamingResponse(gen(), media_type="text/event-stream")
+
+
+@fake_app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    prefix = messages[0]["content"] if messages else ""
+    if "면접 질문을 생성" in prefix:
+        content = _fake_questions(7 if any("자기소개서 ---" in str(m.get("content")) for m in messages) else 5, len(messages) > 2)
+    else:
+        content = json.dumps(FAKE_ANALYSIS, ensure_ascii=False)
+    usage = _fake_usage(prefix, "".join(str(m.get("content")) for m in messages), content)
+    base = {"id": "chatcmpl-fake", "created": int(time.time()), "model": body.get("model", "fake-model")}
+
+    if body.get("stream"):
+        words = content.split(" ")
+        events = [
+            "data: " + json.dumps({**base, "object": "chat.completion.chunk", "choices": [
+                {"index": 0, "delta": {"content": w + " "}, "finish_reason": None}]}, ensure_ascii=False) + "\n\n"
+            for w in words
+        ]
+        if (body.get("stream_options") or {}).get("include_usage"):
+            events.append("data: " + json.dumps({**base, "object": "chat.completion.chunk", "choices": [], "usage": usage}) + "\n\n")
+        events.append("data: [DONE]\n\n")
+        return _sse_stream(events)
+
+    await asyncio.sleep(FAKE_LATENCY_SEC)
+    return {
+        **base,
+        "object": "chat.completion",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": content},
+        }],
+        "usage": usage,
+    }
+
+
+@fake_app.post("/v1/responses")
+async def responses(request: Request):
+    body = await request.json()
+    prefix = body.get("instructions") or ""
+    user_input = body.get("input") if isinstance(body.get("input"), str) else json.dumps(body.get("input"), ensure_ascii=False)
+    text = "개선된 이력서: 프로젝트를 주도해 배포 시간을 50% 단축했습니다."
+    response = {
+        "id": "resp-fake", "object": "response", "created_at": int(time.time()), "status": "completed",
+        "model": body.get("model", "fake-model"), "parallel_tool_calls": True, "tool_choice": "auto", "tools": [],
+        "output": [{
+            "type": "message", "id": "msg-fake", "status": "completed", "role": "assistant",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }],
+        "usage": _fake_usage(prefix, prefix + user_input, text, responses_api=True),
+    }
+
+    if body.get("stream"):
+        events = [
+            "event: response.output_text.delta\ndata: " + json.dumps({
+                "type": "response.output_text.delta", "item_id": "msg-fake", "output_index": 0,
+                "content_index": 0, "delta": w + " ", "sequence_number": i, "logprobs": []}, ensure_ascii=False) + "\n\n"
+            for i, w in enumerate(text.split(" "))
+        ]
+        events.append("event: response.completed\ndata: " + json.dumps({
+            "type": "response.completed", "response": response, "sequence_number": len(events)}, ensure_ascii=False) + "\n\n")
+        return _sse_stream(events)
+
+    await asyncio.sleep(FAKE_LATENCY_SEC)
+    return response
+
+
+@fake_app.post("/v1/audio/transcriptions")
+async def audio_transcriptions(request: Request):
+    # 업로드 본문은 파싱하지 않고 흘려 읽기만 합니다. (벤치마크 메모리 측정에 영향 최소화)
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+    await asyncio.sleep(FAKE_LATENCY_SEC)
+    return {"text": f"가짜 전사 결과 ({received} bytes 수신)"}
+
+
+def start_in_thread(port: int, latency: float = FAKE_LATENCY_SEC) -> uvicorn.Server:
+    """벤치마크 스크립트에서 백그라운드 스레드로 가짜 서버를 띄웁니다."""
+    global FAKE_LATENCY_SEC
+    FAKE_LATENCY_SEC = latency
+
+    server = uvicorn.Server(uvicorn.Config(fake_app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=FAKE_LATENCY_SEC)
+    args = parser.parse_args()
+
+    FAKE_LATENCY_SEC = args.latency
+    uvicorn.run(fake_app, host="127.0.0.1", port=args.port)
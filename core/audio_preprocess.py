@@ -0,0 +1,307 @@
+# audio_preprocess.py
+# ================================================================
+# Whisper 전송 전 오디오 전처리 (선택 기능, VOICE_PREPROCESS=1)
+# - 디코딩 → 모노 다운믹스 → 16kHz 리샘플 → 앞/뒤 무음 제거(에너지 기반 VAD) → 압축 재인코딩
+# - 신호 처리 함수(downmix / resample / trim_silence)는 numpy 배열만 다루므로
+#   합성 파형으로 오프라인 검증이 가능합니다.
+# - .wav는 표준 라이브러리(wave)로 디코딩하고, 그 외 포맷(.m4a/.webm/.ogg/.mp3)과
+#   opus 인코딩은 ffmpeg가 설치되어 있을 때만 사용합니다.
+# ================================================================
+
+import os
+import wave
+import shutil
+import logging
+import tempfile
+import subprocess
+from dataclasses import dataclass
+from typing import IO, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+
+# 무음 판정: 프레임 RMS가 (가장 큰 프레임 RMS - VOICE_VAD_RANGE_DB) 와 VOICE_VAD_FLOOR_DBFS 중 큰 값보다 작으면 무음
+VAD_FRAME_MS = int(os.environ.get("VOICE_VAD_FRAME_MS", 30))
+VAD_RANGE_DB = float(os.environ.get("VOICE_VAD_RANGE_DB", 35))
+VAD_FLOOR_DBFS = float(os.environ.get("VOICE_VAD_FLOOR_DBFS", -50))
+# 잘라낸 경계 앞뒤로 남겨 둘 여유 구간 (말 시작/끝이 잘리지 않도록)
+VAD_PADDING_MS = int(os.environ.get("VOICE_VAD_PADDING_MS", 200))
+
+# 재인코딩 포맷: "opus"(ffmpeg 필요, 가장 작음) 또는 "wav"(16kHz 16-bit 모노)
+PREPROCESS_CODEC = os.environ.get("VOICE_PREPROCESS_CODEC", "opus")
+
+# 재인코딩 결과는 1MB까지 메모리, 그 이상은 디스크 임시 파일에 둡니다.
+_SPOOL_MAX_BYTES = 1024 * 1024
+
+FFMPEG_BIN = shutil.which("ffmpeg")
+
+
+class AudioDecodeError(Exception):
+    pass
+
+
+class AudioTooLongError(AudioDecodeError):
+    """디코딩하면 최대 길이를 넘는 오디오 (메모리 보호용 상한)"""
+
+
+@dataclass
+class PreprocessResult:
+    """전처리된 오디오와 전/후 비교 수치"""
+    file: IO[bytes]
+    filename: str
+    bytes_before: int
+    bytes_after: int
+    duration_before_sec: float
+    duration_after_sec: float
+
+    def summary(self) -> str:
+        return (
+            f"{self.bytes_before} → {self.bytes_after} bytes, "
+            f"{self.duration_before_sec:.2f} → {self.duration_after_sec:.2f} s"
+        )
+
+
+# ------------------------------------------------------------------
+# 신호 처리 (numpy 벡터 연산)
+# ------------------------------------------------------------------
+
+def downmix(samples: np.ndarray) -> np.ndarray:
+    """(n,) 또는 (n, channels) float 배열 → (n,) 모노"""
+    if samples.ndim == 1:
+        return samples.astype(np.float32, copy=False)
+    return samples.mean(axis=1, dtype=np.float32)
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """FFT 기반 리샘플링. 다운샘플 시 나이퀴스트 이상 대역을 잘라내므로 별도 저역 필터가 필요 없습니다."""
+    if src_rate == dst_rate or samples.size == 0:
+        return samples.astype(np.float32, copy=False)
+    n_out = int(round(samples.size * dst_rate / src_rate))
+    spectrum = np.fft.rfft(samples)
+    n_bins = n_out // 2 + 1
+    if n_bins <= spectrum.size:
+        spectrum = spectrum[:n_bins]
+    else:
+        spectrum = np.pad(spectrum, (0, n_bins - spectrum.size))
+    out = np.fft.irfft(spectrum, n=n_out) * (n_out / samples.size)
+    return out.astype(np.float32)
+
+
+def frame_rms_db(samples: np.ndarray, sample_rate: int, frame_ms: int = VAD_FRAME_MS) -> np.ndarray:
+    """고정 길이 프레임별 RMS(dBFS). 마지막 불완전 프레임은 0으로 채워 계산합니다."""
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = -(-samples.size // frame_len)
+    padded = np.zeros(n_frames * frame_len, dtype=np.float32)
+    padded[: samples.size] = samples
+    frames = padded.reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    frame_ms: int = VAD_FRAME_MS,
+    range_db: float = VAD_RANGE_DB,
+    floor_dbfs: float = VAD_FLOOR_DBFS,
+    padding_ms: int = VAD_PADDING_MS,
+) -> Tuple[np.ndarray, int, int]:
+    """앞/뒤 무음을 잘라 (잘린 배열, 시작 샘플, 끝 샘플)을 반환합니다. 전부 무음이면 빈 배열."""
+    if samples.size == 0:
+        return samples, 0, 0
+
+    db = frame_rms_db(samples, sample_rate, frame_ms)
+    threshold = max(float(db.max()) - range_db, floor_dbfs)
+    voiced = np.flatnonzero(db >= threshold)
+    if voiced.size == 0:
+        return samples[:0], 0, 0
+
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    pad = int(sample_rate * padding_ms / 1000)
+    start = max(0, int(voiced[0]) * frame_len - pad)
+    end = min(samples.size, (int(voiced[-1]) + 1) * frame_len + pad)
+    return samples[start:end], start, end
+
+
+# ------------------------------------------------------------------
+# 디코딩 / 인코딩
+# ------------------------------------------------------------------
+
+def pcm_to_float(raw: bytes, sample_width: int, channels: int) -> np.ndarray:
+    if sample_width == 1:
+        data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        data = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif sample_width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        data = ints.astype(np.float32) / (1 << 23)
+    elif sample_width == 4:
+        data = np.frombuffer(raw, dtype="<i4").astype(np.float32) / (1 << 31)
+    else:
+        raise AudioDecodeError(f"지원하지 않는 WAV 샘플 크기: {sample_width} bytes")
+    return data.reshape(-1, channels) if channels > 1 else data
+
+
+def decode_wav(fileobj: IO[bytes]) -> Tuple[np.ndarray, int]:
+    """PCM WAV → (float32 샘플, 샘플레이트)"""
+    try:
+        with wave.open(fileobj, "rb") as w:
+            channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+            raw = w.readframes(w.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise AudioDecodeError(f"WAV 디코딩 실패: {e}")
+    return pcm_to_float(raw, width, channels), rate
+
+
+def _seekable_path(fileobj: IO[bytes], filename: str) -> Tuple[str, bool]:
+    """ffmpeg에 -i로 넘길 경로 → (경로, 다 쓰면 지울지). 디스크 파일이면 그 경로, 아니면 임시 파일로 복사합니다."""
+    name = getattr(fileobj, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name, False
+    suffix = os.path.splitext(filename)[1].lower()
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        shutil.copyfileobj(fileobj, tmp, 1024 * 1024)
+    return tmp.name, True
+
+
+def ffmpeg_pcm16(fileobj: IO[bytes], filename: str = "", max_sec: Optional[float] = None) -> bytearray:
+    """
+    ffmpeg로 임의 포맷을 16kHz 모노 16-bit PCM(s16le) 바이트로 디코딩합니다. (다운믹스/리샘플을 ffmpeg가 수행)
+    max_sec을 넘는 길이가 나오면 디코딩을 멈추고 AudioTooLongError를 올립니다. (전체를 메모리에 올리지 않도록)
+    """
+    if not FFMPEG_BIN:
+        raise AudioDecodeError("ffmpeg가 설치되어 있지 않아 디코딩할 수 없습니다.")
+    max_bytes = int(max_sec * TARGET_SAMPLE_RATE) * 2 if max_sec else None
+    # m4a/mp4는 moov atom이 파일 끝에 있는 경우가 많아(iOS 녹음) 앞에서부터 읽는 파이프로는 열 수 없습니다.
+    # 탐색(seek)이 가능하도록 파일 경로로 넘깁니다.
+    path, remove = _seekable_path(fileobj, filename)
+    pcm = bytearray()
+    try:
+        # stderr는 파이프로 받으면 stdout을 읽는 동안 가득 차 멈출 수 있으므로 임시 파일로 받습니다.
+        with tempfile.TemporaryFile() as stderr:
+            proc = subprocess.Popen(
+                [FFMPEG_BIN, "-nostdin", "-loglevel", "error", "-i", path,
+                 "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE), "-f", "s16le", "pipe:1"],
+                stdout=subprocess.PIPE, stderr=stderr,
+            )
+            try:
+                while True:
+                    block = proc.stdout.read(1024 * 1024)
+                    if not block:
+                        break
+                    pcm += block
+                    if max_bytes is not None and len(pcm) > max_bytes:
+                        raise AudioTooLongError(f"오디오가 최대 길이({max_sec:.0f}초)를 넘습니다.")
+            except BaseException:
+                proc.kill()
+                proc.wait()
+                raise
+            finally:
+                proc.stdout.close()
+            if proc.wait() != 0:
+                stderr.seek(0)
+                raise AudioDecodeError(f"ffmpeg 디코딩 실패: {stderr.read().decode(errors='ignore')[:200]}")
+    finally:
+        if remove:
+            os.remove(path)
+    return pcm
+
+
+def decode_with_ffmpeg(fileobj: IO[bytes], filename: str = "") -> Tuple[np.ndarray, int]:
+    """ffmpeg로 임의 포맷을 16kHz 모노 float 샘플로 디코딩합니다."""
+    return pcm_to_float(ffmpeg_pcm16(fileobj, filename), 2, 1), TARGET_SAMPLE_RATE
+
+
+def decode_audio(fileobj: IO[bytes], filename: str) -> Tuple[np.ndarray, int]:
+    fileobj.seek(0)
+    if filename.lower().endswith(".wav"):
+        try:
+            return decode_wav(fileobj)
+        except AudioDecodeError:
+            # 압축 코덱이 들어 있는 WAV 등은 ffmpeg로 재시도
+            if not FFMPEG_BIN:
+                raise
+            fileobj.seek(0)
+    return decode_with_ffmpeg(fileobj, filename)
+
+
+def _to_pcm16(samples: np.ndarray) -> bytes:
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> IO[bytes]:
+    out = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES)
+    with wave.open(out, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(_to_pcm16(samples))
+    out.seek(0)
+    return out
+
+
+def encode_opus(samples: np.ndarray, sample_rate: int) -> IO[bytes]:
+    """음성용 저비트레이트 Opus(Ogg 컨테이너). Whisper는 .ogg를 지원합니다."""
+    out = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES)
+    proc = subprocess.run(
+        [FFMPEG_BIN, "-nostdin", "-loglevel", "error",
+         "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-i", "pipe:0",
+         "-c:a", "libopus", "-b:a", "24k", "-application", "voip", "-f", "ogg", "pipe:1"],
+        input=_to_pcm16(samples), stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
+    )
+    if proc.returncode != 0:
+        raise AudioDecodeError(f"ffmpeg 인코딩 실패: {proc.stderr.decode(errors='ignore')[:200]}")
+    out.write(proc.stdout)
+    out.seek(0)
+    return out
+
+
+def encode_audio(samples: np.ndarray, sample_rate: int, filename: str, codec: str = PREPROCESS_CODEC) -> Tuple[IO[bytes], str]:
+    """(파일 객체, 확장자를 바꾼 파일명)을 반환합니다. opus를 쓸 수 없으면 wav로 대체합니다."""
+    stem = os.path.splitext(os.path.basename(filename))[0] or "audio"
+    if codec == "opus" and FFMPEG_BIN:
+        return encode_opus(samples, sample_rate), f"{stem}.ogg"
+    return encode_wav(samples, sample_rate), f"{stem}.wav"
+
+
+def _file_size(fileobj: IO[bytes]) -> int:
+    pos = fileobj.tell()
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(pos)
+    return size
+
+
+# ------------------------------------------------------------------
+# 전체 전처리
+# ------------------------------------------------------------------
+
+def preprocess_audio(fileobj: IO[bytes], filename: str, codec: Optional[str] = None) -> PreprocessResult:
+    """
+    업로드 파일을 디코딩 → 모노 16kHz → 앞/뒤 무음 제거 → 재인코딩합니다.
+    CPU 작업이므로 이벤트 루프에서는 asyncio.to_thread로 호출하세요.
+    """
+    bytes_before = _file_size(fileobj)
+    samples, rate = decode_audio(fileobj, filename)
+    duration_before = (samples.shape[0] / rate) if rate else 0.0
+
+    mono = resample(downmix(samples), rate, TARGET_SAMPLE_RATE)
+    trimmed, _, _ = trim_silence(mono, TARGET_SAMPLE_RATE)
+    if trimmed.size == 0:
+        # 전부 무음이면 원본 길이의 모노 신호를 그대로 보냅니다. (Whisper가 빈 문자열을 돌려줌)
+        trimmed = mono
+
+    encoded, encoded_name = encode_audio(trimmed, TARGET_SAMPLE_RATE, filename, codec or PREPROCESS_CODEC)
+    return PreprocessResult(
+        file=encoded,
+        filename=encoded_name,
+        bytes_before=bytes_before,
+        bytes_after=_file_size(encoded),
+        duration_before_sec=duration_before,
+        duration_after_sec=trimmed.size / TARGET_SAMPLE_RATE,
+    )
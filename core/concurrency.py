@@ -0,0 +1,94 @@
+# concurrency.py
+# ================================================================
+# 라우트 단위 동시성 제한 + 대기열 기반 부하 차단(load shedding)
+# - 동시에 실행 중인 요청은 max_concurrency개까지, 그 이상은 최대 max_queue개까지 대기합니다.
+# - 대기열이 가득 찼거나 queue_timeout_sec 안에 차례가 오지 않으면 OverloadedError를 올립니다.
+#   → main_api의 예외 핸들러가 즉시 503 + Retry-After로 응답합니다. (스레드/소켓을 붙잡고 기다리지 않음)
+# ================================================================
+
+import math
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+
+class OverloadedError(Exception):
+    """동시성 한도와 대기열이 모두 찬 상태 (HTTP 503으로 변환됩니다)"""
+
+    def __init__(self, name: str, retry_after_sec: int, message: Optional[str] = None):
+        super().__init__(message or f"{name}: 요청이 많아 잠시 후 다시 시도해 주세요.")
+        self.name = name
+        self.retry_after_sec = retry_after_sec
+
+
+class ConcurrencyLimiter:
+    """asyncio.Semaphore + 대기 중인 요청 수 기반 부하 차단"""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout_sec: float = 10.0,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_sec = queue_timeout_sec
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._active = 0
+        self._waiting = 0
+        # 처리 시간 지수 이동 평균 (Retry-After 추정용)
+        self._avg_service_sec = 1.0
+        self._counters = {
+            "admitted": 0,
+            "queued": 0,
+            "shed_queue_full": 0,
+            "shed_timeout": 0,
+        }
+
+    def retry_after_sec(self) -> int:
+        """현재 대기열이 빠지는 데 걸릴 대략적인 시간 (최소 1초)"""
+        backlog = (self._waiting + 1) / max(self.max_concurrency, 1)
+        return max(1, math.ceil(backlog * self._avg_service_sec))
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                self._counters["shed_queue_full"] += 1
+                raise OverloadedError(self.name, self.retry_after_sec())
+            self._counters["queued"] += 1
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout_sec)
+        except asyncio.TimeoutError:
+            self._counters["shed_timeout"] += 1
+            raise OverloadedError(self.name, self.retry_after_sec()) from None
+        finally:
+            self._waiting -= 1
+
+        self._active += 1
+        self._counters["admitted"] += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._avg_service_sec = 0.8 * self._avg_service_sec + 0.2 * elapsed
+            self._active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            **self._counters,
+            "active": self._active,
+            "waiting": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "avg_service_sec": round(self._avg_service_sec, 3),
+        }
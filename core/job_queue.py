@@ -0,0 +1,532 @@
+# job_queue.py
+# ================================================================
+# 비동기 작업 큐 (제출 → 폴링 / 웹훅 콜백)
+# - 오래 걸리는 작업(이력서 3단계 생성, 긴 녹음 STT)은 HTTP 연결을 붙잡지 않고 작업 ID만 바로 돌려줍니다.
+# - 저장소: SQLite 파일 (같은 호스트의 모든 gunicorn 워커가 공유). 서버를 재시작해도 대기 중인 작업이 남습니다.
+# - 워커 프로세스마다 workers개의 소비자 태스크가 작업을 가져가 실행합니다. (전체 동시 실행 = 프로세스 수 × workers)
+#   가져가기는 UPDATE 한 문장(claim 토큰)으로 처리하므로 같은 작업을 두 워커가 동시에 실행하지 않습니다.
+# - 대기 중인 작업이 max_pending개를 넘으면 OverloadedError(503 + Retry-After)로 더 받지 않습니다.
+# - 실행 중에 워커가 죽으면 lease_sec 뒤에 다시 대기열로 돌립니다. (max_attempts회까지)
+#   제공자 장애로 OverloadedError(CircuitOpenError 포함)가 나면 실패 처리하지 않고 Retry-After 뒤에 다시 실행합니다.
+# - 완료된 작업은 result_ttl_sec 동안 보관 후 삭제합니다. 업로드 파일(spool_path)은 작업이 끝나면 지웁니다.
+# - callback_url이 있으면 완료 시 작업 상태 JSON을 POST합니다. (실패 시 지수 백오프로 재시도)
+#   허용 호스트(JOB_WEBHOOK_ALLOWED_HOSTS)를 지정하지 않으면, 호스트를 DNS로 풀어 공인 주소일 때만 보냅니다.
+#   (사설/루프백/링크 로컬 주소 → 내부 서비스나 인스턴스 메타데이터 169.254.169.254로 보내게 만드는 것 방지)
+# ================================================================
+
+import os
+import json
+import math
+import time
+import uuid
+import socket
+import sqlite3
+import asyncio
+import logging
+import ipaddress
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from core.concurrency import OverloadedError
+from core.metrics import EventCounters, record_job
+from core.rate_limit import BATCH, request_priority
+from core.sqlite_store import connect, init_schema
+
+logger = logging.getLogger(__name__)
+
+# 웹훅을 보낼 수 있는 호스트 (쉼표 구분). 비우면 공인 IP로 풀리는 호스트만 허용합니다.
+JOB_WEBHOOK_ALLOWED_HOSTS = frozenset(
+    h.strip().lower() for h in os.environ.get("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if h.strip()
+)
+JOB_WEBHOOK_TIMEOUT_SEC = float(os.environ.get("JOB_WEBHOOK_TIMEOUT_SEC", 10))
+JOB_WEBHOOK_MAX_ATTEMPTS = int(os.environ.get("JOB_WEBHOOK_MAX_ATTEMPTS", 3))
+
+# 작업 처리 함수: (payload, spool_path) → JSON 직렬화 가능한 결과
+JobHandler = Callable[[Dict[str, Any], Optional[str]], Awaitable[Any]]
+
+_COLUMNS = (
+    "id, kind, status, payload, spool_path, callback_url, attempts, error, result,"
+    " created_at, started_at, finished_at, webhook_status"
+)
+
+
+def validate_callback_url(url: str) -> str:
+    """
+    http(s) URL이고, 허용 호스트가 지정되어 있으면 그 안에, 아니면 모든 DNS 결과가 공인 주소여야 합니다. (아니면 ValueError)
+    DNS 조회는 블로킹이므로 이벤트 루프에서는 asyncio.to_thread로 부릅니다.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("callbackUrl은 http(s) URL이어야 합니다.")
+    host = parsed.hostname.lower()
+    if JOB_WEBHOOK_ALLOWED_HOSTS:
+        if host not in JOB_WEBHOOK_ALLOWED_HOSTS:
+            raise ValueError(f"허용되지 않은 callbackUrl 호스트입니다: {parsed.hostname}")
+        return url
+
+    try:
+        infos = socket.getaddrinfo(host, parsed.port or (443 if parsed.scheme == "https" else 80),
+                                   type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise ValueError(f"callbackUrl 호스트를 찾을 수 없습니다: {parsed.hostname}")
+    for info in infos:
+        # IPv6 링크 로컬 주소에는 "%eth0" 같은 zone이 붙을 수 있습니다.
+        address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        # is_global: 사설(10/8, 172.16/12, 192.168/16), 루프백, 링크 로컬(169.254/16), 예약 대역은 False
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f"내부 주소로는 callbackUrl을 보낼 수 없습니다: {parsed.hostname}")
+    return url
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="milliseconds") if ts else None
+
+
+def _error_message(e: BaseException) -> str:
+    # HTTPException은 detail에 사용자용 메시지가 있습니다.
+    return str(getattr(e, "detail", None) or e or type(e).__name__)
+
+
+class JobQueue:
+    """SQLite 기반 작업 큐 + 워커 프로세스별 소비자 태스크"""
+
+    def __init__(
+        self,
+        sqlite_path: Optional[str],
+        workers: int = 2,
+        max_pending: int = 500,
+        job_timeout_sec: float = 600.0,
+        lease_sec: float = 900.0,
+        max_attempts: int = 3,
+        result_ttl_sec: float = 86400.0,
+        poll_interval_sec: float = 1.0,
+    ):
+        self.sqlite_path = sqlite_path or None
+        self.workers = workers
+        self.max_pending = max_pending
+        self.job_timeout_sec = job_timeout_sec
+        self.lease_sec = max(lease_sec, job_timeout_sec)
+        self.max_attempts = max_attempts
+        self.result_ttl_sec = result_ttl_sec
+        self.poll_interval_sec = poll_interval_sec
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._webhook_tasks: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        # 이 프로세스가 실행 중인 작업 (종료 시 대기열로 되돌림): job_id → claim 토큰
+        self._claims: Dict[str, str] = {}
+        # 작업 실행 시간 지수 이동 평균 (Retry-After 추정용)
+        self._avg_run_sec = 30.0
+        self._counters = EventCounters("job_queue", (
+            "submitted", "rejected_full", "succeeded", "failed", "deferred", "requeued_stale",
+            "webhooks_delivered", "webhooks_failed", "expired_deleted", "disk_errors",
+        ))
+
+        if self.sqlite_path:
+            try:
+                self._init_disk()
+            except sqlite3.Error:
+                logger.error("작업 큐 SQLite 초기화 실패 → 비동기 작업 API를 사용하지 않습니다.", exc_info=True)
+                self.sqlite_path = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sqlite_path)
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    def retry_after_sec(self, pending: int) -> int:
+        """대기 중인 작업이 빠지는 데 걸릴 대략적인 시간 (최소 1초)"""
+        return max(1, math.ceil(pending / max(self.workers, 1) * self._avg_run_sec))
+
+    # ------------------------------------------------------------------
+    # SQLite (블로킹 I/O이므로 스레드에서 실행)
+    # ------------------------------------------------------------------
+    def _connect(self):
+        return connect(self.sqlite_path, row_factory=sqlite3.Row)
+
+    def _init_disk(self) -> None:
+        init_schema(
+            self.sqlite_path,
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL,"
+            " payload TEXT NOT NULL, spool_path TEXT, callback_url TEXT,"
+            " claim TEXT, attempts INTEGER NOT NULL DEFAULT 0, error TEXT, result TEXT,"
+            " created_at REAL NOT NULL, available_at REAL NOT NULL,"
+            " started_at REAL, finished_at REAL, webhook_status TEXT)",
+            "CREATE INDEX IF NOT EXISTS jobs_status_idx ON jobs (status, available_at)",
+        )
+
+    def _disk_insert(self, row: Dict[str, Any]) -> Tuple[bool, int]:
+        with self._connect() as conn:
+            pending = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if pending >= self.max_pending:
+                return False, pending
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, spool_path, callback_url, created_at, available_at)"
+                " VALUES (:id, :kind, 'queued', :payload, :spool_path, :callback_url, :created_at, :created_at)",
+                row,
+            )
+            return True, pending
+
+    def _disk_claim(self, kinds: List[str], token: str) -> Optional[sqlite3.Row]:
+        now = time.time()
+        placeholders = ",".join("?" * len(kinds))
+        with self._connect() as conn:
+            # 하위 쿼리와 UPDATE가 한 문장이라 쓰기 잠금 안에서 원자적으로 실행됩니다.
+            conn.execute(
+                "UPDATE jobs SET status = 'running', claim = ?, started_at = ?, attempts = attempts + 1"
+                " WHERE id = (SELECT id FROM jobs WHERE status = 'queued' AND available_at <= ?"
+                f" AND kind IN ({placeholders}) ORDER BY available_at LIMIT 1)",
+                (token, now, now, *kinds),
+            )
+            return conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE claim = ? AND status = 'running'", (token,)
+            ).fetchone()
+
+    def _disk_finish(self, job_id: str, token: str, status: str, result: Optional[str], error: Optional[str]) -> bool:
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, claim = NULL"
+                " WHERE id = ? AND claim = ?",
+                (status, result, error, time.time(), job_id, token),
+            )
+            return cur.rowcount == 1
+
+    def _disk_defer(self, job_id: str, token: str, delay_sec: float) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', claim = NULL, started_at = NULL, available_at = ?"
+                " WHERE id = ? AND claim = ?",
+                (time.time() + delay_sec, job_id, token),
+            )
+
+    def _disk_release(self, claims: Dict[str, str]) -> None:
+        """종료하는 워커가 실행 중이던 작업을 대기열로 되돌립니다. (시도 횟수는 세지 않음)"""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE jobs SET status = 'queued', claim = NULL, started_at = NULL, attempts = attempts - 1"
+                " WHERE id = ? AND claim = ?",
+                list(claims.items()),
+            )
+
+    def _disk_set_webhook(self, job_id: str, webhook_status: str) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET webhook_status = ? WHERE id = ?", (webhook_status, job_id))
+
+    def _disk_get(self, job_id: str) -> Tuple[Optional[sqlite3.Row], int]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {_COLUMNS}, available_at FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            ahead = 0
+            if row is not None and row["status"] == "queued":
+                ahead = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND available_at < ?",
+                    (row["available_at"],),
+                ).fetchone()[0]
+            return row, ahead
+
+    def _disk_maintain(self) -> Tuple[int, List[sqlite3.Row], int, List[str]]:
+        """멈춘 작업 재대기/실패 처리, 보관 기간이 지난 작업 삭제"""
+        now = time.time()
+        stale_before = now - self.lease_sec
+        with self._connect() as conn:
+            exhausted = conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE status = 'running' AND started_at < ? AND attempts >= ?",
+                (stale_before, self.max_attempts),
+            ).fetchall()
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, claim = NULL"
+                " WHERE status = 'running' AND started_at < ? AND attempts >= ?",
+                ("작업이 제한 시간 안에 끝나지 않았습니다.", now, stale_before, self.max_attempts),
+            )
+            requeued = conn.execute(
+                "UPDATE jobs SET status = 'queued', claim = NULL, started_at = NULL, available_at = ?"
+                " WHERE status = 'running' AND started_at < ?",
+                (now, stale_before),
+            ).rowcount
+            expired_before = now - self.result_ttl_sec
+            spool_paths = [r[0] for r in conn.execute(
+                "SELECT spool_path FROM jobs WHERE status IN ('succeeded', 'failed')"
+                " AND finished_at < ? AND spool_path IS NOT NULL",
+                (expired_before,),
+            )]
+            deleted = conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?", (expired_before,),
+            ).rowcount
+        return requeued, exhausted, deleted, spool_paths
+
+    def _disk_counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            return {row[0]: row[1] for row in conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")}
+
+    # ------------------------------------------------------------------
+    # 작업 상태 표현
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _view(row: sqlite3.Row, queue_position: Optional[int] = None) -> Dict[str, Any]:
+        view = {
+            "jobId": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "createdAt": _iso(row["created_at"]),
+            "startedAt": _iso(row["started_at"]),
+            "finishedAt": _iso(row["finished_at"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+        }
+        if queue_position is not None:
+            view["queuePosition"] = queue_position
+        if row["callback_url"]:
+            view["webhookStatus"] = row["webhook_status"]
+        return view
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    async def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        callback_url: Optional[str] = None,
+        spool_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """작업을 대기열에 넣고 바로 반환합니다. 대기열이 가득 차면 OverloadedError."""
+        if kind not in self._handlers:
+            raise ValueError(f"등록되지 않은 작업 종류입니다: {kind}")
+        job_id = uuid.uuid4().hex
+        row = {
+            "id": job_id,
+            "kind": kind,
+            "payload": json.dumps(payload, ensure_ascii=False),
+            "spool_path": spool_path,
+            "callback_url": callback_url,
+            "created_at": time.time(),
+        }
+        accepted, pending = await asyncio.to_thread(self._disk_insert, row)
+        if not accepted:
+            self._counters["rejected_full"] += 1
+            raise OverloadedError("job_queue", self.retry_after_sec(pending),
+                                  message="작업 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.")
+
+        self._counters["submitted"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        logger.info("작업 등록: kind=%s, jobId=%s, 앞선 대기 작업=%s", kind, job_id, pending)
+        return {"jobId": job_id, "kind": kind, "status": "queued", "queuePosition": pending}
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row, ahead = await asyncio.to_thread(self._disk_get, job_id)
+        if row is None:
+            return None
+        return self._view(row, ahead if row["status"] == "queued" else None)
+
+    async def start(self) -> None:
+        """워커 프로세스 시작 시 소비자 태스크와 정리 태스크를 띄웁니다. (lifespan에서 호출)"""
+        if not self.enabled or self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._http = httpx.AsyncClient(timeout=JOB_WEBHOOK_TIMEOUT_SEC)
+        self._tasks = [asyncio.create_task(self._consume(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._maintain()))
+        logger.info("작업 큐 시작: 소비자 %s개, 종류=%s", self.workers, sorted(self._handlers))
+
+    async def stop(self) -> None:
+        """실행 중인 작업은 취소하고 대기열로 되돌립니다. (다른 워커나 재시작 후 다시 실행)"""
+        # 취소되면 소비자 태스크가 claims에서 작업을 빼므로 먼저 복사해 둡니다.
+        claims = dict(self._claims)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if claims:
+            try:
+                # 취소 직전에 끝나 결과가 기록된 작업은 claim이 지워져 있어 그대로 둡니다.
+                await asyncio.to_thread(self._disk_release, claims)
+            except sqlite3.Error:
+                logger.warning("실행 중이던 작업을 대기열로 되돌리지 못했습니다. (lease 만료 후 재실행)", exc_info=True)
+            logger.info("작업 큐 종료: 실행 중이던 작업 %s건을 대기열로 되돌렸습니다.", len(claims))
+        if self._webhook_tasks:
+            await asyncio.wait(self._webhook_tasks, timeout=JOB_WEBHOOK_TIMEOUT_SEC)
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def stats(self) -> Dict[str, Any]:
+        try:
+            by_status = await asyncio.to_thread(self._disk_counts) if self.enabled else {}
+        except sqlite3.Error:
+            self._counters["disk_errors"] += 1
+            by_status = {}
+        return {
+            "enabled": self.enabled,
+            **self._counters,
+            "by_status": by_status,
+            "running_here": len(self._claims),
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "avg_run_sec": round(self._avg_run_sec, 3),
+        }
+
+    # ------------------------------------------------------------------
+    # 소비자 / 정리 태스크
+    # ------------------------------------------------------------------
+    async def _consume(self, index: int) -> None:
+        kinds = sorted(self._handlers)
+        while True:
+            token = f"{os.getpid()}-{index}-{uuid.uuid4().hex}"
+            try:
+                row = await asyncio.to_thread(self._disk_claim, kinds, token)
+            except sqlite3.Error:
+                logger.warning("작업 가져오기 실패", exc_info=True)
+                self._counters["disk_errors"] += 1
+                row = None
+            if row is None:
+                # 같은 워커에서 제출되면 바로 깨고, 다른 워커의 제출은 poll_interval_sec마다 확인합니다.
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_sec)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._claims[row["id"]] = token
+            try:
+                await self._run(row, token)
+            except Exception:
+                # 기록 실패 등으로 소비자 태스크가 죽지 않게 합니다. (작업은 lease 만료 후 다시 실행)
+                logger.error("작업 처리 중 오류: jobId=%s", row["id"], exc_info=True)
+            finally:
+                self._claims.pop(row["id"], None)
+
+    async def _run(self, row: sqlite3.Row, token: str) -> None:
+        kind, job_id = row["kind"], row["id"]
+        wait_sec = row["started_at"] - row["created_at"]
+        started = time.perf_counter()
+        result, error = None, None
+        try:
+            # 큐에 넣은 작업은 기다릴 수 있으므로 호출 한도를 대화형 요청에 양보합니다. (core.rate_limit 우선순위)
+            with request_priority(BATCH):
+                value = await asyncio.wait_for(
+                    self._handlers[kind](json.loads(row["payload"]), row["spool_path"]),
+                    timeout=self.job_timeout_sec,
+                )
+            result = json.dumps(value, ensure_ascii=False, default=str)
+            status = "succeeded"
+        except asyncio.TimeoutError:
+            status, error = "failed", f"작업이 {self.job_timeout_sec:.0f}초 안에 끝나지 않았습니다."
+        except OverloadedError as e:
+            if row["attempts"] < self.max_attempts:
+                # 제공자 장애/부하 차단은 실패로 확정하지 않고 나중에 다시 실행합니다.
+                self._counters["deferred"] += 1
+                logger.warning("작업 연기: kind=%s, jobId=%s, %s초 후 재시도: %s", kind, job_id, e.retry_after_sec, e)
+                await asyncio.to_thread(self._disk_defer, job_id, token, e.retry_after_sec)
+                return
+            status, error = "failed", _error_message(e)
+        except Exception as e:
+            logger.warning("작업 실패: kind=%s, jobId=%s", kind, job_id, exc_info=True)
+            status, error = "failed", _error_message(e)
+
+        run_sec = time.perf_counter() - started
+        self._avg_run_sec = 0.8 * self._avg_run_sec + 0.2 * run_sec
+        self._counters[status] += 1
+        record_job(kind, status, wait_sec, run_sec)
+        logger.info("작업 완료: kind=%s, jobId=%s, status=%s, 대기=%.1fs, 실행=%.1fs", kind, job_id, status, wait_sec, run_sec)
+
+        try:
+            finished = await asyncio.to_thread(self._disk_finish, job_id, token, status, result, error)
+        except sqlite3.Error:
+            logger.error("작업 결과 기록 실패: jobId=%s", job_id, exc_info=True)
+            self._counters["disk_errors"] += 1
+            return
+        if not finished:
+            # lease가 만료되어 다른 워커가 다시 가져간 작업입니다. (그 워커의 결과를 씁니다)
+            return
+        self._remove_spool(row["spool_path"])
+        if row["callback_url"]:
+            self._notify(job_id, row["callback_url"])
+
+    def _notify(self, job_id: str, url: str) -> None:
+        """웹훅은 소비자 태스크를 붙잡지 않도록 별도 태스크로 보냅니다."""
+        task = asyncio.create_task(self._deliver_webhook(job_id, url))
+        self._webhook_tasks.add(task)
+        task.add_done_callback(self._webhook_tasks.discard)
+
+    async def _deliver_webhook(self, job_id: str, url: str) -> None:
+        try:
+            row, _ = await asyncio.to_thread(self._disk_get, job_id)
+        except sqlite3.Error:
+            self._counters["disk_errors"] += 1
+            row = None
+        if row is None:
+            return
+        view = self._view(row)
+        # 접수 후 DNS가 내부 주소로 바뀌었을 수 있으므로(DNS rebinding) 보내기 직전에 다시 확인합니다.
+        try:
+            await asyncio.to_thread(validate_callback_url, url)
+        except ValueError as e:
+            logger.warning("웹훅 전송 안 함: jobId=%s, %s", view["jobId"], e)
+            await self._fail_webhook(view["jobId"])
+            return
+        delay = 1.0
+        for attempt in range(1, JOB_WEBHOOK_MAX_ATTEMPTS + 1):
+            try:
+                resp = await self._http.post(url, json=view, headers={"X-Job-Id": view["jobId"]})
+                if resp.is_success:
+                    self._counters["webhooks_delivered"] += 1
+                    await asyncio.to_thread(self._disk_set_webhook, view["jobId"], "delivered")
+                    return
+                logger.warning("웹훅 응답 오류: jobId=%s, status=%s (시도 %s)", view["jobId"], resp.status_code, attempt)
+            except httpx.HTTPError as e:
+                logger.warning("웹훅 전송 실패: jobId=%s, %s (시도 %s)", view["jobId"], e, attempt)
+            if attempt < JOB_WEBHOOK_MAX_ATTEMPTS:
+                await asyncio.sleep(delay)
+                delay *= 2
+        await self._fail_webhook(view["jobId"])
+
+    async def _fail_webhook(self, job_id: str) -> None:
+        self._counters["webhooks_failed"] += 1
+        try:
+            await asyncio.to_thread(self._disk_set_webhook, job_id, "failed")
+        except sqlite3.Error:
+            self._counters["disk_errors"] += 1
+
+    async def _maintain(self) -> None:
+        interval = max(self.poll_interval_sec, min(60.0, self.lease_sec / 4))
+        while True:
+            try:
+                requeued, exhausted, deleted, spool_paths = await asyncio.to_thread(self._disk_maintain)
+            except sqlite3.Error:
+                logger.warning("작업 큐 정리 실패", exc_info=True)
+                self._counters["disk_errors"] += 1
+            else:
+                if requeued:
+                    self._counters["requeued_stale"] += requeued
+                    logger.warning("멈춘 작업 %s건을 다시 대기열에 넣었습니다.", requeued)
+                for row in exhausted:
+                    self._counters["failed"] += 1
+                    self._remove_spool(row["spool_path"])
+                    if row["callback_url"]:
+                        self._notify(row["id"], row["callback_url"])
+                self._counters["expired_deleted"] += deleted
+                for path in spool_paths:
+                    self._remove_spool(path)
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def _remove_spool(path: Optional[str]) -> None:
+        if not path:
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.warning("작업 업로드 파일 삭제 실패: %s", path, exc_info=True)
@@ -0,0 +1,167 @@
+# logging_setup.py
+# ================================================================
+# 구조화(JSON) 비동기 로깅
+# - 호출 스레드(이벤트 루프)는 레코드를 큐에 넣기만 하고, stdout 쓰기와 JSON 직렬화는
+#   QueueListener 스레드가 처리합니다. (gunicorn 워커에서 stdout이 막혀도 요청 처리가 멈추지 않음)
+# - 메시지는 %-스타일 인자로 넘겨 레벨이 꺼져 있으면 포맷하지 않습니다. (logger.info("... %s", x))
+# - 요청 ID: RequestIdMiddleware가 X-Request-ID(없으면 새로 발급)를 contextvar에 넣고,
+#   같은 요청에서 남긴 로그 레코드에 request_id로 붙입니다. 응답 헤더에도 돌려줍니다.
+# - LLM 원문 같은 큰 페이로드는 log_payload로 LOG_PAYLOAD_SAMPLE_RATE 비율만 샘플링해 남깁니다.
+# - 설정: LOG_LEVEL(기본 INFO), LOG_FORMAT(json|text, 기본 json),
+#         LOG_PAYLOAD_SAMPLE_RATE(기본 0.01), LOG_PAYLOAD_MAX_CHARS(기본 2000)
+# ================================================================
+
+import os
+import sys
+import json
+import uuid
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get("LOG_PAYLOAD_SAMPLE_RATE", 0.01))
+LOG_PAYLOAD_MAX_CHARS = int(os.environ.get("LOG_PAYLOAD_MAX_CHARS", 2000))
+
+REQUEST_ID_HEADER = "x-request-id"
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# LogRecord 기본 속성 (이 외의 속성은 extra로 넘어온 구조화 필드로 취급)
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+# ------------------------------------------------------------------
+# 포맷터 / 핸들러
+# ------------------------------------------------------------------
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 하나의 JSON 객체 (ts, level, logger, msg, request_id, extra 필드, exc)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """호출 스레드에서 꼭 필요한 일만 합니다: 인자 병합, 예외 문자열화, 요청 ID 부착.
+
+    기본 QueueHandler.prepare는 포맷터 전체(JSON 직렬화 포함)를 호출 스레드에서 돌리므로 대체합니다.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id_var.get()
+        # 인자로 넘긴 객체가 나중에 바뀌거나 피클되지 않을 수 있으니 메시지는 여기서 확정합니다.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None) -> None:
+    """루트 로거를 큐 핸들러 하나로 구성합니다. 여러 번 호출해도 한 번만 적용됩니다. (워커 프로세스마다 1회)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    level = (level or os.environ.get("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.environ.get("LOG_FORMAT", "json")).lower()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s - %(levelname)s - %(name)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S",
+        ))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_ContextQueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # 종료 시 큐에 남은 레코드를 모두 내보냅니다.
+    atexit.register(_listener.stop)
+
+
+# ------------------------------------------------------------------
+# 큰 페이로드 샘플링
+# ------------------------------------------------------------------
+
+def log_payload(logger: logging.Logger, message: str, payload: Any, *,
+                level: int = logging.DEBUG, sample_rate: Optional[float] = None, **fields: Any) -> None:
+    """LLM 원문처럼 큰 값을 sample_rate 비율로만, LOG_PAYLOAD_MAX_CHARS까지 잘라 남깁니다.
+
+    오류 원인 파악용으로 항상 남겨야 하면 sample_rate=1.0을 넘깁니다.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    rate = LOG_PAYLOAD_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate < 1.0 and random.random() >= rate:
+        return
+    text = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False, default=str)
+    if len(text) > LOG_PAYLOAD_MAX_CHARS:
+        fields["payload_chars"] = len(text)
+        text = text[:LOG_PAYLOAD_MAX_CHARS]
+    logger.log(level, message, extra={**fields, "payload": text})
+
+
+# ------------------------------------------------------------------
+# 요청 ID 미들웨어
+# ------------------------------------------------------------------
+
+class RequestIdMiddleware:
+    """X-Request-ID를 받아(없으면 발급) 로그 contextvar에 넣고 응답 헤더로 돌려줍니다."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER.encode():
+                # 로그에 그대로 실리므로 길이를 제한합니다.
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER.encode(), request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
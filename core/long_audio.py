@@ -0,0 +1,268 @@
+# long_audio.py
+# ================================================================
+# 긴 녹음 분할 병렬 전사 (VOICE_LONG_AUDIO=1)
+# - 목표 길이 근처에서 가장 조용한 프레임(무음 경계)을 찾아 자르고, 경계 앞뒤로 겹치는 구간을 둡니다.
+# - 조각들을 동시에 Whisper로 보내고, 순서대로 이어 붙이면서 겹친 구간의 중복 단어를 제거합니다.
+# - 25MB 업로드 제한을 넘는 무압축 .wav도 조각 단위로 보낼 수 있습니다.
+# - 메모리: 전체 녹음은 16kHz 모노 int16(1시간 ≈ 115MB)으로만 들고 있고, 디코딩/리샘플은 구간 단위로,
+#   float 변환과 인코딩은 동시에 전송 중인 조각(concurrency개)에 대해서만 합니다.
+#   VOICE_LONG_AUDIO_MAX_SEC를 넘는 녹음은 AudioTooLongError로 거절합니다.
+# ================================================================
+
+import os
+import re
+import time
+import asyncio
+import wave
+import logging
+from difflib import SequenceMatcher
+from dataclasses import dataclass
+from typing import IO, List, Optional, Tuple
+
+import numpy as np
+
+from core.audio_preprocess import (
+    TARGET_SAMPLE_RATE, AudioDecodeError, AudioTooLongError, FFMPEG_BIN,
+    downmix, resample, frame_rms_db, encode_audio, ffmpeg_pcm16, pcm_to_float,
+)
+from core.upstream import RetryPolicy, call_upstream
+
+logger = logging.getLogger(__name__)
+
+CHUNK_TARGET_SEC = float(os.environ.get("VOICE_CHUNK_TARGET_SEC", 45))
+CHUNK_MAX_SEC = float(os.environ.get("VOICE_CHUNK_MAX_SEC", 60))
+CHUNK_OVERLAP_SEC = float(os.environ.get("VOICE_CHUNK_OVERLAP_SEC", 1.5))
+CHUNK_CONCURRENCY = int(os.environ.get("VOICE_CHUNK_CONCURRENCY", 6))
+# 분할 전사할 수 있는 최대 길이(초). 디코딩한 전체 녹음을 메모리에 두므로 상한을 둡니다.
+LONG_AUDIO_MAX_SEC = float(os.environ.get("VOICE_LONG_AUDIO_MAX_SEC", 2 * 3600))
+# .wav 디코딩/리샘플 구간 길이와, 구간 경계의 FFT 왜곡을 버리기 위해 앞뒤로 더 읽는 길이
+_DECODE_WINDOW_SEC = 30.0
+_DECODE_MARGIN_SEC = 0.1
+
+# 조각 하나의 전사 재시도 정책 (VOICE_CHUNK_UPSTREAM_TIMEOUT_SEC / _MAX_ATTEMPTS / _DEADLINE_SEC)
+CHUNK_RETRY_POLICY = RetryPolicy.from_env("VOICE_CHUNK", timeout_sec=60, max_attempts=3, deadline_sec=120)
+
+# 겹침 구간 중복 제거 시 비교할 최대 단어 수
+_MAX_OVERLAP_WORDS = 30
+_PUNCT_RE = re.compile(r"[^\w]", re.UNICODE)
+# 단어가 정확히 겹치지 않을 때(띄어쓰기/조사/구두점 차이) 글자 단위로 비교할 경계 앞뒤 단어 수와 최소 공통 글자 수.
+# 겹침 구간(앞뒤 CHUNK_OVERLAP_SEC)은 몇 어절뿐이므로 창을 좁게 잡아 멀리 떨어진 같은 말을 겹침으로 보지 않습니다.
+_FUZZY_WINDOW_WORDS = 12
+_MIN_OVERLAP_CHARS = 5
+
+
+@dataclass
+class Chunk:
+    index: int
+    start: int  # 샘플 위치 (겹침 포함)
+    end: int
+
+
+def plan_chunks(
+    samples: np.ndarray,
+    sample_rate: int,
+    target_sec: float = CHUNK_TARGET_SEC,
+    max_sec: float = CHUNK_MAX_SEC,
+    overlap_sec: float = CHUNK_OVERLAP_SEC,
+    frame_ms: int = 30,
+) -> List[Chunk]:
+    """
+    자를 위치를 [target*0.75, max] 구간에서 가장 에너지가 낮은 프레임으로 정합니다.
+    각 조각은 앞/뒤 자른 위치에서 overlap_sec만큼 더 포함합니다.
+    """
+    total = samples.size
+    if total <= int(max_sec * sample_rate):
+        return [Chunk(0, 0, total)]
+
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    overlap = int(overlap_sec * sample_rate)
+
+    cuts = [0]
+    while total - cuts[-1] > int(max_sec * sample_rate):
+        lo = (cuts[-1] + int(target_sec * 0.75 * sample_rate)) // frame_len
+        hi = (cuts[-1] + int(max_sec * sample_rate)) // frame_len
+        # 전체 신호가 아니라 자를 위치를 찾는 구간만 float으로 바꿔 프레임 에너지를 계산합니다.
+        db = frame_rms_db(_to_float(samples[lo * frame_len:hi * frame_len]), sample_rate, frame_ms)
+        quietest = lo + int(np.argmin(db))
+        cuts.append(quietest * frame_len)
+    cuts.append(total)
+
+    return [
+        Chunk(i, max(0, cuts[i] - overlap), min(total, cuts[i + 1] + overlap))
+        for i in range(len(cuts) - 1)
+    ]
+
+
+def _norm(word: str) -> str:
+    return _PUNCT_RE.sub("", word).casefold()
+
+
+def _char_owners(words: List[str]) -> Tuple[str, List[int]]:
+    """단어들을 공백 없이 이은 문자열과, 각 글자가 속한 단어 번호"""
+    owners = [i for i, word in enumerate(words) for _ in word]
+    return "".join(words), owners
+
+
+def _fuzzy_overlap(left_norm: List[str], right_norm: List[str]) -> Optional[Tuple[int, int]]:
+    """
+    경계 앞뒤 창에서 가장 긴 공통 글자열(띄어쓰기 무시)을 찾아 → (left에서 남길 단어 수, right에서 버릴 단어 수).
+    공통 글자열이 _MIN_OVERLAP_CHARS보다 짧으면 None. 공통 글자열이 끝나는 곳까지는 left를, 그 뒤는 right를 씁니다.
+    단어 중간에서 끝나면(조사/어미가 다름) 조각 끝에서 잘렸을 수 있는 left 대신 right의 그 단어를 씁니다.
+    """
+    left_text, left_owner = _char_owners(left_norm)
+    right_text, right_owner = _char_owners(right_norm)
+    match = SequenceMatcher(None, left_text, right_text, autojunk=False).find_longest_match(
+        0, len(left_text), 0, len(right_text)
+    )
+    if match.size < _MIN_OVERLAP_CHARS:
+        return None
+    last_a, last_b = match.a + match.size - 1, match.b + match.size - 1
+    if last_a + 1 == len(left_text) or left_owner[last_a + 1] != left_owner[last_a]:
+        return left_owner[last_a] + 1, right_owner[last_b] + 1
+    return left_owner[last_a], right_owner[last_b]
+
+
+def merge_overlap(left: str, right: str, max_words: int = _MAX_OVERLAP_WORDS) -> str:
+    """
+    left의 끝 단어들과 right의 앞 단어들이 겹치면 겹친 부분을 한 번만 남깁니다.
+    1) 구두점/대소문자를 무시하고 단어가 그대로 겹치는 가장 긴 구간
+    2) 없으면 경계 근처에서 띄어쓰기를 무시한 가장 긴 공통 글자열 (Whisper가 겹침 구간을 조금 다르게 받아쓴 경우)
+    """
+    left_words, right_words = left.split(), right.split()
+    if not left_words:
+        return right.strip()
+    if not right_words:
+        return left.strip()
+
+    left_norm = [_norm(w) for w in left_words[-max_words:]]
+    right_norm = [_norm(w) for w in right_words[:max_words]]
+    for size in range(min(len(left_norm), len(right_norm)), 0, -1):
+        if left_norm[-size:] == right_norm[:size] and any(left_norm[-size:]):
+            return " ".join(left_words + right_words[size:])
+
+    window = min(_FUZZY_WINDOW_WORDS, len(left_norm), len(right_norm))
+    overlap = _fuzzy_overlap(left_norm[-window:], right_norm[:window])
+    if overlap:
+        keep_left, drop_right = overlap
+        left_start = len(left_words) - window
+        return " ".join(left_words[:left_start + keep_left] + right_words[drop_right:])
+    return " ".join(left_words + right_words)
+
+
+def stitch(texts: List[str]) -> str:
+    merged = ""
+    for text in texts:
+        merged = merge_overlap(merged, text or "")
+    return merged
+
+
+def _to_float(samples: np.ndarray) -> np.ndarray:
+    if samples.dtype == np.int16:
+        return samples.astype(np.float32) / 32768
+    return samples.astype(np.float32, copy=False)
+
+
+def _to_int16(samples: np.ndarray) -> np.ndarray:
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def _decode_wav_windowed(fileobj: IO[bytes], max_sec: float) -> np.ndarray:
+    """PCM WAV를 구간 단위로 읽어 모노 16kHz int16로. 구간 앞뒤 여유분은 리샘플 후 버립니다."""
+    try:
+        with wave.open(fileobj, "rb") as w:
+            channels, width, rate, n_frames = w.getnchannels(), w.getsampwidth(), w.getframerate(), w.getnframes()
+            if n_frames > max_sec * rate:
+                raise AudioTooLongError(f"오디오가 최대 길이({max_sec:.0f}초)를 넘습니다.")
+            n_out = int(round(n_frames * TARGET_SAMPLE_RATE / rate))
+            out = np.zeros(n_out, dtype=np.int16)
+            window, margin = int(_DECODE_WINDOW_SEC * rate), int(_DECODE_MARGIN_SEC * rate)
+            for pos in range(0, n_frames, window):
+                read_start = max(0, pos - margin)
+                read_end = min(n_frames, pos + window + margin)
+                w.setpos(read_start)
+                block = downmix(pcm_to_float(w.readframes(read_end - read_start), width, channels))
+                block = resample(block, rate, TARGET_SAMPLE_RATE)
+                out_start = int(round(pos * TARGET_SAMPLE_RATE / rate))
+                out_end = min(n_out, int(round(min(n_frames, pos + window) * TARGET_SAMPLE_RATE / rate)))
+                skip = out_start - int(round(read_start * TARGET_SAMPLE_RATE / rate))
+                piece = block[skip:skip + out_end - out_start]
+                out[out_start:out_start + piece.size] = _to_int16(piece)
+    except (wave.Error, EOFError) as e:
+        raise AudioDecodeError(f"WAV 디코딩 실패: {e}")
+    return out
+
+
+def decode_mono(fileobj: IO[bytes], filename: str, max_sec: float = LONG_AUDIO_MAX_SEC) -> np.ndarray:
+    """업로드 파일 → 16kHz 모노 int16 (블로킹, 스레드에서 호출). max_sec을 넘으면 AudioTooLongError"""
+    fileobj.seek(0)
+    if filename.lower().endswith(".wav"):
+        try:
+            return _decode_wav_windowed(fileobj, max_sec)
+        except AudioTooLongError:
+            raise
+        except AudioDecodeError:
+            # 압축 코덱이 들어 있는 WAV 등은 ffmpeg로 재시도
+            if not FFMPEG_BIN:
+                raise
+            fileobj.seek(0)
+    return np.frombuffer(ffmpeg_pcm16(fileobj, filename, max_sec), dtype="<i2")
+
+
+def probe_duration_sec(fileobj: IO[bytes], filename: str) -> Optional[float]:
+    """WAV는 헤더만 읽어 길이를 구합니다. 그 외 포맷은 None (디코딩 전에는 알 수 없음)."""
+    if not filename.lower().endswith(".wav"):
+        return None
+    try:
+        fileobj.seek(0)
+        with wave.open(fileobj, "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except (wave.Error, EOFError):
+        return None
+    finally:
+        fileobj.seek(0)
+
+
+async def transcribe_long_audio(
+    client,
+    fileobj: IO[bytes],
+    filename: str,
+    concurrency: int = CHUNK_CONCURRENCY,
+    codec: Optional[str] = None,
+    upstream: str = "whisper",
+) -> Tuple[str, int]:
+    """긴 오디오를 분할해 동시에 전사하고, 이어 붙인 텍스트와 조각 수를 반환합니다.
+
+    upstream은 서킷 브레이커 단위입니다. (같은 키를 쓰는 라우터와 공유하려면 키 환경 변수 이름)
+    """
+    started = time.perf_counter()
+    samples = await asyncio.to_thread(decode_mono, fileobj, filename)
+    chunks = plan_chunks(samples, TARGET_SAMPLE_RATE)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def transcribe_chunk(chunk: Chunk) -> str:
+        # 인코딩도 세마포어 안에서 해, 동시에 메모리에 있는 인코딩 조각이 concurrency개를 넘지 않게 합니다.
+        async with semaphore:
+            encoded, name = await asyncio.to_thread(
+                encode_audio, _to_float(samples[chunk.start:chunk.end]), TARGET_SAMPLE_RATE,
+                f"chunk{chunk.index}_{filename}", codec or "opus",
+            )
+            def send():
+                encoded.seek(0)  # 재시도마다 처음부터 다시 보냅니다.
+                return client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=(name, encoded),
+                    language="ko",
+                )
+
+            try:
+                result = await call_upstream(upstream, "voice_stt_chunk", send, CHUNK_RETRY_POLICY, model="whisper-1")
+            finally:
+                encoded.close()
+        return getattr(result, "text", None) or str(result)
+
+    texts = await asyncio.gather(*[transcribe_chunk(c) for c in chunks])
+    logger.info(
+        "분할 전사 완료: 길이=%.1fs, 조각=%s, 소요=%.2fs",
+        samples.size / TARGET_SAMPLE_RATE, len(chunks), time.perf_counter() - started,
+    )
+    return stitch(list(texts)), len(chunks)
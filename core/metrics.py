@@ -0,0 +1,215 @@
+# metrics.py
+# ================================================================
+# Prometheus 지표 (GET /metrics)
+# - HTTP: 라우트(경로 템플릿)별 요청 수/지연 히스토그램, 라우터별 처리 중인 요청 수
+# - 업스트림: OpenAI API(LLM/Whisper) 호출 지연 (openai_clients 레지스트리의 httpx 이벤트 훅에서 기록)
+# - 재시도/서킷 브레이커: 라우트·사유별 재시도 수, 업스트림별 브레이커 상태와 차단 수 (core.upstream)
+# - 속도 제한: 키×모델 토큰 버킷에서 기다린 시간(우선순위별), 최대 대기 시간을 넘겨 거절한 수, 429로 막은 수
+# - 비동기 작업 큐: 종류/결과별 완료 수, 대기 시간과 실행 시간 히스토그램
+# - 토큰: 라우트/모델별 입력·캐시 입력·출력 토큰, 입력 예산으로 절감한 토큰
+# - 구성 요소 카운터: 응답 캐시, single-flight(합쳐진 요청 수 coalesced_local / coalesced_remote),
+#   질문 은행, 이력서 제출 기록, 작업 큐의 stats() 카운터를 component_events_total로 노출 (EventCounters)
+#
+# gunicorn 멀티 워커: PROMETHEUS_MULTIPROC_DIR을 지정하면 prometheus_client 멀티프로세스 모드로
+# 워커별 지표 파일을 합산해 노출합니다. (gunicorn.conf.py에서 디렉터리 초기화 / 종료 워커 정리)
+# ================================================================
+
+import os
+import time
+from typing import Iterable, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+)
+from prometheus_client import multiprocess
+
+# LLM 호출을 포함하는 요청이 대부분이므로 수십 초 구간까지 나눕니다.
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP 요청 수", ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간 (스트리밍 응답은 마지막 바이트까지)",
+    ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "처리 중인 HTTP 요청 수", ["router"], multiprocess_mode="livesum",
+)
+UPSTREAM_LATENCY = Histogram(
+    "openai_request_duration_seconds", "OpenAI API 호출 시간 (응답 헤더 수신까지, 스트리밍은 첫 바이트까지)",
+    ["client", "api", "model", "status"], buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_RETRIES = Counter(
+    "openai_retries_total", "OpenAI API 재시도 수", ["route", "reason"],
+)
+BREAKER_STATE = Gauge(
+    "openai_circuit_state", "서킷 브레이커 상태 (0=closed, 1=half_open, 2=open)", ["upstream"],
+    multiprocess_mode="max",
+)
+BREAKER_REJECTED = Counter(
+    "openai_circuit_rejected_total", "브레이커가 열려 호출하지 않고 거절한 요청 수", ["upstream"],
+)
+_BREAKER_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+RATE_LIMIT_WAIT = Histogram(
+    "openai_rate_limit_wait_seconds", "토큰 버킷(RPM/TPM) 자리를 기다린 시간", ["model", "priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+RATE_LIMIT_REJECTED = Counter(
+    "openai_rate_limit_rejected_total", "최대 대기 시간 안에 버킷 자리가 나지 않아 거절한 요청 수", ["model", "priority"],
+)
+RATE_LIMIT_THROTTLED = Counter(
+    "openai_rate_limit_throttled_total", "429를 받아 버킷을 Retry-After 동안 막은 횟수", ["model"],
+)
+COMPONENT_EVENTS = Counter(
+    "component_events_total", "내부 구성 요소(캐시/합치기/질문 은행/작업 큐 등)의 이벤트 수",
+    ["component", "name", "event"],
+)
+JOBS_FINISHED = Counter(
+    "jobs_finished_total", "비동기 작업 완료 수", ["kind", "status"],
+)
+JOB_WAIT = Histogram(
+    "job_queue_wait_seconds", "비동기 작업이 대기열에서 기다린 시간", ["kind"], buckets=LATENCY_BUCKETS,
+)
+JOB_RUN = Histogram(
+    "job_run_duration_seconds", "비동기 작업 실행 시간", ["kind"], buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "LLM 토큰 사용량", ["route", "model", "kind"],
+)
+LLM_TOKENS_SAVED = Counter(
+    "llm_input_tokens_saved_total", "입력 토큰 예산으로 절감한 토큰 수", ["route"],
+)
+
+
+def route_label(scope) -> str:
+    """경로 템플릿(/interview/analysis/{id} 형태)을 라벨로 써서 라벨 카디널리티를 제한합니다.
+
+    include_router(prefix=...)로 붙은 라우트는 scope["route"].path에 prefix가 빠져 있으므로,
+    실제 경로에서 템플릿 조각 수만큼을 뺀 앞부분을 prefix로 붙입니다.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return "unmatched"
+    path_parts = scope["path"].rstrip("/").split("/")
+    template_parts = template.rstrip("/").split("/")
+    prefix_len = len(path_parts) - len(template_parts)
+    if prefix_len <= 0:
+        return template
+    return "/".join(path_parts[:prefix_len + 1]) + template
+
+
+# 처리 중인 요청 수는 라우팅 전에 올리므로 경로 첫 조각으로 라벨을 정합니다. (알 수 없는 경로는 other)
+KNOWN_ROUTERS = frozenset({"interview", "question", "resume", "voice", "jobs", "openai"})
+
+
+def router_label(path: str) -> str:
+    """첫 경로 조각 (interview / question / resume / voice / jobs / openai), 그 외는 other"""
+    first = path.strip("/").split("/", 1)[0]
+    return first if first in KNOWN_ROUTERS else "other"
+
+
+class PrometheusMiddleware:
+    """라우트별 요청 수/지연, 처리 중인 요청 수를 기록하는 ASGI 미들웨어"""
+
+    def __init__(self, app, skip_paths=("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(router_label(scope["path"]))
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            # 라우팅이 끝난 뒤 scope에 route가 채워집니다.
+            route = route_label(scope)
+            HTTP_LATENCY.labels(scope["method"], route).observe(elapsed)
+            HTTP_REQUESTS.labels(scope["method"], route, str(status["code"])).inc()
+
+
+def observe_upstream(client: str, api: str, model: Optional[str], status: int, elapsed: float) -> None:
+    UPSTREAM_LATENCY.labels(client, api, model or "unknown", str(status)).observe(elapsed)
+
+
+def record_retry(route: str, reason: str) -> None:
+    UPSTREAM_RETRIES.labels(route, reason).inc()
+
+
+def record_breaker_state(upstream: str, state: str) -> None:
+    BREAKER_STATE.labels(upstream).set(_BREAKER_STATE_VALUES[state])
+
+
+def record_breaker_rejected(upstream: str) -> None:
+    BREAKER_REJECTED.labels(upstream).inc()
+
+
+def record_rate_limit_wait(model: str, priority: str, waited: float) -> None:
+    RATE_LIMIT_WAIT.labels(model, priority).observe(waited)
+
+
+def record_rate_limit_rejected(model: str, priority: str) -> None:
+    RATE_LIMIT_REJECTED.labels(model, priority).inc()
+
+
+def record_rate_limit_throttled(model: str) -> None:
+    RATE_LIMIT_THROTTLED.labels(model).inc()
+
+
+def record_job(kind: str, status: str, wait_sec: float, run_sec: float) -> None:
+    JOBS_FINISHED.labels(kind, status).inc()
+    JOB_WAIT.labels(kind).observe(wait_sec)
+    JOB_RUN.labels(kind).observe(run_sec)
+
+
+def record_tokens(route: str, model: str, input_tokens: int, cached_input_tokens: int, output_tokens: int) -> None:
+    LLM_TOKENS.labels(route, model, "input").inc(input_tokens)
+    LLM_TOKENS.labels(route, model, "cached_input").inc(cached_input_tokens)
+    LLM_TOKENS.labels(route, model, "output").inc(output_tokens)
+
+
+def record_tokens_saved(route: str, saved: int) -> None:
+    if saved:
+        LLM_TOKENS_SAVED.labels(route).inc(saved)
+
+
+class EventCounters(dict):
+    """
+    구성 요소의 stats()용 카운터 dict. counters[event] += n 하면 같은 양을
+    component_events_total{component, name, event}에도 더합니다.
+    (stats()는 이 워커의 값, /metrics는 멀티프로세스 모드에서 모든 워커의 합)
+    """
+
+    def __init__(self, component: str, events: Iterable[str], name: str = ""):
+        events = list(events)
+        super().__init__((event, 0) for event in events)
+        self._children = {event: COMPONENT_EVENTS.labels(component, name, event) for event in events}
+
+    def __setitem__(self, event: str, value) -> None:
+        delta = value - self.get(event, 0)
+        super().__setitem__(event, value)
+        if delta > 0:
+            self._children[event].inc(delta)
+
+
+def render_metrics() -> tuple:
+    """(본문, Content-Type). 멀티프로세스 모드면 모든 워커의 지표를 합산합니다."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
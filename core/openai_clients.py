@@ -0,0 +1,271 @@
+# openai_clients.py
+# ================================================================
+# 프로세스 전역 OpenAI 클라이언트 레지스트리
+# - 키 환경 변수 이름별로 클라이언트를 한 번만(지연) 생성해 모든 라우터가 공유합니다.
+#   → HTTP keep-alive / TLS 세션 / 커넥션 풀 재사용
+# - 호출 시점에 환경 변수를 읽으므로 load_dotenv 순서에 영향을 받지 않습니다.
+# - 키가 바뀌면(환경 변수 변경) 새 클라이언트로 교체하고, 이전 클라이언트는
+#   진행 중인 요청이 끝날 시간을 준 뒤(OPENAI_ROTATION_GRACE_SEC) 닫습니다.
+#
+# 키 교체 방법 (별도 API 없이 환경 변수로만 교체합니다)
+#   1) app_sevice.env의 *_OPENAI_KEY 값을 바꾼 뒤 gunicorn 마스터에 HUP을 보냅니다.
+#      (kill -HUP <master pid>) 새 워커가 main_api를 다시 불러오며 env 파일을 읽고 새 키로
+#      클라이언트를 만듭니다. 배포 환경 변수로 키를 주입했다면 컨테이너를 재시작합니다.
+#   2) 같은 프로세스 안에서 os.environ 값을 바꾸면 다음 get_*_client 호출에서 감지해 교체합니다.
+# - 커넥션 재사용 지표: 요청 수 대비 새 TCP/TLS 연결 수
+# - 호출 지연: httpx 응답 훅에서 core.metrics의 openai_request_duration_seconds에 기록
+#
+# 풀 설정 (접두사별 값이 있으면 우선, 없으면 OPENAI_* 공통값)
+#   {PREFIX}_MAX_CONNECTIONS / OPENAI_MAX_CONNECTIONS   (기본 100)
+#   {PREFIX}_MAX_KEEPALIVE   / OPENAI_MAX_KEEPALIVE     (기본 20)
+#   {PREFIX}_KEEPALIVE_EXPIRY/ OPENAI_KEEPALIVE_EXPIRY  (기본 30초)
+#   {PREFIX}_TIMEOUT_SEC     / OPENAI_TIMEOUT_SEC       (기본 60초)
+#   {PREFIX}_SDK_MAX_RETRIES / OPENAI_SDK_MAX_RETRIES   (기본 0: 재시도는 core.upstream이 담당)
+#   PREFIX = 키 환경 변수 이름에서 "_OPENAI_KEY"를 뗀 값 (예: INTERVIEW, QUESTION_VOICE, RESUME)
+# ================================================================
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient
+
+from core.metrics import observe_upstream
+
+logger = logging.getLogger(__name__)
+
+# 키 교체 후 이전 클라이언트를 닫기까지 기다리는 시간(초)
+ROTATION_GRACE_SEC = float(os.environ.get("OPENAI_ROTATION_GRACE_SEC", 120))
+
+
+@dataclass
+class ClientStats:
+    """클라이언트 한 개의 커넥션 재사용 지표"""
+    requests: int = 0
+    new_connections: int = 0
+    tls_handshakes: int = 0
+    rotations: int = 0
+    created_at: float = field(default_factory=time.time)
+
+    def as_dict(self) -> Dict[str, Any]:
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "tls_handshakes": self.tls_handshakes,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / self.requests, 4) if self.requests else 0.0,
+            "rotations": self.rotations,
+            "created_at": self.created_at,
+        }
+
+
+@dataclass
+class _Entry:
+    api_key: str
+    client: Any
+    stats: ClientStats
+
+
+def _prefix(key_env: str) -> str:
+    return key_env[: -len("_OPENAI_KEY")] if key_env.endswith("_OPENAI_KEY") else key_env
+
+
+def _setting(key_env: str, name: str, default: float) -> float:
+    value = os.environ.get(f"{_prefix(key_env)}_{name}") or os.environ.get(f"OPENAI_{name}")
+    return float(value) if value else default
+
+
+def _limits(key_env: str) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(_setting(key_env, "MAX_CONNECTIONS", 100)),
+        max_keepalive_connections=int(_setting(key_env, "MAX_KEEPALIVE", 20)),
+        keepalive_expiry=_setting(key_env, "KEEPALIVE_EXPIRY", 30),
+    )
+
+
+def _record_trace(stats: ClientStats, event_name: str) -> None:
+    # httpcore trace 이벤트: 새 TCP 연결 / TLS 핸드셰이크가 실제로 일어난 경우만 집계
+    if event_name == "connection.connect_tcp.complete":
+        stats.new_connections += 1
+    elif event_name == "connection.start_tls.complete":
+        stats.tls_handshakes += 1
+
+
+def _api_label(url: httpx.URL) -> str:
+    """/v1/chat/completions → chat/completions, /v1/batches/batch_abc → batches (ID는 라벨에서 제외)"""
+    parts = url.path.strip("/").split("/")
+    if parts and parts[0] == "v1":
+        parts = parts[1:]
+    if not parts:
+        return "unknown"
+    return "/".join(parts[:2]) if parts[0] in ("chat", "audio") else parts[0]
+
+
+def _model_label(request: httpx.Request) -> Optional[str]:
+    """JSON 본문의 model 값 (multipart 업로드 등 본문을 읽을 수 없으면 None)"""
+    if not request.headers.get("content-type", "").startswith("application/json"):
+        return None
+    try:
+        return json.loads(request.content).get("model")
+    except (httpx.RequestNotRead, ValueError, AttributeError):
+        return None
+
+
+def _start_timer(request: httpx.Request) -> None:
+    request.extensions["metrics_started"] = time.perf_counter()
+
+
+def _observe(key_env: str, response: httpx.Response) -> None:
+    request = response.request
+    started = request.extensions.get("metrics_started")
+    if started is None:
+        return
+    observe_upstream(
+        _prefix(key_env), _api_label(request.url), _model_label(request),
+        response.status_code, time.perf_counter() - started,
+    )
+
+
+def _async_hooks(key_env: str, stats: ClientStats) -> Dict[str, list]:
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        _record_trace(stats, event_name)
+
+    async def on_request(request: httpx.Request) -> None:
+        stats.requests += 1
+        request.extensions["trace"] = trace
+        _start_timer(request)
+
+    async def on_response(response: httpx.Response) -> None:
+        _observe(key_env, response)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+def _sync_hooks(key_env: str, stats: ClientStats) -> Dict[str, list]:
+    def trace(event_name: str, info: Dict[str, Any]) -> None:
+        _record_trace(stats, event_name)
+
+    def on_request(request: httpx.Request) -> None:
+        stats.requests += 1
+        request.extensions["trace"] = trace
+        _start_timer(request)
+
+    def on_response(response: httpx.Response) -> None:
+        _observe(key_env, response)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+class OpenAIClientRegistry:
+    """키 환경 변수 이름 → (비동기/동기) OpenAI 클라이언트"""
+
+    def __init__(self):
+        self._async: Dict[str, _Entry] = {}
+        self._sync: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._retired = []
+
+    def _current_key(self, key_env: str) -> Optional[str]:
+        return os.environ.get(key_env)
+
+    def _build_async(self, key_env: str, api_key: str, stats: ClientStats) -> AsyncOpenAI:
+        return AsyncOpenAI(
+            api_key=api_key,
+            timeout=_setting(key_env, "TIMEOUT_SEC", 60),
+            max_retries=int(_setting(key_env, "SDK_MAX_RETRIES", 0)),
+            http_client=DefaultAsyncHttpxClient(limits=_limits(key_env), event_hooks=_async_hooks(key_env, stats)),
+        )
+
+    def _build_sync(self, key_env: str, api_key: str, stats: ClientStats) -> OpenAI:
+        return OpenAI(
+            api_key=api_key,
+            timeout=_setting(key_env, "TIMEOUT_SEC", 60),
+            max_retries=int(_setting(key_env, "SDK_MAX_RETRIES", 0)),
+            http_client=DefaultHttpxClient(limits=_limits(key_env), event_hooks=_sync_hooks(key_env, stats)),
+        )
+
+    def _get(self, table: Dict[str, _Entry], key_env: str, builder) -> Optional[Any]:
+        api_key = self._current_key(key_env)
+        if not api_key:
+            return None
+
+        entry = table.get(key_env)
+        if entry is not None and entry.api_key == api_key:
+            return entry.client
+
+        with self._lock:
+            entry = table.get(key_env)
+            if entry is not None and entry.api_key == api_key:
+                return entry.client
+
+            stats = ClientStats()
+            if entry is not None:
+                stats.rotations = entry.stats.rotations + 1
+                self._retire(entry)
+                logger.info("OpenAI 키 교체 감지 → 새 클라이언트 생성: %s", key_env)
+            client = builder(key_env, api_key, stats)
+            table[key_env] = _Entry(api_key, client, stats)
+            logger.info("OpenAI 클라이언트 초기화 완료: %s", key_env)
+            return client
+
+    def _retire(self, entry: _Entry) -> None:
+        """이전 클라이언트는 진행 중인 요청이 끝날 시간을 준 뒤 닫습니다."""
+        self._retired.append(entry)
+
+        async def close_later():
+            await asyncio.sleep(ROTATION_GRACE_SEC)
+            await _close(entry.client)
+            if entry in self._retired:
+                self._retired.remove(entry)
+
+        try:
+            asyncio.get_running_loop().create_task(close_later())
+        except RuntimeError:
+            pass  # 이벤트 루프 밖(동기 경로)에서는 종료 시 close_all에서 정리
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    def get_async_client(self, key_env: str) -> Optional[AsyncOpenAI]:
+        """키가 설정되어 있지 않으면 None을 반환합니다."""
+        return self._get(self._async, key_env, self._build_async)
+
+    def get_sync_client(self, key_env: str) -> Optional[OpenAI]:
+        return self._get(self._sync, key_env, self._build_sync)
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        for kind, table in (("async", self._async), ("sync", self._sync)):
+            for key_env, entry in table.items():
+                result[f"{kind}:{key_env}"] = entry.stats.as_dict()
+        return result
+
+    async def close_all(self) -> None:
+        entries = list(self._async.values()) + list(self._sync.values()) + list(self._retired)
+        self._async.clear()
+        self._sync.clear()
+        self._retired.clear()
+        for entry in entries:
+            await _close(entry.client)
+
+
+async def _close(client: Any) -> None:
+    try:
+        result = client.close()
+        if asyncio.iscoroutine(result):
+            await result
+    except Exception:
+        logger.warning("OpenAI 클라이언트 종료 중 오류", exc_info=True)
+
+
+registry = OpenAIClientRegistry()
+
+get_async_client = registry.get_async_client
+get_sync_client = registry.get_sync_client
@@ -0,0 +1,141 @@
+# pipeline.py
+# ================================================================
+# LLM 단계(Stage) 실행기
+# - 단계 간 의존성(DAG)을 기준으로 서로 독립적인 단계를 동시에 실행합니다.
+# - 단계별 타임아웃, 실패 시 대체값(fallback), 단계별 지연 시간을 기록합니다.
+# ================================================================
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 단계 상태값
+STAGE_OK = "ok"
+STAGE_FAILED = "failed"
+STAGE_TIMEOUT = "timeout"
+STAGE_SKIPPED = "skipped"
+
+
+@dataclass
+class Stage:
+    """파이프라인 한 단계. func는 의존 단계들의 결과 dict를 받아 실행됩니다."""
+    name: str
+    func: Callable[[Dict[str, Any]], Awaitable[Any]]
+    depends_on: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    fallback: Any = None
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str
+    output: Any = None
+    error: Optional[str] = None
+    latency_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STAGE_OK
+
+
+@dataclass
+class PipelineResult:
+    stages: Dict[str, StageResult] = field(default_factory=dict)
+    total_ms: float = 0.0
+
+    def output(self, name: str) -> Any:
+        """단계 결과를 반환합니다. 실패/스킵된 단계는 fallback 값이 들어 있습니다."""
+        return self.stages[name].output
+
+    def latencies(self) -> Dict[str, float]:
+        return {name: round(r.latency_ms, 1) for name, r in self.stages.items()}
+
+    def server_timing(self) -> str:
+        """Server-Timing 응답 헤더 값 (브라우저/프록시에서 단계별 지연 확인용)"""
+        parts = [f"{name};dur={r.latency_ms:.1f}" for name, r in self.stages.items()]
+        parts.append(f"total;dur={self.total_ms:.1f}")
+        return ", ".join(parts)
+
+
+def _validate(stages: List[Stage]) -> None:
+    """단계 이름 중복, 정의되지 않은 의존성, 순환 의존성을 검사합니다."""
+    names = [s.name for s in stages]
+    if len(names) != len(set(names)):
+        raise ValueError(f"중복된 단계 이름이 있습니다: {names}")
+
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        for dep in s.depends_on:
+            if dep not in by_name:
+                raise ValueError(f"'{s.name}' 단계가 정의되지 않은 단계 '{dep}'에 의존합니다.")
+
+    visiting, done = set(), set()
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"순환 의존성이 있습니다: '{name}'")
+        visiting.add(name)
+        for dep in by_name[name].depends_on:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in names:
+        visit(name)
+
+
+async def run_pipeline(stages: List[Stage]) -> PipelineResult:
+    """
+    의존성이 충족된 단계부터 동시에 실행합니다.
+    - 의존 단계가 실패/타임아웃이면 해당 단계는 실행하지 않고 fallback으로 채웁니다(skipped).
+    - 한 단계의 실패가 다른 독립 단계의 실행을 막지 않습니다(부분 결과 반환).
+    """
+    _validate(stages)
+
+    result = PipelineResult()
+    tasks: Dict[str, asyncio.Task] = {}
+    pipeline_started = time.perf_counter()
+
+    async def execute(stage: Stage) -> StageResult:
+        dep_results = [await tasks[dep] for dep in stage.depends_on]
+        failed_deps = [r.name for r in dep_results if not r.ok]
+        if failed_deps:
+            return StageResult(stage.name, STAGE_SKIPPED, stage.fallback,
+                               error=f"선행 단계 실패: {', '.join(failed_deps)}")
+
+        inputs = {r.name: r.output for r in dep_results}
+        started = time.perf_counter()
+        try:
+            output = await asyncio.wait_for(stage.func(inputs), timeout=stage.timeout)
+            status, error = STAGE_OK, None
+        except asyncio.TimeoutError:
+            output, status, error = stage.fallback, STAGE_TIMEOUT, f"{stage.timeout}초 타임아웃"
+        except Exception as e:
+            logger.error("파이프라인 단계 실패: %s", stage.name, exc_info=True)
+            output, status, error = stage.fallback, STAGE_FAILED, f"{type(e).__name__}: {e}"
+        latency_ms = (time.perf_counter() - started) * 1000
+        return StageResult(stage.name, status, output, error, latency_ms)
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.create_task(execute(stage))
+
+    try:
+        for stage in stages:
+            result.stages[stage.name] = await tasks[stage.name]
+    except BaseException:
+        # 기다리던 쪽이 취소되면(클라이언트 연결 끊김, SSE 중단, 작업 타임아웃) 남은 단계의 LLM 호출도 멈춥니다.
+        pending = [task for task in tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        raise
+
+    result.total_ms = (time.perf_counter() - pipeline_started) * 1000
+    return result
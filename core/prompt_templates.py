@@ -0,0 +1,41 @@
+# prompt_templates.py
+# ================================================================
+# 프롬프트 템플릿 (provider 측 prompt caching 친화적인 배치)
+# - 고정 지시문은 system 메시지로 항상 맨 앞에 둡니다. → 호출마다 동일한 prefix가 되어 캐시 적중
+# - 요청마다 바뀌는 값(이력서, 피드백 등)은 그 뒤 user 메시지에만 넣습니다.
+# - 템플릿은 모듈 import 시점에 한 번 컴파일하고, 요청 시에는 값만 치환합니다.
+# ================================================================
+
+import hashlib
+from string import Template
+from typing import Dict, List
+
+
+class PromptTemplate:
+    """고정 system prefix + 가변 user 템플릿(string.Template, $name 자리표시자)"""
+
+    def __init__(self, name: str, system: str, user_template: str):
+        self.name = name
+        self.system = system
+        self._user = Template(user_template)
+        # 미리 자리표시자를 검사해 잘못된 템플릿은 import 시점에 바로 실패시킵니다.
+        self.placeholders = frozenset(
+            m.group("named") or m.group("braced")
+            for m in Template.pattern.finditer(user_template)
+            if m.group("named") or m.group("braced")
+        )
+        # 모니터링용: prefix가 바뀌면(배포 등) 캐시가 초기화되었음을 알 수 있도록
+        self.prefix_id = hashlib.sha256(system.encode("utf-8")).hexdigest()[:12]
+
+    def render_user(self, **values: str) -> str:
+        missing = self.placeholders - values.keys()
+        if missing:
+            raise KeyError(f"프롬프트 '{self.name}'에 필요한 값이 없습니다: {sorted(missing)}")
+        return self._user.substitute(values)
+
+    def render(self, **values: str) -> List[Dict[str, str]]:
+        """[system(고정), user(가변)] 메시지 목록"""
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.render_user(**values)},
+        ]
@@ -0,0 +1,228 @@
+# question_bank.py
+# ================================================================
+# (전공, 직무)별 면접 질문 은행
+# - 자소서가 없는 요청은 결과가 전공/직무에만 의존하므로, 미리 만들어 둔 질문 풀에서 무작위로 뽑아 응답합니다.
+# - 저장소: SQLite 파일 (같은 호스트의 모든 gunicorn 워커가 공유, 오프라인 pre-warm 작업과도 공유)
+# - 풀이 오래되었거나(stale) 작으면 응답은 그대로 하고, 백그라운드에서 LLM으로 보충합니다.
+# - SQLite 접근은 블로킹 I/O이므로 공개 API는 async이고 내부에서 스레드로 실행합니다.
+# ================================================================
+
+import time
+import sqlite3
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.metrics import EventCounters
+from core.rate_limit import BACKGROUND, request_priority
+from core.sqlite_store import connect, init_schema
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_pair(major: str, job_title: str) -> Tuple[str, str]:
+    """공백/대소문자 차이만 있는 (전공, 직무)가 같은 풀을 쓰도록 정규화합니다."""
+    return " ".join(major.split()).lower(), " ".join(job_title.split()).lower()
+
+
+class QuestionBank:
+    """(전공, 직무)별 질문 풀을 SQLite에 보관하고 무작위 샘플링합니다."""
+
+    def __init__(
+        self,
+        sqlite_path: Optional[str],
+        stale_sec: float = 7 * 86400,
+        min_pool: int = 15,
+        max_pool: int = 60,
+    ):
+        self.sqlite_path = sqlite_path or None
+        self.stale_sec = stale_sec
+        self.min_pool = min_pool
+        self.max_pool = max_pool
+
+        self._refilling: set = set()
+        self._counters = EventCounters("question_bank", (
+            "hits", "misses", "stale_hits", "refills", "refill_errors", "disk_errors",
+        ))
+
+        if self.sqlite_path:
+            try:
+                self._init_disk()
+            except sqlite3.Error:
+                logger.error("질문 은행 SQLite 초기화 실패 → 질문 은행을 사용하지 않습니다.", exc_info=True)
+                self.sqlite_path = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sqlite_path)
+
+    # ------------------------------------------------------------------
+    # SQLite (블로킹 I/O이므로 스레드에서 실행)
+    # ------------------------------------------------------------------
+    def _init_disk(self) -> None:
+        init_schema(
+            self.sqlite_path,
+            "CREATE TABLE IF NOT EXISTS question_pool ("
+            " major_key TEXT NOT NULL, job_key TEXT NOT NULL, question TEXT NOT NULL,"
+            " created_at REAL NOT NULL, PRIMARY KEY (major_key, job_key, question))",
+            "CREATE TABLE IF NOT EXISTS question_pool_meta ("
+            " major_key TEXT NOT NULL, job_key TEXT NOT NULL,"
+            " major TEXT NOT NULL, job_title TEXT NOT NULL,"
+            " refreshed_at REAL NOT NULL, requests INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (major_key, job_key))",
+        )
+
+    def _disk_sample(
+        self, major_key: str, job_key: str, k: int, count_request: bool
+    ) -> Tuple[Optional[tuple], int, List[tuple]]:
+        with connect(self.sqlite_path) as conn:
+            meta = conn.execute(
+                "SELECT refreshed_at FROM question_pool_meta WHERE major_key = ? AND job_key = ?",
+                (major_key, job_key),
+            ).fetchone()
+            if meta is not None and count_request:
+                conn.execute(
+                    "UPDATE question_pool_meta SET requests = requests + 1 WHERE major_key = ? AND job_key = ?",
+                    (major_key, job_key),
+                )
+            pool_size = conn.execute(
+                "SELECT COUNT(*) FROM question_pool WHERE major_key = ? AND job_key = ?",
+                (major_key, job_key),
+            ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT question FROM question_pool WHERE major_key = ? AND job_key = ?"
+                " ORDER BY RANDOM() LIMIT ?",
+                (major_key, job_key, k),
+            ).fetchall() if pool_size >= k else []
+        return meta, pool_size, rows
+
+    def _disk_add(self, major: str, job_title: str, questions: List[str]) -> int:
+        major_key, job_key = normalize_pair(major, job_title)
+        now = time.time()
+        with connect(self.sqlite_path) as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO question_pool (major_key, job_key, question, created_at) VALUES (?, ?, ?, ?)",
+                [(major_key, job_key, q, now) for q in questions],
+            )
+            conn.execute(
+                "DELETE FROM question_pool WHERE major_key = ? AND job_key = ? AND question IN ("
+                " SELECT question FROM question_pool WHERE major_key = ? AND job_key = ?"
+                " ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (major_key, job_key, major_key, job_key, self.max_pool),
+            )
+            conn.execute(
+                "INSERT INTO question_pool_meta (major_key, job_key, major, job_title, refreshed_at)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(major_key, job_key) DO UPDATE SET refreshed_at = excluded.refreshed_at",
+                (major_key, job_key, major.strip(), job_title.strip(), now),
+            )
+            return conn.execute(
+                "SELECT COUNT(*) FROM question_pool WHERE major_key = ? AND job_key = ?",
+                (major_key, job_key),
+            ).fetchone()[0]
+
+    def _disk_pairs(self, limit: Optional[int]) -> List[tuple]:
+        with connect(self.sqlite_path) as conn:
+            return conn.execute(
+                "SELECT m.major, m.job_title, m.refreshed_at, m.requests,"
+                " (SELECT COUNT(*) FROM question_pool p WHERE p.major_key = m.major_key AND p.job_key = m.job_key)"
+                " FROM question_pool_meta m ORDER BY m.requests DESC LIMIT ?",
+                (limit if limit is not None else -1,),
+            ).fetchall()
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    async def sample(
+        self, major: str, job_title: str, k: int, count_request: bool = True
+    ) -> Tuple[Optional[List[str]], bool]:
+        """
+        풀에서 k개를 무작위로 뽑습니다. → (질문 목록 | None, 보충 필요 여부)
+        풀이 k개보다 작으면 (None, True)를 반환하여 호출 측이 LLM을 직접 호출하게 합니다.
+        count_request=False면 요청 수/적중 카운터를 올리지 않습니다. (pre-warm 작업용)
+        """
+        if not self.enabled:
+            return None, False
+
+        major_key, job_key = normalize_pair(major, job_title)
+        try:
+            meta, pool_size, rows = await asyncio.to_thread(
+                self._disk_sample, major_key, job_key, k, count_request
+            )
+        except sqlite3.Error:
+            logger.warning("질문 은행 조회 실패", exc_info=True)
+            self._counters["disk_errors"] += 1
+            return None, False
+
+        if len(rows) < k:
+            if count_request:
+                self._counters["misses"] += 1
+            return None, True
+
+        stale = meta is None or meta[0] + self.stale_sec < time.time()
+        needs_refill = stale or pool_size < self.min_pool
+        if count_request:
+            self._counters["hits"] += 1
+            if stale:
+                self._counters["stale_hits"] += 1
+        return [r[0] for r in rows], needs_refill
+
+    async def add(self, major: str, job_title: str, questions: Iterable[str]) -> int:
+        """질문을 풀에 추가하고, max_pool을 넘는 오래된 질문은 지웁니다. → 현재 풀 크기"""
+        if not self.enabled:
+            return 0
+        cleaned = [q.strip() for q in questions if q and q.strip()]
+        return await asyncio.to_thread(self._disk_add, major, job_title, cleaned)
+
+    async def refill(
+        self, major: str, job_title: str, generate: Callable[[str, str], Awaitable[Optional[List[str]]]]
+    ) -> None:
+        """
+        await generate(major, job_title) → 질문 목록 | None 으로 풀을 보충합니다.
+        같은 (전공, 직무)에 대한 보충이 이 프로세스에서 이미 진행 중이면 건너뜁니다.
+        """
+        pair = normalize_pair(major, job_title)
+        if pair in self._refilling:
+            return
+        self._refilling.add(pair)
+        try:
+            try:
+                # 보충은 응답과 무관한 백그라운드 작업이므로 호출 한도를 대화형 요청에 양보합니다.
+                with request_priority(BACKGROUND):
+                    questions = await generate(major, job_title)
+            except Exception as e:
+                # 업스트림 장애(서킷 브레이커 열림 등)는 다음 요청 때 다시 보충을 시도합니다.
+                logger.warning("질문 은행 보충용 생성 실패: (%s, %s) %s - %s", major, job_title, type(e).__name__, e)
+                questions = None
+            if not questions:
+                self._counters["refill_errors"] += 1
+                return
+            size = await self.add(major, job_title, questions)
+            self._counters["refills"] += 1
+            logger.info("질문 은행 보충: (%s, %s) → 풀 %s개", major, job_title, size)
+        except sqlite3.Error:
+            logger.warning("질문 은행 저장 실패", exc_info=True)
+            self._counters["disk_errors"] += 1
+        finally:
+            self._refilling.discard(pair)
+
+    async def pairs(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """요청 수가 많은 순으로 (전공, 직무) 목록을 반환합니다. (pre-warm 작업이 재보충 대상을 고를 때 사용)"""
+        if not self.enabled:
+            return []
+        rows = await asyncio.to_thread(self._disk_pairs, limit)
+        return [
+            {"major": r[0], "job_title": r[1], "refreshed_at": r[2], "requests": r[3], "pool_size": r[4]}
+            for r in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            "enabled": self.enabled,
+            "stale_sec": self.stale_sec,
+            "min_pool": self.min_pool,
+            "max_pool": self.max_pool,
+        }
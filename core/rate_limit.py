@@ -0,0 +1,363 @@
+# rate_limit.py
+# ================================================================
+# API 키 × 모델별 토큰 버킷 (요청 수 RPM + 토큰 수 TPM) + 우선순위 대기
+# - gunicorn 워커들이 각자 업스트림을 호출하면 계정 한도(RPM/TPM)를 모르고 한꺼번에 보내 429가 쏟아집니다.
+#   호출 전에 버킷에서 요청 1건과 추정 토큰(입력 + 최대 출력)을 꺼내고, 모자라면 채워질 때까지 잠깐 기다립니다.
+# - 버킷 상태는 SQLite 파일에 두어 같은 호스트의 모든 워커가 공유합니다. (RATE_LIMIT_SQLITE_PATH, 비우면 워커 안에서만)
+#   키 값의 해시로 버킷을 나누므로, 서로 다른 환경 변수에 같은 키가 들어 있으면 같은 버킷을 씁니다.
+# - 우선순위: INTERACTIVE(STT, 면접 분석, 질문 생성) > BATCH(세션 배치 분석, /jobs 작업) > BACKGROUND(질문 은행 보충)
+#   · 같은 워커 안: 버킷이 모자랄 때 높은 우선순위 대기자부터 들어갑니다.
+#   · 워커 사이: 낮은 우선순위는 버킷을 끝까지 쓰지 못하고 용량의 일부(reserve)를 대화형 요청 몫으로 남깁니다.
+#   우선순위는 contextvar로 전달합니다. (with request_priority(BACKGROUND): ...)
+# - 429를 받으면 Retry-After 동안 그 버킷을 막아 다른 워커도 같이 기다립니다.
+# - 최대 대기 시간 안에 자리가 나지 않으면 OverloadedError(503 + Retry-After)
+#
+# 설정
+#   OPENAI_RATE_LIMITS: {"<키 환경 변수 | *>:<모델 | *>": {"rpm": ..., "tpm": ...}} JSON
+#     (예: {"QUESTION_VOICE_OPENAI_KEY:whisper-1": {"rpm": 50}, "*:*": {"rpm": 500, "tpm": 200000}})
+#     찾는 순서: 키:모델 → 키:* → *:모델 → *:*, 값이 없거나 0이면 그 항목은 제한하지 않습니다.
+#     지정하지 않으면 아무 호출도 제한하지 않습니다. (계정 한도를 모르는 채로 임의 한도를 두면 한도보다 먼저 503이 남)
+#   RATE_LIMIT_MAX_WAIT_SEC / RATE_LIMIT_BATCH_MAX_WAIT_SEC / RATE_LIMIT_BACKGROUND_MAX_WAIT_SEC (10 / 60 / 300)
+#   RATE_LIMIT_BATCH_RESERVE / RATE_LIMIT_BACKGROUND_RESERVE (0.1 / 0.3)
+#   RATE_LIMIT_BURST_SEC (기본 10): 버킷 용량 = 분당 한도의 이 초만큼. 제공자는 1분보다 짧은 구간으로도
+#     한도를 나눠 적용하므로, 1분치를 한꺼번에 보내지 않도록 순간 허용량을 줄입니다.
+# ================================================================
+
+import os
+import json
+import math
+import time
+import heapq
+import sqlite3
+import asyncio
+import hashlib
+import itertools
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from core.concurrency import OverloadedError
+from core.metrics import record_rate_limit_rejected, record_rate_limit_throttled, record_rate_limit_wait
+from core.sqlite_store import connect, init_schema
+
+logger = logging.getLogger(__name__)
+
+# 우선순위 (작을수록 먼저)
+INTERACTIVE = 0
+BATCH = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch", BACKGROUND: "background"}
+
+# 계정 등급에 맞는 한도를 OPENAI_RATE_LIMITS로 지정합니다. (기본값: 제한 없음)
+DEFAULT_RATE_LIMITS: Dict[str, Dict[str, float]] = {}
+
+RATE_LIMIT_SQLITE_PATH = os.environ.get("RATE_LIMIT_SQLITE_PATH", "")
+MAX_WAIT_SEC = {
+    INTERACTIVE: float(os.environ.get("RATE_LIMIT_MAX_WAIT_SEC", 10)),
+    BATCH: float(os.environ.get("RATE_LIMIT_BATCH_MAX_WAIT_SEC", 60)),
+    BACKGROUND: float(os.environ.get("RATE_LIMIT_BACKGROUND_MAX_WAIT_SEC", 300)),
+}
+RESERVE_RATIO = {
+    INTERACTIVE: 0.0,
+    BATCH: float(os.environ.get("RATE_LIMIT_BATCH_RESERVE", 0.1)),
+    BACKGROUND: float(os.environ.get("RATE_LIMIT_BACKGROUND_RESERVE", 0.3)),
+}
+BURST_SEC = float(os.environ.get("RATE_LIMIT_BURST_SEC", 10))
+# 최대 출력 토큰을 지정하지 않은 호출의 출력 토큰 추정치
+DEFAULT_OUTPUT_TOKENS = int(os.environ.get("RATE_LIMIT_DEFAULT_OUTPUT_TOKENS", 1000))
+
+# 버킷이 모자라 기다릴 때 다시 확인하는 최대 간격 (다른 워커가 429로 막거나 우선순위가 바뀌는 것을 반영)
+_RECHECK_SEC = 0.5
+
+request_priority_var: ContextVar[int] = ContextVar("request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """이 블록 안에서 나가는 업스트림 호출의 우선순위를 정합니다. (asyncio 태스크에도 그대로 전달됨)"""
+    token = request_priority_var.set(priority)
+    try:
+        yield
+    finally:
+        request_priority_var.reset(token)
+
+
+def estimate_tokens(prompt: Union[str, List[Dict[str, Any]]], max_output_tokens: Optional[int] = None,
+                    model: str = "gpt-4o-mini") -> int:
+    """OpenAI가 TPM에 세는 방식대로 입력 토큰 + 최대 출력 토큰을 추정합니다."""
+    # token_budget → upstream → rate_limit 순으로 import하므로 여기서 가져옵니다. (순환 import 방지)
+    from core.token_budget import count_tokens
+    if isinstance(prompt, str):
+        prompt_tokens = count_tokens(prompt, model)
+    else:
+        prompt_tokens = sum(count_tokens(str(m.get("content") or ""), model) + 4 for m in prompt)
+    return prompt_tokens + (max_output_tokens if max_output_tokens is not None else DEFAULT_OUTPUT_TOKENS)
+
+
+@dataclass(frozen=True)
+class Limit:
+    rpm: float = 0.0
+    tpm: float = 0.0
+    burst_sec: float = BURST_SEC
+
+    @property
+    def request_capacity(self) -> float:
+        return self.rpm * self.burst_sec / 60
+
+    @property
+    def token_capacity(self) -> float:
+        return self.tpm * self.burst_sec / 60
+
+
+def _load_limits() -> Dict[str, Limit]:
+    raw = os.environ.get("OPENAI_RATE_LIMITS")
+    config = DEFAULT_RATE_LIMITS
+    if raw:
+        try:
+            config = json.loads(raw)
+        except ValueError:
+            logger.error("OPENAI_RATE_LIMITS JSON 파싱 실패 → 호출을 제한하지 않습니다.", exc_info=True)
+    return {key: Limit(float(v.get("rpm") or 0), float(v.get("tpm") or 0)) for key, v in config.items()}
+
+
+def _take(state: Optional[Tuple[float, float, float, float]], limit: Limit, cost: int, reserve: float,
+          now: float) -> Tuple[Tuple[float, float, float, float], float]:
+    """버킷 상태 (requests, tokens, updated_at, blocked_until)를 채우고 꺼냅니다. → (새 상태, 기다릴 초, 0이면 통과)"""
+    request_cap, token_cap = limit.request_capacity, limit.token_capacity
+    if state is None:
+        requests, tokens, updated_at, blocked_until = request_cap, token_cap, now, 0.0
+    else:
+        requests, tokens, updated_at, blocked_until = state
+    elapsed = max(0.0, now - updated_at)
+    requests = min(request_cap, requests + elapsed * limit.rpm / 60)
+    tokens = min(token_cap, tokens + elapsed * limit.tpm / 60)
+
+    if blocked_until > now:
+        return (requests, tokens, now, blocked_until), blocked_until - now
+
+    wait = 0.0
+    if limit.rpm:
+        # 용량이 1건보다 작게 잡혀도 1건은 들어갈 수 있게 합니다.
+        need = min(1.0, request_cap) + reserve * request_cap
+        if requests < need:
+            wait = max(wait, (need - requests) * 60 / limit.rpm)
+    if limit.tpm:
+        # 버킷보다 큰 요청은 가득 찼을 때 통과시킵니다. (영원히 못 들어가는 것 방지)
+        need = min(cost, token_cap * (1 - reserve)) + reserve * token_cap
+        if tokens < need:
+            wait = max(wait, (need - tokens) * 60 / limit.tpm)
+    if wait == 0.0:
+        requests -= 1 if limit.rpm else 0
+        tokens -= cost if limit.tpm else 0
+    return (requests, tokens, now, blocked_until), wait
+
+
+class _Waiters:
+    """같은 버킷을 기다리는 이 워커의 요청들 (우선순위, 도착 순). 맨 앞 한 건만 버킷을 확인합니다."""
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._changed = asyncio.Event()
+
+    def enter(self, priority: int) -> Tuple[int, int]:
+        ticket = (priority, next(self._seq))
+        heapq.heappush(self._heap, ticket)
+        return ticket
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    async def wait_turn(self, ticket: Tuple[int, int], timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while self._heap[0] != ticket:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=min(remaining, _RECHECK_SEC))
+            except asyncio.TimeoutError:
+                pass
+        return True
+
+    def leave(self, ticket: Tuple[int, int]) -> None:
+        self._heap.remove(ticket)
+        heapq.heapify(self._heap)
+        # 기다리던 요청들을 깨워 새 맨 앞이 버킷을 확인하게 합니다.
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+
+class RateLimiter:
+    """키 × 모델별 토큰 버킷. 상태는 SQLite(워커 공유) 또는 프로세스 메모리에 둡니다."""
+
+    def __init__(self, sqlite_path: Optional[str] = RATE_LIMIT_SQLITE_PATH, limits: Optional[Dict[str, Limit]] = None):
+        self.sqlite_path = sqlite_path or None
+        self.limits = limits if limits is not None else _load_limits()
+        self._memory: Dict[str, Tuple[float, float, float, float]] = {}
+        self._memory_lock = threading.Lock()
+        self._waiters: Dict[str, _Waiters] = {}
+        self._counters: Dict[str, Dict[str, Any]] = {}
+
+        if self.sqlite_path:
+            try:
+                self._init_disk()
+            except sqlite3.Error:
+                logger.error("속도 제한 SQLite 초기화 실패 → 워커 안에서만 제한합니다.", exc_info=True)
+                self.sqlite_path = None
+
+    def limit_for(self, upstream: str, model: str) -> Optional[Limit]:
+        for key in (f"{upstream}:{model}", f"{upstream}:*", f"*:{model}", "*:*"):
+            limit = self.limits.get(key)
+            if limit is not None:
+                return limit if (limit.rpm or limit.tpm) else None
+        return None
+
+    @staticmethod
+    def bucket_name(upstream: str, model: str) -> str:
+        # 같은 키가 여러 환경 변수에 들어 있어도 계정 한도는 하나이므로 키 값으로 버킷을 나눕니다.
+        key = os.environ.get(upstream)
+        key_id = hashlib.sha256(key.encode()).hexdigest()[:12] if key else upstream
+        return f"{key_id}:{model}"
+
+    # ------------------------------------------------------------------
+    # 버킷 저장소 (SQLite는 블로킹 I/O이므로 스레드에서 실행)
+    # ------------------------------------------------------------------
+    def _init_disk(self) -> None:
+        init_schema(
+            self.sqlite_path,
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            " name TEXT PRIMARY KEY, requests REAL NOT NULL, tokens REAL NOT NULL,"
+            " updated_at REAL NOT NULL, blocked_until REAL NOT NULL)",
+        )
+
+    def _disk_update(self, name: str, fn) -> Any:
+        # 읽고-계산하고-쓰는 동안 다른 워커가 끼어들지 않도록 쓰기 잠금을 먼저 잡습니다.
+        with connect(self.sqlite_path, immediate=True) as conn:
+            row = conn.execute(
+                "SELECT requests, tokens, updated_at, blocked_until FROM rate_buckets WHERE name = ?", (name,)
+            ).fetchone()
+            state, value = fn(tuple(row) if row else None)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (name, requests, tokens, updated_at, blocked_until)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (name, *state),
+            )
+            return value
+
+    def _memory_update(self, name: str, fn) -> Any:
+        with self._memory_lock:
+            state, value = fn(self._memory.get(name))
+            self._memory[name] = state
+            return value
+
+    async def _update(self, name: str, fn) -> Any:
+        if self.sqlite_path:
+            try:
+                return await asyncio.to_thread(self._disk_update, name, fn)
+            except sqlite3.Error:
+                logger.warning("속도 제한 버킷 갱신 실패 → 이 워커의 버킷으로 대신합니다.", exc_info=True)
+        return self._memory_update(name, fn)
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    async def acquire(self, upstream: str, model: Optional[str], tokens: int = 0,
+                      priority: Optional[int] = None) -> float:
+        """요청 1건과 tokens만큼 자리가 날 때까지 기다립니다. → 기다린 초. 최대 대기 시간을 넘기면 OverloadedError"""
+        model = model or "*"
+        limit = self.limit_for(upstream, model)
+        if limit is None:
+            return 0.0
+        priority = request_priority_var.get() if priority is None else priority
+        name = self.bucket_name(upstream, model)
+        reserve = RESERVE_RATIO.get(priority, 0.0)
+        counters = self._counters.setdefault(f"{upstream}:{model}", {
+            "acquired": 0, "waited": 0, "wait_sec_total": 0.0, "rejected": 0, "throttled_429": 0,
+        })
+
+        waiters = self._waiters.setdefault(name, _Waiters())
+        ticket = waiters.enter(priority)
+        started = time.monotonic()
+        deadline = started + MAX_WAIT_SEC.get(priority, MAX_WAIT_SEC[INTERACTIVE])
+        try:
+            while True:
+                if not await waiters.wait_turn(ticket, deadline - time.monotonic()):
+                    self._reject(counters, model, priority, _RECHECK_SEC * len(waiters))
+                wait = await self._update(
+                    name, lambda state: _take(state, limit, tokens, reserve, time.time())
+                )
+                if wait <= 0:
+                    break
+                remaining = deadline - time.monotonic()
+                if wait > remaining:
+                    # 최대 대기 시간 안에 채워지지 않으므로 바로 거절합니다.
+                    self._reject(counters, model, priority, wait)
+                await asyncio.sleep(min(wait, _RECHECK_SEC))
+        finally:
+            waiters.leave(ticket)
+            if not len(waiters):
+                self._waiters.pop(name, None)
+
+        waited = time.monotonic() - started
+        counters["acquired"] += 1
+        if waited > 0.001:
+            counters["waited"] += 1
+            counters["wait_sec_total"] += waited
+        record_rate_limit_wait(model, PRIORITY_NAMES.get(priority, str(priority)), waited)
+        return waited
+
+    def _reject(self, counters: Dict[str, Any], model: str, priority: int, retry_after: float) -> None:
+        counters["rejected"] += 1
+        record_rate_limit_rejected(model, PRIORITY_NAMES.get(priority, str(priority)))
+        raise OverloadedError("rate_limit", max(1, math.ceil(retry_after)),
+                              message="AI 제공자 호출 한도에 도달했습니다. 잠시 후 다시 시도해 주세요.")
+
+    async def throttle(self, upstream: str, model: Optional[str], retry_after_sec: float) -> None:
+        """429를 받았으면 retry_after_sec 동안 버킷을 막아 모든 워커가 같이 기다리게 합니다."""
+        model = model or "*"
+        limit = self.limit_for(upstream, model)
+        if limit is None:
+            return
+        counters = self._counters.get(f"{upstream}:{model}")
+        if counters is not None:
+            counters["throttled_429"] += 1
+        record_rate_limit_throttled(model)
+
+        def block(state):
+            now = time.time()
+            # 처음 보는 버킷은 _take와 같이 가득 찬 용량(분당 한도 × BURST_SEC)에서 시작합니다.
+            requests, tokens, updated_at, blocked_until = (
+                state or (limit.request_capacity, limit.token_capacity, now, 0.0)
+            )
+            return (requests, tokens, updated_at, max(blocked_until, now + retry_after_sec)), None
+
+        await self._update(self.bucket_name(upstream, model), block)
+
+    def stats(self) -> Dict[str, Any]:
+        buckets = {}
+        for key, c in self._counters.items():
+            upstream, model = key.split(":", 1)
+            limit = self.limit_for(upstream, model)
+            buckets[key] = {
+                **c,
+                "wait_sec_total": round(c["wait_sec_total"], 3),
+                "avg_wait_sec": round(c["wait_sec_total"] / c["waited"], 3) if c["waited"] else 0.0,
+                "rpm": limit.rpm if limit else None,
+                "tpm": limit.tpm if limit else None,
+            }
+        return {
+            "shared_across_workers": bool(self.sqlite_path),
+            "waiting": {name: len(w) for name, w in self._waiters.items()},
+            "buckets": buckets,
+        }
+
+
+limiter = RateLimiter()
+
+
+def rate_limit_stats() -> Dict[str, Any]:
+    return limiter.stats()
@@ -0,0 +1,192 @@
+# response_cache.py
+# ================================================================
+# 결정적(temperature=0) LLM 응답 캐시
+# - 키: 정규화된 프롬프트 메시지 + 모델 ID(+ 호출 파라미터)의 SHA-256 해시
+# - 1차: 프로세스 내 LRU (TTL / 최대 개수)
+# - 2차(선택): SQLite 파일 → 같은 호스트의 모든 gunicorn 워커가 공유
+# ================================================================
+
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from core.metrics import EventCounters
+from core.sqlite_store import connect, init_schema
+
+logger = logging.getLogger(__name__)
+
+# SQLite 정리(만료/개수 초과 삭제)를 몇 번의 set마다 수행할지
+_DISK_PRUNE_EVERY = 200
+
+
+def _normalize_text(text: Any) -> Any:
+    """공백 차이만 있는 프롬프트가 같은 키를 갖도록 연속 공백을 하나로 줄입니다."""
+    if isinstance(text, str):
+        return " ".join(text.split())
+    return text
+
+
+def make_cache_key(model: str, messages: List[Dict[str, Any]], **params: Any) -> str:
+    """정규화된 메시지 + 모델 ID + 호출 파라미터로 content-addressed 키를 만듭니다."""
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": m.get("role"), "content": _normalize_text(m.get("content"))}
+            for m in messages
+        ],
+        "params": params,
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """프로세스 내 LRU + 선택적 SQLite 공유 계층으로 구성된 2단 캐시"""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        ttl_sec: float = 86400,
+        sqlite_path: Optional[str] = None,
+        disk_max_entries: int = 100_000,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.sqlite_path = sqlite_path or None
+        self.disk_max_entries = disk_max_entries
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_sets = 0
+        self._counters = EventCounters("response_cache", (
+            "memory_hits", "disk_hits", "misses", "sets", "evictions", "expired", "disk_errors",
+        ), name=name)
+
+        if self.sqlite_path:
+            try:
+                self._init_disk()
+            except sqlite3.Error:
+                logger.error("[%s] SQLite 캐시 초기화 실패 → 메모리 캐시만 사용합니다.", name, exc_info=True)
+                self.sqlite_path = None
+
+    # ------------------------------------------------------------------
+    # 메모리(LRU) 계층
+    # ------------------------------------------------------------------
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._memory[key]
+                self._counters["expired"] += 1
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_set(self, key: str, value: str, expires_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    # ------------------------------------------------------------------
+    # SQLite 계층 (블로킹 I/O이므로 스레드에서 실행)
+    # ------------------------------------------------------------------
+    def _init_disk(self) -> None:
+        init_schema(
+            self.sqlite_path,
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)",
+        )
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        now = time.time()
+        with connect(self.sqlite_path) as conn:
+            row = conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return row
+
+    def _disk_set(self, key: str, value: str, expires_at: float) -> None:
+        now = time.time()
+        with connect(self.sqlite_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            self._disk_sets += 1
+            if self._disk_sets % _DISK_PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    " SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.disk_max_entries,),
+                )
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    async def get(self, key: str) -> Optional[str]:
+        value = self._memory_get(key)
+        if value is not None:
+            self._counters["memory_hits"] += 1
+            return value
+
+        if self.sqlite_path:
+            try:
+                row = await asyncio.to_thread(self._disk_get, key)
+            except sqlite3.Error:
+                logger.warning("[%s] SQLite 캐시 조회 실패", self.name, exc_info=True)
+                self._counters["disk_errors"] += 1
+                row = None
+            if row is not None:
+                value, expires_at = row
+                self._memory_set(key, value, expires_at)
+                self._counters["disk_hits"] += 1
+                return value
+
+        self._counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl_sec
+        self._memory_set(key, value, expires_at)
+        self._counters["sets"] += 1
+
+        if self.sqlite_path:
+            try:
+                await asyncio.to_thread(self._disk_set, key, value, expires_at)
+            except sqlite3.Error:
+                logger.warning("[%s] SQLite 캐시 저장 실패", self.name, exc_info=True)
+                self._counters["disk_errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+        lookups = hits + self._counters["misses"]
+        return {
+            "name": self.name,
+            **self._counters,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_size": len(self._memory),
+            "max_entries": self.max_entries,
+            "ttl_sec": self.ttl_sec,
+            "disk_enabled": bool(self.sqlite_path),
+        }
@@ -0,0 +1,165 @@
+# resume_history.py
+# ================================================================
+# 사용자별 이전 이력서 제출 기록 (수정 후 재검토 시 바뀐 항목만 다시 분석)
+# - 이력서를 경험/활동 항목 단위(segment)로 나누고, 항목 지문(fingerprint)별로 피드백/재생성 결과를 보관합니다.
+# - 같은 사용자가 다시 제출하면 지문이 같은 항목은 저장된 결과를 쓰고, 바뀐/새 항목만 LLM으로 분석합니다.
+# - 항목 경계는 내용으로 정합니다(content-defined). 한 항목을 고쳐도 나머지 항목의 경계와 지문은 그대로입니다.
+# - 저장소: SQLite 파일 (같은 호스트의 모든 gunicorn 워커가 공유), 사용자당 마지막 제출 하나만 보관
+# - SQLite 접근은 블로킹 I/O이므로 공개 API는 async이고 내부에서 스레드로 실행합니다.
+# ================================================================
+
+import re
+import json
+import time
+import zlib
+import sqlite3
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from core.metrics import EventCounters
+from core.sqlite_store import connect, init_schema
+
+logger = logging.getLogger(__name__)
+
+# 항목 머리 표시: 글머리 기호, [제목]/【제목】, "1." "2)" 번호. 이 앞에서 단위를 나눕니다.
+# (입력은 text_normalize로 개행이 공백 하나로 바뀐 상태이므로 줄 단위가 아니라 표시 기호로 찾습니다)
+_HEADER_RE = re.compile(r"(?:^|(?<=\s))(?=[■□▶▷◆◇●○▪※]|\[[^\]]{1,40}\]|【|\d{1,2}[.)]\s)")
+_BULLET_RE = re.compile(r"(?:^|(?<=\s))(?=[•·\-–]\s)")
+# 문장 끝 (한국어 "~다." 포함)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _units(text: str) -> List[tuple]:
+    """(단위 텍스트, 항목 머리 여부) 목록. 항목 머리/글머리 기호와 문장 끝에서 나눕니다."""
+    units = []
+    for block in _HEADER_RE.split(text):
+        block = block.strip()
+        if not block:
+            continue
+        first = True
+        for piece in _BULLET_RE.split(block):
+            for sentence in _SENTENCE_RE.split(piece.strip()):
+                sentence = sentence.strip()
+                if sentence:
+                    units.append((sentence, first))
+                    first = False
+    return units
+
+
+def split_segments(text: str, min_chars: int = 250, max_chars: int = 800) -> List[str]:
+    """
+    이력서를 항목 단위로 나눕니다.
+    - 항목 머리([프로젝트명], ■, 1. 등) 앞에서는 앞 항목이 짧지 않으면 항상 나눕니다.
+    - 그 밖의 경계는 min_chars를 넘긴 뒤 문장 내용의 해시로 정합니다. (앞부분 길이가 바뀌어도 경계가 밀리지 않음)
+    - max_chars를 넘기면 강제로 나눕니다.
+    """
+    segments, current, size = [], [], 0
+    for unit, is_header in _units(text):
+        if current:
+            boundary = (
+                (is_header and size >= min_chars // 3)
+                or (size >= min_chars and zlib.crc32(unit.encode("utf-8")) % 3 == 0)
+                or size + len(unit) > max_chars
+            )
+            if boundary:
+                segments.append(" ".join(current))
+                current, size = [], 0
+        current.append(unit)
+        size += len(unit) + 1
+    if current:
+        segments.append(" ".join(current))
+    return segments
+
+
+class ResumeHistory:
+    """사용자별 마지막 제출의 항목 지문 → 결과(dict)를 SQLite에 보관합니다."""
+
+    def __init__(self, sqlite_path: Optional[str], ttl_sec: float = 30 * 86400):
+        self.sqlite_path = sqlite_path or None
+        self.ttl_sec = ttl_sec
+
+        self._counters = EventCounters("resume_history", (
+            "submissions", "revisions", "segments", "segments_reused", "saves", "disk_errors",
+        ))
+
+        if self.sqlite_path:
+            try:
+                self._init_disk()
+            except sqlite3.Error:
+                logger.error("이력서 제출 기록 SQLite 초기화 실패 → 항목 단위 재사용을 하지 않습니다.", exc_info=True)
+                self.sqlite_path = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sqlite_path)
+
+    # ------------------------------------------------------------------
+    # SQLite (블로킹 I/O이므로 스레드에서 실행)
+    # ------------------------------------------------------------------
+    def _init_disk(self) -> None:
+        init_schema(
+            self.sqlite_path,
+            "CREATE TABLE IF NOT EXISTS resume_history ("
+            " user_id INTEGER PRIMARY KEY, segments TEXT NOT NULL, updated_at REAL NOT NULL)",
+        )
+
+    def _disk_load(self, user_id: int) -> Optional[str]:
+        with connect(self.sqlite_path) as conn:
+            row = conn.execute(
+                "SELECT segments FROM resume_history WHERE user_id = ? AND updated_at >= ?",
+                (user_id, time.time() - self.ttl_sec),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _disk_save(self, user_id: int, segments: str) -> None:
+        now = time.time()
+        with connect(self.sqlite_path) as conn:
+            conn.execute(
+                "INSERT INTO resume_history (user_id, segments, updated_at) VALUES (?, ?, ?)"
+                " ON CONFLICT(user_id) DO UPDATE SET segments = excluded.segments, updated_at = excluded.updated_at",
+                (user_id, segments, now),
+            )
+            conn.execute("DELETE FROM resume_history WHERE updated_at < ?", (now - self.ttl_sec,))
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    async def load(self, user_id: int) -> Dict[str, Dict[str, Any]]:
+        """사용자의 마지막 제출에서 저장한 {항목 지문: 결과}. 기록이 없거나 읽지 못하면 빈 dict"""
+        if not self.enabled:
+            return {}
+        try:
+            raw = await asyncio.to_thread(self._disk_load, user_id)
+        except sqlite3.Error:
+            logger.warning("이력서 제출 기록 조회 실패", exc_info=True)
+            self._counters["disk_errors"] += 1
+            return {}
+        return json.loads(raw) if raw else {}
+
+    async def save(self, user_id: int, results: Dict[str, Dict[str, Any]]) -> None:
+        """이번 제출의 항목 결과로 사용자 기록을 바꿉니다. (이번 제출에 없는 이전 항목은 지웁니다)"""
+        if not self.enabled:
+            return
+        try:
+            await asyncio.to_thread(self._disk_save, user_id, json.dumps(results, ensure_ascii=False))
+            self._counters["saves"] += 1
+        except sqlite3.Error:
+            logger.warning("이력서 제출 기록 저장 실패", exc_info=True)
+            self._counters["disk_errors"] += 1
+
+    def record(self, segments: int, reused: int, revision: bool) -> None:
+        self._counters["submissions"] += 1
+        self._counters["segments"] += segments
+        self._counters["segments_reused"] += reused
+        if revision:
+            self._counters["revisions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        segments = self._counters["segments"]
+        return {
+            **self._counters,
+            "reuse_ratio": round(self._counters["segments_reused"] / segments, 4) if segments else 0.0,
+            "enabled": self.enabled,
+            "ttl_sec": self.ttl_sec,
+        }
@@ -0,0 +1,220 @@
+# singleflight.py
+# ================================================================
+# 동일 요청 합치기 (single-flight)
+# - 같은 지문(fingerprint)의 LLM 작업이 이미 진행 중이면 새로 호출하지 않고 그 결과를 함께 기다립니다.
+#   (더블 클릭, 스프링 백엔드의 타임아웃 재시도로 같은 요청이 동시에 들어오는 경우)
+# - 같은 워커: asyncio.Future 공유
+# - 다른 워커: SQLite 잠금 행(INSERT OR IGNORE)으로 한 워커만 실행하고, 나머지는 결과 행이 기록될 때까지 기다립니다.
+#   실행한 워커가 실패하면 결과를 남기지 않으므로, 기다리던 워커는 스스로 다시 실행합니다. (오류는 공유하지 않음)
+#   잠금을 잡은 워커가 죽으면 lock_ttl_sec 뒤에 잠금을 무시합니다.
+# - 완료된 뒤 들어온 요청은 합치지 않습니다. (캐시가 아님: 결과 행은 기다리던 요청만 읽고, 1분 뒤 지웁니다)
+# - 설정: SINGLEFLIGHT_SQLITE_PATH (비우면 워커 안에서만 합침. gunicorn 멀티 워커면 같은 파일을 지정)
+# ================================================================
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from core.metrics import EventCounters
+from core.sqlite_store import connect, init_schema
+
+logger = logging.getLogger(__name__)
+
+SINGLEFLIGHT_SQLITE_PATH = os.environ.get("SINGLEFLIGHT_SQLITE_PATH", "")
+
+# 결과 행 보관 시간 (기다리던 워커가 읽을 시간만 있으면 됩니다)
+_RESULT_TTL_SEC = 60.0
+
+# singleflight_stats()용 (이름 → 인스턴스)
+_flights: Dict[str, "SingleFlight"] = {}
+
+
+def fingerprint(*parts: Any) -> str:
+    """요청 내용(JSON 직렬화 가능한 값들)의 SHA-256 지문"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """지문별로 진행 중인 작업을 하나로 합칩니다. 결과는 encode/decode로 워커 간에 전달합니다."""
+
+    def __init__(
+        self,
+        name: str,
+        sqlite_path: Optional[str] = SINGLEFLIGHT_SQLITE_PATH,
+        wait_timeout_sec: float = 120.0,
+        poll_interval_sec: float = 0.05,
+        encode: Callable[[Any], str] = json.dumps,
+        decode: Callable[[str], Any] = json.loads,
+    ):
+        self.name = name
+        self.sqlite_path = sqlite_path or None
+        self.wait_timeout_sec = wait_timeout_sec
+        self.lock_ttl_sec = wait_timeout_sec
+        self.poll_interval_sec = poll_interval_sec
+        self.encode = encode
+        self.decode = decode
+
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        _flights[name] = self
+        self._counters = EventCounters("singleflight", (
+            "calls", "executed", "coalesced_local", "coalesced_remote", "remote_fallbacks", "disk_errors",
+        ), name=name)
+
+        if self.sqlite_path:
+            try:
+                self._init_disk()
+            except sqlite3.Error:
+                logger.error("[%s] single-flight SQLite 초기화 실패 → 워커 안에서만 합칩니다.", name, exc_info=True)
+                self.sqlite_path = None
+
+    # ------------------------------------------------------------------
+    # SQLite (블로킹 I/O이므로 스레드에서 실행)
+    # ------------------------------------------------------------------
+    def _init_disk(self) -> None:
+        init_schema(
+            self.sqlite_path,
+            "CREATE TABLE IF NOT EXISTS singleflight_lock ("
+            " key TEXT PRIMARY KEY, owner TEXT NOT NULL, acquired_at REAL NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS singleflight_result ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, finished_at REAL NOT NULL)",
+        )
+
+    def _disk_acquire(self, key: str, owner: str) -> bool:
+        now = time.time()
+        with connect(self.sqlite_path) as conn:
+            # 죽은 워커가 남긴 잠금은 무시합니다.
+            conn.execute("DELETE FROM singleflight_lock WHERE key = ? AND acquired_at < ?",
+                         (key, now - self.lock_ttl_sec))
+            cur = conn.execute("INSERT OR IGNORE INTO singleflight_lock (key, owner, acquired_at) VALUES (?, ?, ?)",
+                               (key, owner, now))
+            return cur.rowcount == 1
+
+    def _disk_publish_and_release(self, key: str, owner: str, value: Optional[str]) -> None:
+        now = time.time()
+        with connect(self.sqlite_path) as conn:
+            if value is not None:
+                conn.execute("INSERT OR REPLACE INTO singleflight_result (key, value, finished_at) VALUES (?, ?, ?)",
+                             (key, value, now))
+                conn.execute("DELETE FROM singleflight_result WHERE finished_at < ?", (now - _RESULT_TTL_SEC,))
+            conn.execute("DELETE FROM singleflight_lock WHERE key = ? AND owner = ?", (key, owner))
+
+    def _disk_poll(self, key: str, since: float):
+        """→ ("done", value) | ("running", None) | ("gone", None)"""
+        with connect(self.sqlite_path) as conn:
+            row = conn.execute("SELECT value FROM singleflight_result WHERE key = ? AND finished_at >= ?",
+                               (key, since)).fetchone()
+            if row is not None:
+                return "done", row[0]
+            lock = conn.execute("SELECT acquired_at FROM singleflight_lock WHERE key = ?", (key,)).fetchone()
+        if lock is None or lock[0] < time.time() - self.lock_ttl_sec:
+            return "gone", None
+        return "running", None
+
+    # ------------------------------------------------------------------
+    # 워커 간 합치기
+    # ------------------------------------------------------------------
+    async def _execute(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self._counters["executed"] += 1
+        return await fn()
+
+    async def _run_shared(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.sqlite_path:
+            return await self._execute(fn)
+
+        owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+        # 잠금을 못 잡았다면 그 시점에 실행 중인 작업의 결과만 받습니다. (이전에 끝난 작업의 결과는 무시)
+        attempted_at = time.time()
+        try:
+            acquired = await asyncio.to_thread(self._disk_acquire, key, owner)
+        except sqlite3.Error:
+            logger.warning("[%s] single-flight 잠금 실패 → 그대로 실행합니다.", self.name, exc_info=True)
+            self._counters["disk_errors"] += 1
+            return await self._execute(fn)
+
+        if acquired:
+            value = None
+            try:
+                result = await self._execute(fn)
+                value = self.encode(result)
+                return result
+            finally:
+                try:
+                    await asyncio.to_thread(self._disk_publish_and_release, key, owner, value)
+                except sqlite3.Error:
+                    logger.warning("[%s] single-flight 결과 기록 실패", self.name, exc_info=True)
+                    self._counters["disk_errors"] += 1
+
+        # 다른 워커가 실행 중: 결과가 기록되거나 잠금이 풀릴 때까지 기다립니다.
+        deadline = time.monotonic() + self.wait_timeout_sec
+        while time.monotonic() < deadline:
+            try:
+                state, value = await asyncio.to_thread(self._disk_poll, key, attempted_at)
+            except sqlite3.Error:
+                self._counters["disk_errors"] += 1
+                break
+            if state == "done":
+                self._counters["coalesced_remote"] += 1
+                return self.decode(value)
+            if state == "gone":
+                break
+            await asyncio.sleep(self.poll_interval_sec)
+
+        # 실행하던 워커가 실패했거나(결과 없음) 너무 오래 걸리면 직접 실행합니다.
+        self._counters["remote_fallbacks"] += 1
+        return await self._execute(fn)
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """같은 key의 작업이 진행 중이면 그 결과를, 아니면 fn()을 실행한 결과를 반환합니다."""
+        self._counters["calls"] += 1
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._counters["coalesced_local"] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # 먼저 시작한 요청이 취소(클라이언트 연결 끊김)되었으면 직접 실행합니다.
+                return await self._execute(fn)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._run_shared(key, fn)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 기다리는 요청이 없어도 "never retrieved" 경고가 나지 않도록
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        coalesced = self._counters["coalesced_local"] + self._counters["coalesced_remote"]
+        return {
+            "name": self.name,
+            "shared_across_workers": bool(self.sqlite_path),
+            **self._counters,
+            "in_flight": len(self._in_flight),
+            "coalesced_ratio": round(coalesced / self._counters["calls"], 4) if self._counters["calls"] else 0.0,
+        }
+
+
+def singleflight_stats() -> Dict[str, Any]:
+    """이름별 합치기 카운터 (coalesced_local + coalesced_remote = LLM을 호출하지 않은 요청 수)"""
+    return {name: flight.stats() for name, flight in _flights.items()}
@@ -0,0 +1,159 @@
+# speech_features.py
+# ================================================================
+# 면접 답변 전사(transcript)의 발화 지표를 LLM 없이 계산합니다.
+# - 간투사(어, 음, 그, 약간 …): 모듈 import 시 한 번 컴파일한 정규식(긴 말 우선 alternation)으로 한 번에 찾습니다.
+#   CPython에서는 순수 파이썬 Aho-Corasick 오토마톤보다 C로 도는 re 한 번이 더 빠릅니다.
+#   (benchmarks/bench_speech_features.py 참고)
+#   * 어절 경계에서 시작/끝나는 것만 셉니다. ("어떤", "음악", "약간의"는 제외)
+#   * "어어어", "음음"처럼 같은 글자를 늘인 것은 한 번으로 셉니다.
+#   * "그", "막", "뭐", "이제"처럼 일반 단어로도 쓰이는 말은 뒤에 쉼표/말줄임/문장 끝이 오거나
+#     다른 간투사·같은 말이 이어질 때만 셉니다. ("그 프로젝트는"의 "그"는 제외)
+# - 반복: 같은 어절/두 어절이 바로 이어서 반복된 횟수 ("저는 저는")
+# - 말 속도: 녹음 길이(ms)가 있으면 분당 음절 수
+# - 결과는 AnswerAnalysisResult의 fillerCount/timeMs를 확정하고, 모델 프롬프트에 짧은 힌트로 들어갑니다.
+# ================================================================
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# 어절 경계와 상관없이 항상 간투사로 보는 말
+FILLERS = (
+    "어", "음", "으음", "흠", "아", "에", "엄", "저기", "약간", "뭐랄까", "뭐라고 할까", "뭐라고 해야 할까",
+    "그러니까 뭐", "그 뭐냐", "뭐냐면",
+)
+# 일반 단어로도 쓰이므로 뒤에 쉼 표시나 다른 간투사가 올 때만 세는 말
+PAUSE_FILLERS = ("그", "뭐", "막", "이제", "좀", "그냥", "그러니까", "이렇게", "저", "그게")
+
+# 쉼으로 보는 문장 부호
+_PAUSE_MARKS = frozenset(",.…?!")
+_SPACES_RE = re.compile(r"\s*")
+
+# 보통 한국어 발표 속도(분당 음절). 이 범위를 벗어나면 유창성 추정치를 깎습니다.
+NORMAL_SPM = (200, 400)
+
+
+class FillerMatcher:
+    """간투사 사전을 정규식 하나로 컴파일해 전사문을 한 번만 훑어 찾습니다."""
+
+    def __init__(self, fillers, pause_fillers):
+        # 긴 말부터 시도해야 "그 뭐냐"가 "그"보다 먼저 잡힙니다. 패턴마다 그룹 하나 (m.lastindex로 구분)
+        self.patterns: List[str] = sorted(dict.fromkeys([*fillers, *pause_fillers]), key=len, reverse=True)
+        self.needs_pause = [p in pause_fillers and p not in fillers for p in self.patterns]
+        # 어절 경계(앞뒤가 글자/숫자가 아님)에서만, 마지막 글자를 늘인 형태("어어어", "음음")까지 한 번으로
+        alternatives = "|".join(f"({re.escape(p)}{re.escape(p[-1])}*)" for p in self.patterns)
+        self._regex = re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)")
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """겹치지 않는 간투사 (시작, 끝, 간투사). 같은 위치면 가장 긴 것을 고릅니다."""
+        chosen = [(m.start(), m.end(), m.lastindex - 1) for m in self._regex.finditer(text)]
+        starts = {start for start, _, _ in chosen}
+        result = []
+        for start, end, index in chosen:
+            if self.needs_pause[index]:
+                next_start = _SPACES_RE.match(text, end).end()
+                paused = (
+                    next_start == len(text)
+                    or text[next_start] in _PAUSE_MARKS
+                    or next_start in starts
+                    or text.startswith(self.patterns[index] + " ", next_start)
+                )
+                if not paused:
+                    continue
+            result.append((start, end, self.patterns[index]))
+        return result
+
+
+_matcher = FillerMatcher(FILLERS, PAUSE_FILLERS)
+
+_HANGUL_RE = re.compile(r"[가-힣]")
+# 한글이 아닌 영숫자 덩어리 (영어 단어/숫자는 한 덩어리를 한 음절로)
+_OTHER_RUN_RE = re.compile(r"(?:(?![가-힣])\w)+")
+_WORD_RE = re.compile(r"\w+")
+
+
+def _count_syllables(text: str) -> int:
+    return len(_HANGUL_RE.findall(text)) + len(_OTHER_RUN_RE.findall(text))
+
+
+def _count_repetitions(words: List[str]) -> int:
+    """바로 이어서 반복된 어절("저는 저는")과 두 어절("그래서 저는 그래서 저는") 수"""
+    repeats, i = 0, 1
+    while i < len(words):
+        if words[i] == words[i - 1]:
+            repeats += 1
+            i += 1
+        elif i >= 3 and words[i - 1:i + 1] == words[i - 3:i - 1]:
+            repeats += 1
+            i += 2
+        else:
+            i += 1
+    return repeats
+
+
+@dataclass
+class SpeechFeatures:
+    filler_count: int
+    fillers: Dict[str, int] = field(default_factory=dict)
+    word_count: int = 0
+    syllable_count: int = 0
+    repetition_count: int = 0
+    duration_ms: Optional[int] = None
+
+    @property
+    def filler_ratio(self) -> float:
+        return self.filler_count / self.word_count if self.word_count else 0.0
+
+    @property
+    def syllables_per_minute(self) -> Optional[float]:
+        if not self.duration_ms:
+            return None
+        return self.syllable_count / (self.duration_ms / 60000)
+
+    def fluency_estimate(self) -> int:
+        """간투사 비율, 반복, 말 속도로 낸 1~5 유창성 추정치 (모델 판단의 참고값, 빈 답변은 0)"""
+        if not self.word_count:
+            return 0
+        score = 5
+        ratio = self.filler_ratio
+        score -= 3 if ratio > 0.2 else 2 if ratio > 0.1 else 1 if ratio > 0.05 else 0
+        score -= min(2, self.repetition_count // 2)
+        spm = self.syllables_per_minute
+        if spm is not None and not NORMAL_SPM[0] <= spm <= NORMAL_SPM[1]:
+            score -= 1
+        return max(1, score)
+
+    def to_hint(self) -> str:
+        """프롬프트에 넣을 한 줄 요약 (예: 간투사 5회(어 3, 음 2), 반복 1회, 어절 84개, 312음절/분, 42.0초, 유창성 추정 4/5)"""
+        top = ", ".join(f"{word} {count}" for word, count in Counter(self.fillers).most_common(3))
+        parts = [f"간투사 {self.filler_count}회" + (f"({top})" if top else ""),
+                 f"반복 {self.repetition_count}회", f"어절 {self.word_count}개"]
+        if self.duration_ms:
+            parts.append(f"{self.syllables_per_minute:.0f}음절/분")
+            parts.append(f"{self.duration_ms / 1000:.1f}초")
+        parts.append(f"유창성 추정 {self.fluency_estimate()}/5")
+        return ", ".join(parts)
+
+
+def extract_speech_features(transcript: str, duration_ms: Optional[int] = None) -> SpeechFeatures:
+    """전사문(text_normalize로 정규화된 한 줄)에서 발화 지표를 계산합니다."""
+    matches = _matcher.find(transcript)
+    fillers = Counter(word for _, _, word in matches)
+
+    # 반복은 간투사를 뺀 나머지 어절로 셉니다. ("어 어"는 간투사 2회로 이미 셌으므로)
+    rest, last = [], 0
+    for start, end, _ in matches:
+        rest.append(transcript[last:start])
+        last = end
+    rest.append(transcript[last:])
+    words = _WORD_RE.findall(" ".join(rest))
+
+    return SpeechFeatures(
+        filler_count=sum(fillers.values()),
+        fillers=dict(fillers),
+        word_count=len(transcript.split()),
+        syllable_count=_count_syllables(transcript),
+        repetition_count=_count_repetitions(words),
+        duration_ms=duration_ms or None,
+    )
@@ -0,0 +1,63 @@
+# sqlite_store.py
+# ================================================================
+# 워커 공유 SQLite 파일 접근 공통 부분
+# (응답 캐시, single-flight, 질문 은행, 이력서 제출 기록, 작업 큐, 속도 제한 버킷)
+# - connect: 잠금 대기(BUSY_TIMEOUT_SEC) + PRAGMA 설정 후, 정상 종료 시 commit / 예외 시 rollback, 항상 close
+#   immediate=True면 BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡습니다. (읽고-계산하고-쓰는 동안 다른 워커가 끼어들지 않음)
+# - init_schema: WAL 저널 모드로 전환(파일에 한 번 설정하면 유지)하고 테이블/인덱스를 만듭니다.
+#   WAL: 읽기와 쓰기가 서로 막지 않으므로 여러 워커가 같은 파일을 동시에 읽고 씁니다.
+# - synchronous=NORMAL: WAL에서는 커밋마다 fsync하지 않습니다. (전원 장애 시 마지막 커밋만 잃을 수 있고 파일은 손상되지 않음)
+# - 블로킹 I/O이므로 이벤트 루프에서는 asyncio.to_thread로 부릅니다. (각 모듈의 _disk_* 메서드)
+# ================================================================
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+# 다른 워커가 쓰기 잠금을 잡고 있을 때 기다리는 시간(초). 넘기면 sqlite3.OperationalError
+BUSY_TIMEOUT_SEC = float(os.environ.get("SQLITE_BUSY_TIMEOUT_SEC", 5))
+
+
+def _open(path: str, autocommit: bool = False, row_factory: Optional[Any] = None) -> sqlite3.Connection:
+    if autocommit:
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SEC, isolation_level=None)
+    else:
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SEC)
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+@contextmanager
+def connect(path: str, immediate: bool = False, row_factory: Optional[Any] = None) -> Iterator[sqlite3.Connection]:
+    """트랜잭션 하나를 여는 연결. with 블록을 벗어나면 commit(예외 시 rollback)하고 닫습니다."""
+    conn = _open(path, autocommit=immediate, row_factory=row_factory)
+    try:
+        if not immediate:
+            with conn:  # 정상 종료 시 commit, 예외 시 rollback
+                yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def init_schema(path: str, *statements: str) -> None:
+    """WAL 모드로 전환하고 CREATE ... IF NOT EXISTS 문을 실행합니다. (실패하면 sqlite3.Error)"""
+    conn = _open(path, autocommit=True)
+    try:
+        # 저널 모드는 트랜잭션 밖에서만 바꿀 수 있습니다.
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+    with connect(path) as conn:
+        for statement in statements:
+            conn.execute(statement)
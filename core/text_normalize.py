@@ -0,0 +1,38 @@
+# text_normalize.py
+# ================================================================
+# 사용자 입력 텍스트 정규화 (이력서/자소서/면접 답변 공통)
+# - 둥근 따옴표 → 곧은 따옴표, NBSP/제로폭 공백 정리, 연속 공백(개행/탭 포함) → 공백 하나
+# - CPython에서는 str.replace / str.split이 C 수준 고속 탐색(memchr)을 쓰므로,
+#   str.translate(dict)나 정규식 치환보다 훨씬 빠릅니다. (benchmarks/bench_text_normalize.py 참고)
+#   → 치환 표를 한 번만 훑되, 실제로 들어 있는 문자만 replace 하고 공백은 split/join으로 접습니다.
+# ================================================================
+
+from typing import Any, Tuple
+
+# (찾을 문자, 바꿀 문자열)
+_REPLACEMENTS: Tuple[Tuple[str, str], ...] = (
+    # 둥근 따옴표
+    ("“", '"'), ("”", '"'), ("„", '"'), ("‟", '"'),
+    ("‘", "'"), ("’", "'"), ("‚", "'"), ("‛", "'"),
+    # 제로폭 문자 (str.split()이 공백으로 보지 않으므로 직접 처리)
+    ("\u200b", " "),  # zero width space (단어 경계에 쓰이므로 공백으로)
+    ("\u200c", ""),   # zero width non-joiner
+    ("\u200d", ""),   # zero width joiner
+    ("\u2060", ""),   # word joiner
+    ("\ufeff", ""),   # BOM
+)
+
+
+def normalize_text(value: str) -> str:
+    """따옴표 통일, 제로폭 공백 정리, 공백(개행/탭/NBSP 포함)을 하나로 줄이고 앞뒤 공백 제거"""
+    if not value.isascii():
+        for target, replacement in _REPLACEMENTS:
+            if target in value:
+                value = value.replace(target, replacement)
+    # 인자 없는 split()은 \n \r \t \xa0 　 등 모든 유니코드 공백에서 나누고 앞뒤 공백을 버립니다.
+    return " ".join(value.split())
+
+
+def normalize_if_str(value: Any) -> Any:
+    """Pydantic mode="before" 검증기용: 문자열이 아니면 그대로 넘겨 타입 검증에 맡깁니다."""
+    return normalize_text(value) if isinstance(value, str) else value
@@ -0,0 +1,211 @@
+# token_budget.py
+# ================================================================
+# 입력 토큰 예산 (긴 이력서/자소서가 모든 프롬프트에 통째로 들어가는 것을 막음)
+# - count_tokens: tiktoken이 있으면 정확히, 없으면 문자 종류별 근사치로 로컬에서 셉니다.
+# - fit_to_budget: 예산을 넘으면 문장/줄 단위로 앞부분(70%)과 뒷부분(30%)을 남기고 가운데를 생략합니다.
+# - ResumeDigester: 긴 이력서를 LLM으로 한 번 요약하고, 내용 해시로 캐시해 답변마다 재사용합니다.
+# - 절감한 토큰 수는 라우트별로 집계합니다. (GET /openai/budget/stats)
+# ================================================================
+
+import re
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.response_cache import ResponseCache, make_cache_key
+from core.token_metrics import record_usage
+from core.metrics import record_tokens_saved
+from core.upstream import RetryPolicy, call_upstream
+from core.rate_limit import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# 예산 초과 시 남길 앞부분 비율 (나머지는 끝부분: 이력서 끝의 최근 경험/기술 스택 보존)
+_HEAD_RATIO = 0.7
+_ELISION = "\n...(중략)...\n"
+_UNIT_RE = re.compile(r"(?<=[.!?。])\s+|\n+")
+_HANGUL_CJK_RE = re.compile(r"[ᄀ-ᇿ㄰-㆏가-힣぀-ヿ一-鿿]")
+
+
+# ------------------------------------------------------------------
+# 토큰 수 계산
+# ------------------------------------------------------------------
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # 인코딩 파일을 내려받지 못하는 환경(오프라인 컨테이너 등)
+        logger.warning("tiktoken 인코딩을 불러오지 못해 근사치로 토큰 수를 계산합니다.", exc_info=True)
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # 근사치: 한글/한자/가나는 글자당 약 1토큰, 그 외(영문/숫자/공백)는 약 4글자당 1토큰
+    wide = len(_HANGUL_CJK_RE.findall(text))
+    return wide + (len(text) - wide + 3) // 4
+
+
+# ------------------------------------------------------------------
+# 예산에 맞게 자르기
+# ------------------------------------------------------------------
+
+def _take(units: List[str], budget: int, model: str, from_end: bool = False) -> List[str]:
+    taken, used = [], 0
+    for unit in (reversed(units) if from_end else units):
+        cost = count_tokens(unit, model) + 1
+        if used + cost > budget:
+            break
+        taken.append(unit)
+        used += cost
+    return list(reversed(taken)) if from_end else taken
+
+
+def _cut_chars(text: str, budget: int, model: str, from_end: bool = False) -> str:
+    """구분자가 없는 긴 덩어리: 토큰/글자 비율로 잘라냅니다."""
+    ratio = budget / max(count_tokens(text, model), 1)
+    size = max(0, int(len(text) * ratio) - 1)
+    return text[len(text) - size:] if from_end else text[:size]
+
+
+def fit_to_budget(text: str, budget: int, model: str = "gpt-4o-mini") -> Tuple[str, int, int]:
+    """예산 안에 들도록 가운데를 생략합니다. → (결과 텍스트, 원래 토큰 수, 결과 토큰 수)"""
+    original = count_tokens(text, model)
+    if original <= budget or budget <= 0:
+        return text, original, original
+
+    units = [u for u in _UNIT_RE.split(text) if u.strip()]
+    head_budget = int(budget * _HEAD_RATIO)
+    tail_budget = budget - head_budget - count_tokens(_ELISION, model)
+
+    head = _take(units, head_budget, model)
+    tail = _take(units[len(head):], tail_budget, model, from_end=True)
+    head_text = "\n".join(head) if head else _cut_chars(units[0], head_budget, model)
+    tail_text = "\n".join(tail) if tail else _cut_chars(units[-1], tail_budget, model, from_end=True)
+
+    result = head_text + _ELISION + tail_text
+    return result, original, count_tokens(result, model)
+
+
+# ------------------------------------------------------------------
+# 절감량 집계
+# ------------------------------------------------------------------
+
+_savings_lock = threading.Lock()
+_savings: Dict[str, Dict[str, int]] = defaultdict(lambda: {
+    "requests": 0,
+    "reduced_requests": 0,
+    "original_tokens": 0,
+    "sent_tokens": 0,
+})
+
+
+def record_budget(route: str, original_tokens: int, sent_tokens: int) -> int:
+    """예산 적용 결과를 집계하고, 이번 요청에서 절감한 토큰 수를 반환합니다."""
+    saved = max(0, original_tokens - sent_tokens)
+    with _savings_lock:
+        bucket = _savings[route]
+        bucket["requests"] += 1
+        bucket["original_tokens"] += original_tokens
+        bucket["sent_tokens"] += sent_tokens
+        if saved:
+            bucket["reduced_requests"] += 1
+    record_tokens_saved(route, saved)
+    if saved:
+        logger.info("[%s] 입력 토큰 예산 적용: %s → %s (절감 %s)", route, original_tokens, sent_tokens, saved)
+    return saved
+
+
+def budget_stats() -> Dict[str, Dict[str, Any]]:
+    with _savings_lock:
+        return {
+            route: {**bucket, "saved_tokens": bucket["original_tokens"] - bucket["sent_tokens"]}
+            for route, bucket in _savings.items()
+        }
+
+
+# ------------------------------------------------------------------
+# 이력서 요약(digest) 캐시
+# ------------------------------------------------------------------
+
+DIGEST_SYSTEM = """사용자 메시지로 지원자의 자기소개서/이력서가 주어집니다.
+면접 답변 평가에 필요한 사실만 남겨 압축해 주세요.
+- 경험/프로젝트, 맡은 역할, 사용 기술, 수치로 된 성과, 지원 동기를 빠짐없이 남깁니다.
+- 수식어, 반복, 일반론은 지웁니다. 없는 내용을 추가하지 않습니다.
+- 한국어 문장으로, 제목이나 머리말 없이 요약문만 출력합니다."""
+
+
+# 요약은 실패해도 잘라내기로 대체되므로 짧게 한 번만 재시도합니다. (RESUME_DIGEST_UPSTREAM_*로 조정)
+DIGEST_RETRY_POLICY = RetryPolicy.from_env("RESUME_DIGEST", timeout_sec=20, max_attempts=2, deadline_sec=30)
+
+
+class ResumeDigester:
+    """긴 이력서를 한 번만 요약하고, 원문 해시를 키로 캐시합니다. (같은 세션의 답변들이 재사용)"""
+
+    def __init__(self, cache: ResponseCache, model: str, target_tokens: int, upstream: str = "resume_digest"):
+        self.cache = cache
+        self.model = model
+        self.target_tokens = target_tokens
+        # 서킷 브레이커 단위 (같은 키를 쓰는 라우터와 공유)
+        self.upstream = upstream
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def _key(self, text: str) -> str:
+        return make_cache_key(self.model, [{"role": "user", "content": text}],
+                              purpose="resume_digest", target_tokens=self.target_tokens)
+
+    async def digest(self, client: Any, text: str) -> Optional[str]:
+        """요약문을 반환합니다. 실패하면 None (호출 측이 fit_to_budget으로 대신 자릅니다)"""
+        key = self._key(text)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # 같은 이력서로 동시에 들어온 답변들(배치 분석)은 요약 호출 하나를 기다립니다.
+        if key in self._in_flight:
+            return await asyncio.shield(self._in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        result = None
+        try:
+            messages = [
+                {"role": "system", "content": DIGEST_SYSTEM},
+                {"role": "user", "content": text},
+            ]
+            response = await call_upstream(
+                self.upstream, "resume_digest",
+                lambda: client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=self.target_tokens,
+                    temperature=0.0,
+                ),
+                DIGEST_RETRY_POLICY,
+                model=self.model, tokens=estimate_tokens(messages, self.target_tokens, self.model),
+            )
+            record_usage("resume_digest", self.model, response.usage)
+            result = (response.choices[0].message.content or "").strip() or None
+            if result:
+                await self.cache.set(key, result)
+        except Exception as e:
+            logger.warning("이력서 요약 실패 → 잘라내기로 대체합니다: %s - %s", type(e).__name__, e)
+        finally:
+            future.set_result(result)
+            self._in_flight.pop(key, None)
+        return result
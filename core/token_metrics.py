@@ -0,0 +1,63 @@
+# token_metrics.py
+# ================================================================
+# LLM 토큰 사용량 집계 (프로세스 단위)
+# - Chat Completions(usage.prompt_tokens ...)와 Responses API(usage.input_tokens ...)를 모두 처리
+# - cached_tokens: provider 측 prompt caching으로 재사용된 입력 토큰 수
+# - 같은 값을 Prometheus 카운터(llm_tokens_total)에도 더합니다. (워커 합산은 /metrics에서)
+# ================================================================
+
+import threading
+from collections import defaultdict
+from typing import Any, Dict
+
+from core.metrics import record_tokens
+
+_lock = threading.Lock()
+_usage: Dict[tuple, Dict[str, int]] = defaultdict(lambda: {
+    "calls": 0,
+    "input_tokens": 0,
+    "cached_input_tokens": 0,
+    "output_tokens": 0,
+})
+
+
+def _get(obj: Any, name: str) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def record_usage(route: str, model: str, usage: Any) -> Dict[str, int]:
+    """응답의 usage 객체를 집계하고, 이번 호출의 토큰 수를 반환합니다. usage가 없으면 호출 수만 셉니다."""
+    input_tokens = _get(usage, "prompt_tokens")
+    if input_tokens is None:
+        input_tokens = _get(usage, "input_tokens")
+    output_tokens = _get(usage, "completion_tokens")
+    if output_tokens is None:
+        output_tokens = _get(usage, "output_tokens")
+    details = _get(usage, "prompt_tokens_details") or _get(usage, "input_tokens_details")
+    cached = _get(details, "cached_tokens")
+
+    this_call = {
+        "input_tokens": int(input_tokens or 0),
+        "cached_input_tokens": int(cached or 0),
+        "output_tokens": int(output_tokens or 0),
+    }
+    with _lock:
+        bucket = _usage[(route, model)]
+        bucket["calls"] += 1
+        for key, value in this_call.items():
+            bucket[key] += value
+    record_tokens(route, model, **this_call)
+    return this_call
+
+
+def usage_stats() -> Dict[str, Dict[str, Any]]:
+    with _lock:
+        result = {}
+        for (route, model), bucket in _usage.items():
+            cache_ratio = bucket["cached_input_tokens"] / bucket["input_tokens"] if bucket["input_tokens"] else 0.0
+            result[f"{route}:{model}"] = {**bucket, "cached_input_ratio": round(cache_ratio, 4)}
+        return result
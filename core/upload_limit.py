@@ -0,0 +1,94 @@
+# upload_limit.py
+# ================================================================
+# 업로드 크기 제한 ASGI 미들웨어
+# - Content-Length 헤더가 한도를 넘으면 본문을 읽기 전에 바로 413 응답
+# - 헤더가 없거나(chunked) 거짓이어도, 본문을 받는 도중 누적 바이트가 한도를 넘으면 즉시 중단
+#   → 큰 파일이 스풀(메모리/디스크)에 다 쌓이기 전에 끊어냅니다.
+# ================================================================
+
+import json
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UploadSizeLimitMiddleware:
+    """경로별 요청 본문 최대 크기(bytes)를 강제합니다. limits 예: {"/voice/analyze": 25 * 1024 * 1024}"""
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.limits:
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = self.limits[scope["path"]]
+
+        # 1) Content-Length로 빠르게 거절
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    if int(value) > max_bytes:
+                        await self._reject(send, max_bytes)
+                        return
+                except ValueError:
+                    pass
+                break
+
+        # 2) 스트리밍 중 누적 크기 검사
+        #    한도를 넘는 순간 413을 직접 보내고, 이후 앱이 보내는 응답(파싱 오류 등)은 버립니다.
+        received = 0
+        rejected = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request" and not rejected:
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    rejected = True
+                    if not response_started:
+                        await self._reject(send, max_bytes)
+                    raise UploadTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+        if rejected:
+            logger.warning("업로드 크기 초과로 중단: path=%s, 수신=%s bytes, 한도=%s bytes", scope['path'], received, max_bytes)
+
+    @staticmethod
+    async def _reject(send, max_bytes: int):
+        body = json.dumps(
+            {"detail": f"업로드 파일이 너무 큽니다. (최대 {max_bytes} bytes)"},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
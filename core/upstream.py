@@ -0,0 +1,328 @@
+# upstream.py
+# ================================================================
+# OpenAI 업스트림 호출 공통 계층 (재시도 / 타임아웃 / 서킷 브레이커)
+# - 시도마다 타임아웃(asyncio.wait_for)을 걸고, 429/408/409/5xx/연결 오류/타임아웃만 재시도합니다.
+#   (400/401/404 같은 요청 자체의 오류는 재시도해도 같으므로 바로 올립니다)
+# - 재시도 간격: 지수 백오프 + full jitter. 서버가 Retry-After(-ms)를 주면 그보다 먼저 다시 보내지 않습니다.
+# - 서킷 브레이커: 업스트림(키)별로 최근 window 동안의 실패 비율이 높으면 일정 시간 호출하지 않고 바로 CircuitOpenError
+#   (→ main_api 예외 핸들러가 503 + Retry-After). 시간이 지나면 한 건만 시험 호출(half-open)해 복구를 확인합니다.
+#   429는 제공자가 살아 있다는 신호이므로 브레이커 실패로 세지 않고 Retry-After만 따릅니다.
+# - 속도 제한: 브레이커를 통과한 시도만 core.rate_limit의 키×모델 토큰 버킷(RPM/TPM)에서 자리를 받은 뒤 보내고,
+#   429를 받으면 Retry-After 동안 그 버킷을 막아 다른 워커도 같이 기다리게 합니다.
+# - SDK 자체 재시도는 openai_clients에서 끄고(SDK_MAX_RETRIES=0) 이 계층에서만 재시도합니다. (재시도 곱셈 방지)
+#
+# 설정 (라우트 접두사별 값이 있으면 우선, 없으면 UPSTREAM_* 공통값, 그 외는 호출 측 기본값)
+#   {PREFIX}_UPSTREAM_TIMEOUT_SEC / UPSTREAM_TIMEOUT_SEC     시도당 타임아웃
+#   {PREFIX}_UPSTREAM_MAX_ATTEMPTS / UPSTREAM_MAX_ATTEMPTS   최대 시도 수 (첫 시도 포함)
+#   {PREFIX}_UPSTREAM_DEADLINE_SEC / UPSTREAM_DEADLINE_SEC   재시도를 포함한 전체 한도
+#   UPSTREAM_BREAKER_WINDOW_SEC (기본 30), UPSTREAM_BREAKER_MIN_CALLS (기본 10),
+#   UPSTREAM_BREAKER_FAILURE_RATIO (기본 0.5), UPSTREAM_BREAKER_OPEN_SEC (기본 30)
+#   (동시 요청이 많으면 "연속 실패 N번"은 일시적인 오류 몇 건에도 열리므로 비율로 판단합니다)
+# ================================================================
+
+import os
+import math
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import openai
+
+from core.concurrency import OverloadedError
+from core.metrics import record_breaker_rejected, record_breaker_state, record_retry
+from core.rate_limit import limiter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BREAKER_WINDOW_SEC = float(os.environ.get("UPSTREAM_BREAKER_WINDOW_SEC", 30))
+BREAKER_MIN_CALLS = int(os.environ.get("UPSTREAM_BREAKER_MIN_CALLS", 10))
+BREAKER_FAILURE_RATIO = float(os.environ.get("UPSTREAM_BREAKER_FAILURE_RATIO", 0.5))
+BREAKER_OPEN_SEC = float(os.environ.get("UPSTREAM_BREAKER_OPEN_SEC", 30))
+
+# 브레이커 상태값
+BREAKER_CLOSED = "closed"
+BREAKER_HALF_OPEN = "half_open"
+BREAKER_OPEN = "open"
+
+
+class UpstreamTimeoutError(Exception):
+    """시도당 타임아웃을 넘겨 재시도를 모두 소진한 경우"""
+
+
+class CircuitOpenError(OverloadedError):
+    """업스트림 장애로 브레이커가 열려 호출하지 않은 상태 (HTTP 503으로 변환됩니다)"""
+
+    def __init__(self, name: str, retry_after_sec: int):
+        super().__init__(name, retry_after_sec,
+                         message=f"{name}: AI 제공자 응답이 불안정해 잠시 호출을 멈췄습니다. 잠시 후 다시 시도해 주세요.")
+
+
+# ------------------------------------------------------------------
+# 재시도 정책
+# ------------------------------------------------------------------
+
+def _env(prefix: str, name: str) -> Optional[str]:
+    return os.environ.get(f"{prefix}_UPSTREAM_{name}") or os.environ.get(f"UPSTREAM_{name}")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    timeout_sec: float = 60.0
+    max_attempts: int = 3
+    base_delay_sec: float = 0.5
+    max_delay_sec: float = 8.0
+    # 재시도를 포함한 전체 한도. 다음 시도까지 기다리면 넘는 경우 재시도하지 않습니다.
+    deadline_sec: Optional[float] = None
+
+    @classmethod
+    def from_env(cls, prefix: str, **defaults: Any) -> "RetryPolicy":
+        policy = cls(**defaults)
+        timeout = _env(prefix, "TIMEOUT_SEC")
+        attempts = _env(prefix, "MAX_ATTEMPTS")
+        deadline = _env(prefix, "DEADLINE_SEC")
+        return cls(
+            timeout_sec=float(timeout) if timeout else policy.timeout_sec,
+            max_attempts=max(1, int(attempts)) if attempts else policy.max_attempts,
+            base_delay_sec=policy.base_delay_sec,
+            max_delay_sec=policy.max_delay_sec,
+            deadline_sec=float(deadline) if deadline else policy.deadline_sec,
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """attempt번째 실패 뒤 기다릴 시간 (full jitter)"""
+        return random.uniform(0, min(self.max_delay_sec, self.base_delay_sec * 2 ** (attempt - 1)))
+
+
+def _failure_reason(exc: BaseException) -> Optional[str]:
+    """재시도할 오류면 사유 라벨, 아니면 None"""
+    if isinstance(exc, (asyncio.TimeoutError, openai.APITimeoutError)):
+        return "timeout"
+    if isinstance(exc, openai.APIConnectionError):
+        return "connection"
+    if isinstance(exc, openai.APIStatusError):
+        if exc.status_code == 429:
+            return "rate_limit"
+        if exc.status_code in (408, 409) or exc.status_code >= 500:
+            return "server_error"
+    return None
+
+
+def _retry_after_sec(exc: BaseException) -> Optional[float]:
+    """Retry-After-Ms / Retry-After(초 또는 HTTP 날짜) 헤더"""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# ------------------------------------------------------------------
+# 서킷 브레이커
+# ------------------------------------------------------------------
+
+class CircuitBreaker:
+    """최근 window_sec 동안 min_calls건 이상 중 실패 비율이 failure_ratio 이상이면 open_sec 동안 열림
+    → 한 건 시험 호출(half-open) → 성공하면 닫힘, 실패하면 다시 열림"""
+
+    def __init__(
+        self,
+        name: str,
+        window_sec: float = BREAKER_WINDOW_SEC,
+        min_calls: int = BREAKER_MIN_CALLS,
+        failure_ratio: float = BREAKER_FAILURE_RATIO,
+        open_sec: float = BREAKER_OPEN_SEC,
+    ):
+        self.name = name
+        self.window_sec = window_sec
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.open_sec = open_sec
+        self.state = BREAKER_CLOSED
+        # (시각, 실패 여부) — window_sec보다 오래된 기록은 버립니다.
+        self._outcomes: deque = deque()
+        self._window_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._counters = {"opened": 0, "rejected": 0, "failures": 0, "successes": 0}
+
+    def _record(self, failed: bool) -> None:
+        now = time.monotonic()
+        self._outcomes.append((now, failed))
+        self._window_failures += failed
+        while self._outcomes and now - self._outcomes[0][0] > self.window_sec:
+            _, old_failed = self._outcomes.popleft()
+            self._window_failures -= old_failed
+
+    def _should_open(self) -> bool:
+        calls = len(self._outcomes)
+        return calls >= self.min_calls and self._window_failures / calls >= self.failure_ratio
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.warning("[%s] 서킷 브레이커 %s → %s", self.name, self.state, state)
+        self.state = state
+        record_breaker_state(self.name, state)
+
+    def before_call(self) -> None:
+        """호출해도 되면 그대로, 아니면 CircuitOpenError"""
+        if self.state == BREAKER_OPEN:
+            remaining = self.open_sec - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                self._reject(remaining)
+            self._set_state(BREAKER_HALF_OPEN)
+        if self.state == BREAKER_HALF_OPEN:
+            if self._probe_in_flight:
+                self._reject(1)
+            self._probe_in_flight = True
+
+    def _reject(self, retry_after: float) -> None:
+        self._counters["rejected"] += 1
+        record_breaker_rejected(self.name)
+        raise CircuitOpenError(self.name, max(1, math.ceil(retry_after)))
+
+    def record_success(self) -> None:
+        """응답을 받았으면(4xx 포함) 제공자는 살아 있는 것으로 봅니다."""
+        self._counters["successes"] += 1
+        self._record(False)
+        self._probe_in_flight = False
+        if self.state != BREAKER_CLOSED:
+            # 복구 확인: 장애 구간의 실패 기록이 곧바로 다시 열지 않도록 창을 비웁니다.
+            self._outcomes.clear()
+            self._window_failures = 0
+            self._set_state(BREAKER_CLOSED)
+
+    def record_failure(self) -> None:
+        self._counters["failures"] += 1
+        self._record(True)
+        self._probe_in_flight = False
+        if self.state == BREAKER_HALF_OPEN or (self.state == BREAKER_CLOSED and self._should_open()):
+            self._counters["opened"] += 1
+            self._opened_at = time.monotonic()
+            self._set_state(BREAKER_OPEN)
+
+    def release(self) -> None:
+        """성공/실패 판정 없이 끝난 호출(취소, 429)의 시험 호출 자리를 돌려줍니다."""
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "window_failures": self._window_failures,
+            "failure_ratio": self.failure_ratio,
+            "open_sec": self.open_sec,
+            **self._counters,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_retry_counters: Dict[str, Dict[str, int]] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+# ------------------------------------------------------------------
+# 호출
+# ------------------------------------------------------------------
+
+async def call_upstream(
+    upstream: str,
+    route: str,
+    factory: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    model: Optional[str] = None,
+    tokens: int = 0,
+) -> T:
+    """
+    factory()로 만든 호출을 정책에 따라 실행합니다.
+    - upstream: 브레이커 단위 (키 환경 변수 이름), route: 재시도 집계 라벨
+    - model / tokens: 속도 제한 버킷과 한 번 호출에 쓸 추정 토큰 (core.rate_limit.estimate_tokens)
+      우선순위는 호출 측 컨텍스트의 request_priority를 따릅니다.
+    - factory는 시도마다 새 코루틴을 만들어야 합니다. (파일 업로드라면 시도 전에 seek(0))
+    """
+    breaker = get_breaker(upstream)
+    counters = _retry_counters.setdefault(route, {"calls": 0, "retries": 0, "gave_up": 0})
+    counters["calls"] += 1
+    started = time.monotonic()
+
+    attempt = 0
+    while True:
+        attempt += 1
+        # 브레이커가 열려 있으면 버킷을 쓰거나 기다리지 않고 바로 503을 돌려줍니다.
+        breaker.before_call()
+        # 재시도도 계정 한도를 쓰므로 시도마다 버킷에서 꺼냅니다. (자리가 안 나면 OverloadedError → 503)
+        try:
+            await limiter.acquire(upstream, model, tokens)
+        except BaseException:
+            breaker.release()
+            raise
+        try:
+            result = await asyncio.wait_for(factory(), timeout=policy.timeout_sec)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            reason = _failure_reason(e)
+            if reason is None:
+                breaker.record_success()
+                raise
+            if reason == "rate_limit":
+                breaker.release()
+            else:
+                breaker.record_failure()
+
+            delay = policy.backoff(attempt)
+            retry_after = _retry_after_sec(e)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            if reason == "rate_limit":
+                await limiter.throttle(upstream, model, delay)
+            elapsed = time.monotonic() - started
+            out_of_time = policy.deadline_sec is not None and elapsed + delay >= policy.deadline_sec
+            if attempt >= policy.max_attempts or out_of_time:
+                counters["gave_up"] += 1
+                logger.warning("[%s] 업스트림 호출 포기 (시도 %s/%s, 사유=%s): %s",
+                               route, attempt, policy.max_attempts, reason, e)
+                if isinstance(e, asyncio.TimeoutError):
+                    # 파이프라인 단계 타임아웃(asyncio.TimeoutError)과 구분되도록 바꿔 올립니다.
+                    raise UpstreamTimeoutError(f"{route}: {policy.timeout_sec}초 안에 응답이 없습니다.") from e
+                raise
+            counters["retries"] += 1
+            record_retry(route, reason)
+            logger.info("[%s] 업스트림 재시도 %.2fs 후 (시도 %s/%s, 사유=%s)",
+                        route, delay, attempt, policy.max_attempts, reason)
+            await asyncio.sleep(delay)
+            continue
+
+        breaker.record_success()
+        return result
+
+
+def upstream_stats() -> Dict[str, Any]:
+    return {
+        "breakers": {name: b.stats() for name, b in _breakers.items()},
+        "routes": {route: dict(c) for route, c in _retry_counters.items()},
+    }
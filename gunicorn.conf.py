@@ -0,0 +1,35 @@
+# gunicorn.conf.py
+# ================================================================
+# Gunicorn 설정 (Dockerfile CMD에서 -c gunicorn.conf.py로 사용)
+# - Prometheus 멀티프로세스 모드: 워커들이 PROMETHEUS_MULTIPROC_DIR에 지표 파일을 쓰고,
+#   /metrics 요청을 받은 워커가 전체를 합산합니다.
+#   * 마스터 시작 시 이전 실행의 지표 파일을 지웁니다. (재시작 후 값이 이어지지 않도록)
+#   * 종료된 워커의 gauge(livesum) 값은 child_exit에서 정리합니다.
+# ================================================================
+
+import os
+import glob
+
+bind = f"{os.environ.get('SERVICE_HOST', '0.0.0.0')}:{os.environ.get('SERVICE_PORT', '8000')}"
+workers = int(os.environ.get("GUNICORN_WORKERS", 4))
+worker_class = "uvicorn.workers.UvicornWorker"
+# LLM 호출/긴 음성 전사를 포함하는 요청이 있으므로 기본 30초보다 넉넉하게 둡니다.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 300))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not multiproc_dir:
+        return
+    os.makedirs(multiproc_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(multiproc_dir, "*.db")):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,360 @@
+# bulk_interview_analysis.py
+# ================================================================
+# 오프라인 대량 면접 분석 작업 (야간 재채점 등)
+# - 입력: AnswerDispatch JSON이 한 줄에 하나씩 들어 있는 JSONL
+# - 출력: {"line", "answerId", "sessionId", "result" | "error"} JSONL (완료되는 대로 추가 기록)
+# - 모드
+#   * concurrent : 제한된 동시성으로 파인튜닝 모델을 직접 호출
+#   * batch      : OpenAI Batch API로 제출 후 완료되면 결과를 내려받음
+# - 체크포인트: 출력 파일(완료된 line 번호)과 <output>.ckpt.json(배치 ID)을 기준으로 재시작 시 이어서 처리
+#
+# 실행 예)
+#   python -m jobs.bulk_interview_analysis --input dispatches.jsonl --output results.jsonl --concurrency 16
+#   python -m jobs.bulk_interview_analysis --input dispatches.jsonl --output results.jsonl --mode batch
+# ================================================================
+
+import os
+import sys
+import json
+import asyncio
+import logging
+import argparse
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from pydantic import ValidationError
+
+from core.logging_setup import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Batch API 입력 파일 한 개당 최대 요청 수 (OpenAI 제한: 50,000)
+BATCH_MAX_REQUESTS = 50000
+
+
+# ------------------------------------------------------------------
+# 체크포인트 / 입출력
+# ------------------------------------------------------------------
+
+def load_done_lines(output_path: str) -> Set[int]:
+    """출력 파일에서 이미 처리된 line 번호를 모읍니다. (중단 시 잘린 마지막 줄은 무시)"""
+    done: Set[int] = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for raw in f:
+            try:
+                done.add(json.loads(raw)["line"])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {"batches": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    """임시 파일에 쓴 뒤 교체하여, 저장 도중 중단되어도 체크포인트가 깨지지 않게 합니다."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ResultWriter:
+    """결과를 한 줄씩 추가 기록하고 즉시 flush합니다. (출력 파일 = 진행 체크포인트)"""
+
+    def __init__(self, path: str):
+        self._truncate_partial_line(path)
+        self._file = open(path, "a", encoding="utf-8")
+        self.written = 0
+
+    @staticmethod
+    def _truncate_partial_line(path: str) -> None:
+        """중단으로 잘린 마지막 줄(개행 없음)을 잘라내 다음 기록이 그 뒤에 붙지 않게 합니다."""
+        if not os.path.exists(path):
+            return
+        with open(path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # 마지막 개행 위치를 뒤에서부터 찾습니다.
+            pos = size - 1
+            while pos > 0:
+                step = min(4096, pos)
+                f.seek(pos - step)
+                chunk = f.read(step)
+                idx = chunk.rfind(b"\n")
+                if idx != -1:
+                    f.truncate(pos - step + idx + 1)
+                    return
+                pos -= step
+            f.truncate(0)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.written += 1
+        if self.written % 100 == 0:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+
+def iter_dispatches(input_path: str, skip: Set[int], writer: ResultWriter) -> Iterator[Tuple[int, Any]]:
+    """입력 JSONL을 한 줄씩 읽어 (line, AnswerDispatch)를 지연 생성합니다. 잘못된 줄은 바로 error로 기록합니다."""
+    from routers.interview_ai import AnswerDispatch
+
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, raw in enumerate(f, start=1):
+            if line_no in skip or not raw.strip():
+                continue
+            try:
+                yield line_no, AnswerDispatch.model_validate_json(raw)
+            except ValidationError as e:
+                writer.write({"line": line_no, "error": f"invalid dispatch: {str(e)[:200]}"})
+
+
+def _record(line_no: int, dispatch: Any, result: Any = None, error: Optional[str] = None) -> Dict[str, Any]:
+    record = {"line": line_no, "answerId": dispatch.answerId, "sessionId": dispatch.meta.id}
+    if error is not None:
+        record["error"] = error
+    else:
+        record["result"] = result.model_dump()
+    return record
+
+
+# ------------------------------------------------------------------
+# concurrent 모드: 제한된 동시성으로 직접 호출
+# ------------------------------------------------------------------
+
+async def run_concurrent(input_path: str, output_path: str, concurrency: int) -> None:
+    from fastapi import HTTPException
+    from routers.interview_ai import run_analysis_with_finetuned_model
+
+    done = load_done_lines(output_path)
+    logger.info("concurrent 모드 시작: 이미 처리된 %s건은 건너뜁니다.", len(done))
+
+    writer = ResultWriter(output_path)
+    in_flight: Set[asyncio.Task] = set()
+
+    async def analyze(line_no: int, dispatch: Any) -> None:
+        try:
+            result = await run_analysis_with_finetuned_model(dispatch)
+            writer.write(_record(line_no, dispatch, result=result))
+        except HTTPException as e:
+            writer.write(_record(line_no, dispatch, error=str(e.detail)))
+
+    try:
+        # 입력을 한꺼번에 올리지 않고, 동시 실행 중인 작업이 concurrency개 미만일 때만 다음 줄을 읽습니다.
+        for line_no, dispatch in iter_dispatches(input_path, done, writer):
+            if len(in_flight) >= concurrency:
+                _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            in_flight.add(asyncio.create_task(analyze(line_no, dispatch)))
+        if in_flight:
+            await asyncio.wait(in_flight)
+    finally:
+        writer.close()
+
+    logger.info("concurrent 모드 완료: 이번 실행에서 %s건 기록", writer.written)
+
+
+# ------------------------------------------------------------------
+# batch 모드: OpenAI Batch API
+# ------------------------------------------------------------------
+
+def iter_batch_request_lines(dispatches: Iterator[Tuple[int, Any]], model_id: str) -> Iterator[Tuple[int, str]]:
+    """(line, Batch API 요청 JSON 한 줄)을 지연 생성합니다."""
+    from routers.interview_ai import build_analysis_messages
+
+    for line_no, dispatch in dispatches:
+        request = {
+            "custom_id": f"line-{line_no}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model_id,
+                "response_format": {"type": "json_object"},
+                "messages": build_analysis_messages(dispatch),
+                "temperature": 0.0,
+            },
+        }
+        yield line_no, json.dumps(request, ensure_ascii=False)
+
+
+async def submit_batches(client, input_path: str, output_path: str, checkpoint_path: str,
+                         model_id: str, batch_size: int) -> Dict[str, Any]:
+    """아직 제출되지 않은 줄을 batch_size 단위 입력 파일로 만들어 업로드/제출합니다."""
+    checkpoint = load_checkpoint(checkpoint_path)
+    submitted: Set[int] = set()
+    for b in checkpoint["batches"]:
+        submitted.update(range(b["first_line"], b["last_line"] + 1))
+
+    writer = ResultWriter(output_path)
+    skip = load_done_lines(output_path) | submitted
+    request_lines = iter_batch_request_lines(iter_dispatches(input_path, skip, writer), model_id)
+
+    try:
+        while True:
+            # 요청 줄을 임시 파일로 흘려 쓰며 batch_size개까지만 담습니다.
+            with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as tmp:
+                count, first_line, last_line = 0, None, None
+                for line_no, request_line in request_lines:
+                    tmp.write(request_line + "\n")
+                    first_line = line_no if first_line is None else first_line
+                    last_line = line_no
+                    count += 1
+                    if count >= batch_size:
+                        break
+            try:
+                if count == 0:
+                    break
+                with open(tmp.name, "rb") as f:
+                    uploaded = await client.files.create(file=f, purpose="batch")
+                batch = await client.batches.create(
+                    input_file_id=uploaded.id,
+                    endpoint="/v1/chat/completions",
+                    completion_window="24h",
+                )
+                checkpoint["batches"].append({
+                    "batch_id": batch.id,
+                    "input_file_id": uploaded.id,
+                    "first_line": first_line,
+                    "last_line": last_line,
+                    "requests": count,
+                    "collected": False,
+                })
+                save_checkpoint(checkpoint_path, checkpoint)
+                logger.info("배치 제출: %s (line %s~%s, %s건)", batch.id, first_line, last_line, count)
+            finally:
+                os.unlink(tmp.name)
+    finally:
+        writer.close()
+
+    return checkpoint
+
+
+def load_speech_features(input_path: str) -> Dict[int, Any]:
+    """line → 발화 지표. 배치 결과에는 원래 요청이 없으므로 입력을 다시 읽어 fillerCount/timeMs를 확정합니다."""
+    from routers.interview_ai import AnswerDispatch, speech_features_of
+
+    features = {}
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, raw in enumerate(f, start=1):
+            if not raw.strip():
+                continue
+            try:
+                features[line_no] = speech_features_of(AnswerDispatch.model_validate_json(raw))
+            except ValidationError:
+                continue  # 잘못된 줄은 제출 단계에서 이미 error로 기록됨
+    return features
+
+
+async def collect_batches(client, input_path: str, output_path: str, checkpoint_path: str,
+                          checkpoint: Dict[str, Any], poll_interval: float) -> None:
+    """제출된 배치가 끝날 때까지 폴링하고, 결과를 검증해 출력 파일에 기록합니다."""
+    from routers.interview_ai import AnswerAnalysisResult, apply_speech_features
+
+    done = load_done_lines(output_path)
+    features = load_speech_features(input_path) if not all(e["collected"] for e in checkpoint["batches"]) else {}
+    writer = ResultWriter(output_path)
+    try:
+        for entry in checkpoint["batches"]:
+            if entry["collected"]:
+                continue
+
+            batch = await client.batches.retrieve(entry["batch_id"])
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                logger.info("배치 대기 중: %s status=%s", batch.id, batch.status)
+                await asyncio.sleep(poll_interval)
+                batch = await client.batches.retrieve(entry["batch_id"])
+
+            if batch.output_file_id:
+                content = await client.files.content(batch.output_file_id)
+                for raw in content.text.splitlines():
+                    if not raw.strip():
+                        continue
+                    item = json.loads(raw)
+                    line_no = int(item["custom_id"].split("-", 1)[1])
+                    if line_no in done:
+                        continue
+                    record: Dict[str, Any] = {"line": line_no}
+                    try:
+                        body = item["response"]["body"]
+                        result = AnswerAnalysisResult.model_validate_json(body["choices"][0]["message"]["content"])
+                        if line_no in features:
+                            apply_speech_features(result, features[line_no])
+                        record["result"] = result.model_dump()
+                    except (KeyError, TypeError, IndexError, ValidationError) as e:
+                        record["error"] = f"invalid batch output: {type(e).__name__}"
+                    writer.write(record)
+                    done.add(line_no)
+
+            # 배치에서 결과가 오지 않은 줄은 실패로 기록 (재실행 시 다시 제출하려면 출력 줄을 지우면 됨)
+            for line_no in range(entry["first_line"], entry["last_line"] + 1):
+                if line_no not in done:
+                    writer.write({"line": line_no, "error": f"batch {batch.id} ended with status={batch.status}"})
+                    done.add(line_no)
+
+            entry["collected"] = True
+            save_checkpoint(checkpoint_path, checkpoint)
+            logger.info("배치 수집 완료: %s status=%s", batch.id, batch.status)
+    finally:
+        writer.close()
+
+
+async def run_batch(input_path: str, output_path: str, batch_size: int, poll_interval: float) -> None:
+    from routers.interview_ai import get_interview_client, CUSTOM_FINETUNED_MODEL_ID
+
+    client = get_interview_client()
+    if not client or not CUSTOM_FINETUNED_MODEL_ID:
+        raise SystemExit("INTERVIEW_OPENAI_KEY / INTERVIEW_FINEDTUNED_MODEL_ID 환경 변수가 필요합니다.")
+    # 공유 클라이언트는 SDK 재시도가 꺼져 있으므로(core.upstream 담당), 배치 관리 호출에는 SDK 재시도를 켭니다.
+    client = client.with_options(max_retries=5)
+
+    checkpoint_path = f"{output_path}.ckpt.json"
+    checkpoint = await submit_batches(client, input_path, output_path, checkpoint_path,
+                                      CUSTOM_FINETUNED_MODEL_ID, batch_size)
+    await collect_batches(client, input_path, output_path, checkpoint_path, checkpoint, poll_interval)
+
+
+# ------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="AnswerDispatch JSONL 대량 분석")
+    parser.add_argument("--input", required=True, help="AnswerDispatch JSONL 경로")
+    parser.add_argument("--output", required=True, help="결과 JSONL 경로 (재실행 시 이어서 기록)")
+    parser.add_argument("--mode", choices=["concurrent", "batch"], default="concurrent")
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("INTERVIEW_MAX_CONCURRENCY", 32)))
+    parser.add_argument("--batch-size", type=int, default=BATCH_MAX_REQUESTS)
+    parser.add_argument("--poll-interval", type=float, default=60.0, help="배치 상태 폴링 간격(초)")
+    args = parser.parse_args(argv)
+
+    setup_logging(fmt=os.environ.get("LOG_FORMAT", "text"))
+
+    if args.mode == "concurrent":
+        asyncio.run(run_concurrent(args.input, args.output, args.concurrency))
+    else:
+        asyncio.run(run_batch(args.input, args.output, min(args.batch_size, BATCH_MAX_REQUESTS), args.poll_interval))
+
+
+if __name__ == "__main__":
+    # 라우터 모듈이 import 시점에 환경 변수를 읽으므로 먼저 로드합니다.
+    load_dotenv('app_sevice.env')
+    main(sys.argv[1:])
@@ -0,0 +1,102 @@
+# prewarm_question_bank.py
+# ================================================================
+# 질문 은행 사전 생성 (오프라인, 배포 전/야간 실행)
+# - 입력: "전공,직무" CSV (헤더 없음) → 각 (전공, 직무)에 대해 풀이 목표 크기가 될 때까지 LLM으로 질문을 생성
+# - --from-bank: 이미 은행에 있는 (전공, 직무) 중 요청이 많은 순으로 오래된 풀을 다시 채움
+# - 서버와 같은 SQLite 파일(QUESTION_BANK_SQLITE_PATH)에 기록하므로 실행 즉시 모든 워커에 반영됩니다.
+#
+# 실행 예)
+#   python -m jobs.prewarm_question_bank --pairs common_pairs.csv --concurrency 8
+#   python -m jobs.prewarm_question_bank --from-bank --top 500
+# ================================================================
+
+import os
+import sys
+import csv
+import time
+import asyncio
+import logging
+import argparse
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from core.logging_setup import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def read_pairs(path: str) -> List[Tuple[str, str]]:
+    pairs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) >= 2 and row[0].strip() and row[1].strip():
+                pairs.append((row[0].strip(), row[1].strip()))
+    return pairs
+
+
+async def prewarm_pair(major: str, job_title: str, target: int, max_rounds: int, force: bool) -> int:
+    """풀이 target개 이상이고 오래되지 않았다면 건너뜁니다. → 이번에 수행한 LLM 호출 수"""
+    from routers.question_ai import question_bank, generate_interview_questions
+
+    calls = 0
+    for _ in range(max_rounds):
+        qs, needs_refill = await question_bank.sample(major, job_title, target, count_request=False)
+        if qs and not needs_refill and not (force and calls == 0):
+            break
+        await question_bank.refill(major, job_title, generate_interview_questions)
+        calls += 1
+    return calls
+
+
+async def prewarm(pairs: List[Tuple[str, str]], target: int, max_rounds: int, force: bool, concurrency: int) -> int:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(major: str, job_title: str) -> int:
+        async with semaphore:
+            return await prewarm_pair(major, job_title, target, max_rounds, force)
+
+    calls = await asyncio.gather(*[run(major, job_title) for major, job_title in pairs])
+    return sum(calls)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="(전공, 직무)별 질문 은행 사전 생성")
+    parser.add_argument("--pairs", help="'전공,직무' CSV 경로")
+    parser.add_argument("--from-bank", action="store_true", help="은행에 있는 (전공, 직무) 중 요청 많은 순으로 재보충")
+    parser.add_argument("--top", type=int, default=None, help="--from-bank 시 대상 개수")
+    parser.add_argument("--target", type=int, default=None, help="(전공, 직무)당 목표 풀 크기 (기본: QUESTION_BANK_MIN_POOL)")
+    parser.add_argument("--max-rounds", type=int, default=6, help="(전공, 직무)당 최대 LLM 호출 수")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--force", action="store_true", help="풀이 충분해도 한 번은 새로 생성")
+    args = parser.parse_args(argv)
+
+    setup_logging(fmt=os.environ.get("LOG_FORMAT", "text"))
+
+    from routers.question_ai import question_bank
+
+    if not question_bank.enabled:
+        parser.error("QUESTION_BANK_SQLITE_PATH가 비어 있어 질문 은행을 사용할 수 없습니다.")
+
+    pairs: List[Tuple[str, str]] = []
+    if args.pairs:
+        pairs.extend(read_pairs(args.pairs))
+    if args.from_bank:
+        pairs.extend((p["major"], p["job_title"]) for p in asyncio.run(question_bank.pairs(args.top)))
+    if not pairs:
+        parser.error("--pairs 또는 --from-bank 중 하나는 필요합니다.")
+
+    target = args.target or question_bank.min_pool
+    started = time.perf_counter()
+    calls = asyncio.run(prewarm(pairs, target, args.max_rounds, args.force, args.concurrency))
+
+    logger.info(
+        "질문 은행 사전 생성 완료: 대상 %s쌍, LLM 호출 %s회, 소요 %.1fs",
+        len(pairs), calls, time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    # 라우터 모듈이 import 시점에 환경 변수를 읽으므로 먼저 로드합니다.
+    load_dotenv('app_sevice.env')
+    main(sys.argv[1:])
@@ -1,8 +1,11 @@
 # main_api.py
 import os
+import logging
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 import uvicorn
 
 # 1. 모든 라우터 파일 import (✅ 파일명과 라우터 변수명 매칭 완료)
@@ -11,7 +14,16 @@ import uvicorn
 from routers.interview_ai import interview_router
 from routers.question_ai import question_router
 from routers.resume_edit import resume_router
-from routers.voice_ai import voice_router
+from routers.voice_ai import voice_router, VOICE_MAX_UPLOAD_BYTES
+from routers.async_jobs import job_router, job_queue
+from core.upload_limit import UploadSizeLimitMiddleware
+from core.concurrency import OverloadedError
+from core.metrics import PrometheusMiddleware, render_metrics
+from core.logging_setup import RequestIdMiddleware, setup_logging
+from core.openai_clients import registry as openai_registry
+from core.token_metrics import usage_stats
+from core.token_budget import budget_stats
+from core.upstream import upstream_stats
 
 
 # ==============================================================================
@@ -25,17 +37,33 @@ load_dotenv('app_sevice.env')
 SERVICE_PORT = int(os.environ.get("SERVICE_PORT", 8000))
 SERVICE_HOST = os.environ.get("SERVICE_HOST", "0.0.0.0")
 
-print("환경 변수 로드 완료.")
+# 로깅 구성 (큐 기반 JSON 로깅, LOG_LEVEL / LOG_FORMAT 환경 변수)
+setup_logging()
+logger = logging.getLogger("main_api")
+
+logger.info("환경 변수 로드 완료.")
 
 
 # ==============================================================================
 # 1. FastAPI 앱 인스턴스 생성
 # ==============================================================================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 비동기 작업 큐 소비자 (워커 프로세스마다 JOB_WORKERS개)
+    await job_queue.start()
+    yield
+    # 실행 중이던 작업은 대기열로 되돌려 다른 워커/재시작 후에 다시 실행합니다.
+    await job_queue.stop()
+    # 워커 종료 시 공유 OpenAI 클라이언트의 커넥션 풀을 정리합니다.
+    await openai_registry.close_all()
+
+
 app = FastAPI(
     title="통합 AI 백엔드 서비스",
     description="면접 분석, 질문 생성, 이력서 피드백, 음성 STT 기능을 제공하는 단일 API 서버입니다.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # ==============================================================================
@@ -49,7 +77,37 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-print("CORS 미들웨어 설정 완료.")
+logger.info("CORS 미들웨어 설정 완료.")
+
+# 음성 업로드 크기 제한 (본문을 받는 도중 한도를 넘으면 즉시 413)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/voice/analyze": VOICE_MAX_UPLOAD_BYTES,
+        "/jobs/voice/analyze": VOICE_MAX_UPLOAD_BYTES,
+        "/interview/analysis/interview/audio": VOICE_MAX_UPLOAD_BYTES,
+    },
+)
+logger.info("업로드 크기 제한 미들웨어 설정 완료.")
+
+# 요청 지연/처리 중인 요청 수 지표 (업로드 제한 미들웨어보다 바깥에 두어 거절 응답까지 포함해 측정)
+app.add_middleware(PrometheusMiddleware)
+logger.info("Prometheus 지표 미들웨어 설정 완료.")
+
+# 요청 ID (X-Request-ID): 이 요청에서 남긴 모든 로그 레코드에 request_id로 붙습니다.
+app.add_middleware(RequestIdMiddleware)
+logger.info("요청 ID 미들웨어 설정 완료.")
+
+
+# 라우트별 동시성 한도/대기열이 가득 찬 요청은 기다리게 하지 않고 바로 503으로 돌려보냅니다.
+# (core.upstream의 CircuitOpenError도 OverloadedError이므로 제공자 장애 중에는 같은 방식으로 503)
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exc: OverloadedError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after_sec)},
+    )
 
 
 # ==============================================================================
@@ -62,7 +120,7 @@ app.include_router(
     prefix="/interview", 
     tags=["Interview Analysis"]
 )
-print("Interview Router 통합 완료 (접두사: /interview)")
+logger.info("Interview Router 통합 완료 (접두사: /interview)")
 
 # 2) 질문 생성 라우터 통합
 app.include_router(
@@ -70,7 +128,7 @@ app.include_router(
     prefix="/question", 
     tags=["Question Generation"]
 )
-print("Question Router 통합 완료 (접두사: /question)")
+logger.info("Question Router 통합 완료 (접두사: /question)")
 
 # 3) 이력서 피드백 라우터 통합
 app.include_router(
@@ -78,7 +136,7 @@ app.include_router(
     prefix="/resume", 
     tags=["Resume Feedback"]
 )
-print("Resume Router 통합 완료 (접두사: /resume)")
+logger.info("Resume Router 통합 완료 (접두사: /resume)")
 
 # 4) 음성 STT 라우터 통합
 app.include_router(
@@ -86,7 +144,49 @@ app.include_router(
     prefix="/voice", 
     tags=["Voice STT"]
 )
-print("Voice Router 통합 완료 (접두사: /voice)")
+logger.info("Voice Router 통합 완료 (접두사: /voice)")
+
+# 5) 비동기 작업 라우터 통합 (오래 걸리는 이력서 피드백/STT를 제출 → 폴링/웹훅으로 처리)
+app.include_router(
+    job_router,
+    prefix="/jobs",
+    tags=["Async Jobs"]
+)
+logger.info("Job Router 통합 완료 (접두사: /jobs)")
+
+
+# 6) 공유 OpenAI 클라이언트 커넥션 재사용 지표
+@app.get("/openai/clients/stats", tags=["Monitoring"])
+async def openai_client_stats():
+    return openai_registry.stats()
+
+
+# 7) 라우트/모델별 토큰 사용량 (cached_input_tokens = prompt caching으로 재사용된 입력 토큰)
+@app.get("/openai/usage/stats", tags=["Monitoring"])
+async def openai_usage_stats():
+    return usage_stats()
+
+
+# 8) Prometheus 지표 (gunicorn 멀티 워커면 PROMETHEUS_MULTIPROC_DIR로 워커 합산)
+#    응답 캐시 / 요청 합치기 / 질문 은행 / 이력서 제출 기록 / 작업 큐 카운터는 component_events_total,
+#    속도 제한은 openai_rate_limit_* 지표로 봅니다. (워커별 stats 라우트를 따로 두지 않음)
+@app.get("/metrics", tags=["Monitoring"], include_in_schema=False)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+# 9) 라우트별 입력 토큰 예산 적용 결과 (original_tokens → sent_tokens, saved_tokens)
+@app.get("/openai/budget/stats", tags=["Monitoring"])
+async def openai_budget_stats():
+    return budget_stats()
+
+
+# 10) 업스트림 재시도 / 서킷 브레이커 상태 (업스트림별 state, 라우트별 calls/retries/gave_up)
+@app.get("/openai/upstream/stats", tags=["Monitoring"])
+async def openai_upstream_stats():
+    return upstream_stats()
+
 
 
 # ==============================================================================
@@ -94,9 +194,7 @@ print("Voice Router 통합 완료 (접두사: /voice)")
 # ==============================================================================
 
 if __name__ == "__main__":
-    print("-" * 50)
-    print(f"🚀 FastAPI 통합 서버 시작: http://{SERVICE_HOST}:{SERVICE_PORT}")
-    print("-" * 50)
+    logger.info("🚀 FastAPI 통합 서버 시작: http://%s:%s", SERVICE_HOST, SERVICE_PORT)
     
     uvicorn.run(
         "main_api:app", 
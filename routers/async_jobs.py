@@ -0,0 +1,171 @@
+# async_jobs.py
+# ================================================================
+# 비동기 작업 API (제출 → 폴링 / 웹훅)
+# - POST /jobs/resume/feedback : 이력서 피드백 3단계 생성을 대기열에 넣고 202 + jobId를 바로 반환
+# - POST /jobs/voice/analyze   : 녹음 파일을 스풀 디렉터리에 저장하고 STT를 대기열에 넣음
+# - GET  /jobs/{jobId}         : 상태(queued/running/succeeded/failed)와 결과 조회
+# - callbackUrl을 주면 완료 시 GET /jobs/{jobId}와 같은 JSON을 POST합니다.
+# - 결과 형식은 동기 엔드포인트(/resume/resume/feedback, /voice/analyze)의 응답과 같습니다.
+# - 큐/워커 설정: JOB_QUEUE_SQLITE_PATH, JOB_SPOOL_DIR, JOB_WORKERS, JOB_MAX_PENDING,
+#   JOB_TIMEOUT_SEC, JOB_RESULT_TTL_SEC (core.job_queue)
+# ================================================================
+
+import os
+import uuid
+import shutil
+import asyncio
+import logging
+import tempfile
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, Response, UploadFile
+from pydantic import BaseModel
+
+from core.job_queue import JobQueue, validate_callback_url
+from core.openai_clients import get_async_client
+from routers.resume_edit import ResumeInput, create_feedback
+from routers.voice_ai import VOICE_KEY_ENV, SttResult, parse_meta, transcribe_upload, validate_audio_upload
+
+logger = logging.getLogger(__name__)
+
+job_router = APIRouter()
+
+JOB_QUEUE_SQLITE_PATH = os.environ.get(
+    "JOB_QUEUE_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "job_queue.sqlite3")
+)
+# 비동기 STT용 업로드 파일 보관 위치 (작업 큐와 같은 호스트의 모든 워커가 읽을 수 있어야 합니다)
+JOB_SPOOL_DIR = os.environ.get("JOB_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "job_spool"))
+
+# 폴링 간격 안내 (대기/실행 중 응답의 Retry-After)
+JOB_POLL_HINT_SEC = int(os.environ.get("JOB_POLL_HINT_SEC", 2))
+
+job_queue = JobQueue(
+    sqlite_path=JOB_QUEUE_SQLITE_PATH,
+    workers=int(os.environ.get("JOB_WORKERS", 2)),
+    max_pending=int(os.environ.get("JOB_MAX_PENDING", 500)),
+    job_timeout_sec=float(os.environ.get("JOB_TIMEOUT_SEC", 600)),
+    result_ttl_sec=float(os.environ.get("JOB_RESULT_TTL_SEC", 86400)),
+)
+
+
+# -----------------------------
+# 1. DTO
+# -----------------------------
+class ResumeFeedbackJobRequest(ResumeInput):
+    callbackUrl: Optional[str] = None
+
+
+class JobAccepted(BaseModel):
+    jobId: str
+    kind: str
+    status: str
+    queuePosition: int
+    statusUrl: str
+
+
+# -----------------------------
+# 2. 작업 처리 함수 (소비자 태스크에서 실행)
+# -----------------------------
+async def run_resume_feedback_job(payload: Dict[str, Any], spool_path: Optional[str]) -> Dict[str, Any]:
+    feedback, _, _ = await create_feedback(ResumeInput.model_validate(payload))
+    return feedback.model_dump()
+
+
+async def run_voice_analyze_job(payload: Dict[str, Any], spool_path: Optional[str]) -> Dict[str, Any]:
+    client = get_async_client(VOICE_KEY_ENV)
+    if client is None:
+        raise RuntimeError("Whisper 호출 실패: OpenAI API Key 설정 누락")
+    with open(spool_path, "rb") as fileobj:
+        text = await transcribe_upload(client, fileobj, payload["filename"], payload["size"])
+    logger.info("비동기 STT 완료: Interview ID=%s, 텍스트 길이=%s", payload["meta"].get("interviewId"), len(text))
+    return SttResult(answerText=text).model_dump()
+
+
+job_queue.register("resume_feedback", run_resume_feedback_job)
+job_queue.register("voice_analyze", run_voice_analyze_job)
+
+
+# -----------------------------
+# 3. 엔드포인트
+# -----------------------------
+def _check_enabled() -> None:
+    if not job_queue.enabled:
+        raise HTTPException(status_code=503, detail="작업 큐를 사용할 수 없습니다. (JOB_QUEUE_SQLITE_PATH 확인)")
+
+
+async def _check_callback(callback_url: Optional[str]) -> Optional[str]:
+    if not callback_url:
+        return None
+    try:
+        # 호스트 DNS 조회가 있으므로 스레드에서 확인합니다.
+        return await asyncio.to_thread(validate_callback_url, callback_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _accepted(job: Dict[str, Any], response: Response) -> JobAccepted:
+    status_url = f"/jobs/{job['jobId']}"
+    response.headers["Location"] = status_url
+    response.headers["Retry-After"] = str(JOB_POLL_HINT_SEC)
+    return JobAccepted(**job, statusUrl=status_url)
+
+
+@job_router.post("/resume/feedback", response_model=JobAccepted, status_code=202)
+async def submit_resume_feedback(req: ResumeFeedbackJobRequest, response: Response):
+    """이력서 피드백을 비동기로 생성합니다. 결과는 /resume/resume/feedback 응답과 같습니다."""
+    _check_enabled()
+    callback_url = await _check_callback(req.callbackUrl)
+    payload = {"userId": req.userId, "resumeContent": req.resume_content}
+    job = await job_queue.submit("resume_feedback", payload, callback_url=callback_url)
+    return _accepted(job, response)
+
+
+@job_router.post("/voice/analyze", response_model=JobAccepted, status_code=202)
+async def submit_voice_analyze(
+    response: Response,
+    meta: str = Form(...),
+    file: UploadFile = File(...),
+    callbackUrl: Optional[str] = Form(None),
+):
+    """녹음 파일을 비동기로 전사합니다. 결과는 /voice/analyze 응답과 같습니다."""
+    _check_enabled()
+    callback_url = await _check_callback(callbackUrl)
+    meta_obj = parse_meta(meta)
+    file_size = validate_audio_upload(file)
+
+    # 업로드 스풀 파일은 요청이 끝나면 지워지므로, 작업이 실행될 때까지 남을 위치로 복사합니다.
+    os.makedirs(JOB_SPOOL_DIR, exist_ok=True)
+    ext = os.path.splitext(file.filename)[1].lower()
+    spool_path = os.path.join(JOB_SPOOL_DIR, f"{uuid.uuid4().hex}{ext}")
+
+    def copy_upload():
+        with open(spool_path, "wb") as out:
+            shutil.copyfileobj(file.file, out, 1024 * 1024)
+
+    await asyncio.to_thread(copy_upload)
+    payload = {"meta": meta_obj, "filename": file.filename, "size": file_size}
+    try:
+        job = await job_queue.submit("voice_analyze", payload, callback_url=callback_url, spool_path=spool_path)
+    except BaseException:
+        os.remove(spool_path)
+        raise
+    logger.info("비동기 STT 접수: Interview ID=%s, 파일명=%s, jobId=%s", meta_obj.get("interviewId"), file.filename, job["jobId"])
+    return _accepted(job, response)
+
+
+@job_router.get("/stats")
+async def get_job_queue_stats():
+    """상태별 작업 수, 완료/실패/연기/웹훅 카운터를 반환합니다."""
+    return await job_queue.stats()
+
+
+@job_router.get("/{job_id}")
+async def get_job(job_id: str, response: Response):
+    """작업 상태와 결과를 조회합니다. 대기/실행 중이면 Retry-After로 다음 폴링 시점을 안내합니다."""
+    _check_enabled()
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다. (보관 기간이 지났을 수 있습니다)")
+    if job["status"] in ("queued", "running"):
+        response.headers["Retry-After"] = str(JOB_POLL_HINT_SEC)
+    return job
@@ -1,16 +1,31 @@
 import os
 import json
+import time
+import asyncio
 import logging
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, Optional
 
-from pydantic import BaseModel, Field, ValidationError
-from fastapi import FastAPI, HTTPException, APIRouter
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from fastapi import FastAPI, HTTPException, APIRouter, File, Form, Response, UploadFile
+from fastapi.exceptions import RequestValidationError
 import openai
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+from core.openai_clients import get_async_client
+from core.response_cache import ResponseCache, make_cache_key
+from core.token_metrics import record_usage
+from core.token_budget import ResumeDigester, count_tokens, fit_to_budget, record_budget
+from core.text_normalize import normalize_if_str, normalize_text
+from core.logging_setup import log_payload
+from core.concurrency import OverloadedError
+from core.upstream import RetryPolicy, call_upstream
+from core.rate_limit import BATCH, estimate_tokens, request_priority
+from core.singleflight import SingleFlight, fingerprint
+from core.speech_features import SpeechFeatures, extract_speech_features
+from core.long_audio import probe_duration_sec
+from routers.voice_ai import transcribe_file, validate_audio_upload
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
 # ==============================================================================
 # 1. 라우터 객체 생성, 환경 설정 및 클라이언트 초기화
@@ -18,17 +33,67 @@ logger.setLevel(logging.INFO)
 
 interview_router = APIRouter()
 
-# 환경 변수에서 API Key 및 모델 ID 설정
-INTERVIEW_KEY = os.environ.get("INTERVIEW_OPENAI_KEY")
+# 환경 변수에서 모델 ID 설정 (API Key는 core.openai_clients 레지스트리가 호출 시점에 읽습니다)
+INTERVIEW_KEY_ENV = "INTERVIEW_OPENAI_KEY"
 CUSTOM_FINETUNED_MODEL_ID = os.environ.get("INTERVIEW_FINEDTUNED_MODEL_ID")
 
-try:
-    client = OpenAI(api_key=INTERVIEW_KEY)
-    print("Interview Router OpenAI 클라이언트 초기화 완료.")
-except Exception:
-    # 🔸 (메시지만 살짝 변경: 실제로는 더 이상 Mock 모드로 돌지 않기 때문에)
-    print("OpenAI API Key가 설정되지 않았습니다. 면접 분석 기능이 비활성화됩니다.")
-    client = None
+# 동시성 설정 (워커 프로세스 단위)
+# 커넥션 풀 크기/타임아웃은 INTERVIEW_MAX_CONNECTIONS, INTERVIEW_MAX_KEEPALIVE, INTERVIEW_TIMEOUT_SEC로
+# 레지스트리에서 설정합니다.
+INTERVIEW_MAX_CONCURRENCY = int(os.environ.get("INTERVIEW_MAX_CONCURRENCY", 32))
+
+# 세션 배치 분석 설정 (요청당 답변 수 상한 / 요청당 동시 분석 수)
+INTERVIEW_BATCH_MAX_ANSWERS = int(os.environ.get("INTERVIEW_BATCH_MAX_ANSWERS", 20))
+INTERVIEW_BATCH_CONCURRENCY = int(os.environ.get("INTERVIEW_BATCH_CONCURRENCY", 8))
+
+# 업스트림 재시도 정책 (INTERVIEW_UPSTREAM_TIMEOUT_SEC / _MAX_ATTEMPTS / _DEADLINE_SEC로 조정)
+INTERVIEW_RETRY_POLICY = RetryPolicy.from_env("INTERVIEW", timeout_sec=30, max_attempts=3, deadline_sec=60)
+
+
+def get_interview_client() -> Optional[AsyncOpenAI]:
+    """공유 AsyncOpenAI 클라이언트 (키가 없으면 None → 면접 분석 비활성화)"""
+    return get_async_client(INTERVIEW_KEY_ENV)
+
+# 워커당 동시에 진행 중인 LLM 호출 수 상한 (초과 요청은 대기)
+analysis_semaphore = asyncio.Semaphore(INTERVIEW_MAX_CONCURRENCY)
+
+# temperature=0.0 분석 결과 캐시 (같은 입력 → 같은 결과)
+# INTERVIEW_CACHE_SQLITE_PATH를 지정하면 모든 gunicorn 워커가 디스크 계층을 공유합니다.
+analysis_cache = ResponseCache(
+    name="interview_analysis",
+    max_entries=int(os.environ.get("INTERVIEW_CACHE_MAX_ENTRIES", 1024)),
+    ttl_sec=float(os.environ.get("INTERVIEW_CACHE_TTL_SEC", 86400)),
+    sqlite_path=os.environ.get("INTERVIEW_CACHE_SQLITE_PATH"),
+    disk_max_entries=int(os.environ.get("INTERVIEW_CACHE_DISK_MAX_ENTRIES", 100000)),
+)
+
+# 진행 중인 같은 분석 요청 합치기 (캐시는 완료된 결과, single-flight는 아직 진행 중인 호출을 공유)
+# SINGLEFLIGHT_SQLITE_PATH를 지정하면 다른 gunicorn 워커의 같은 요청도 합칩니다.
+analysis_flight = SingleFlight(
+    "interview_analysis",
+    wait_timeout_sec=INTERVIEW_RETRY_POLICY.deadline_sec + 30,
+    encode=lambda result: result.model_dump_json(),
+    decode=lambda value: AnswerAnalysisResult.model_validate_json(value),
+)
+
+# 전사문에서 계산한 발화 지표(간투사/반복/말 속도)를 프롬프트에 한 줄 힌트로 넣을지 여부
+# (fillerCount/timeMs는 이 값과 상관없이 항상 로컬 계산값으로 확정합니다)
+INTERVIEW_SPEECH_HINTS = os.environ.get("INTERVIEW_SPEECH_HINTS", "1") != "0"
+
+# 자기소개서 토큰 예산: 넘으면 한 번 요약(digest)해 같은 세션의 모든 답변 프롬프트에서 재사용합니다.
+# 요약문은 원문 해시로 캐시되며, 분석 캐시와 같은 SQLite 파일(있다면)을 공유합니다.
+INTERVIEW_RESUME_TOKEN_BUDGET = int(os.environ.get("INTERVIEW_RESUME_TOKEN_BUDGET", 1200))
+resume_digester = ResumeDigester(
+    cache=ResponseCache(
+        name="resume_digest",
+        max_entries=int(os.environ.get("INTERVIEW_CACHE_MAX_ENTRIES", 1024)),
+        ttl_sec=float(os.environ.get("INTERVIEW_CACHE_TTL_SEC", 86400)),
+        sqlite_path=os.environ.get("INTERVIEW_CACHE_SQLITE_PATH"),
+    ),
+    model=os.environ.get("INTERVIEW_RESUME_DIGEST_MODEL", "gpt-4o-mini"),
+    target_tokens=INTERVIEW_RESUME_TOKEN_BUDGET // 2,
+    upstream=INTERVIEW_KEY_ENV,
+)
 
 # ==============================================================================
 # 2. 데이터 모델 정의 (Pydantic)
@@ -48,6 +113,12 @@ class AnswerDispatch(BaseModel):
     transcript: str = Field(..., description="A팀 Voice AI의 STT 결과")
     resumeContent: str
     meta: InterviewMeta
+    audioDurationMs: Optional[int] = Field(default=None, ge=0, description="녹음 길이(ms). 있으면 timeMs와 말 속도를 계산합니다.")
+
+    @field_validator("questionText", "transcript", "resumeContent", mode="before")
+    @classmethod
+    def clean_text(cls, value):
+        return normalize_if_str(value)
 
 class AnswerAnalysisResult(BaseModel):
     """B팀 LLM의 최종 출력 스키마 (면접 피드백 항목)"""
@@ -61,10 +132,79 @@ class AnswerAnalysisResult(BaseModel):
     strengths: List[str] = Field(default_factory=list)
     risks: List[str] = Field(default_factory=list)
 
+class AudioAnswerDispatch(BaseModel):
+    """음성 답변 분석 요청의 dispatch 폼 필드 (AnswerDispatch에서 transcript를 뺀 값, transcript는 서버가 STT로 채움)"""
+    answerId: int = Field(default=0)
+    questionText: str
+    resumeContent: str
+    meta: InterviewMeta
+    audioDurationMs: Optional[int] = Field(default=None, ge=0, description="녹음 길이(ms). 없으면 WAV 헤더에서 읽습니다.")
+
+    @field_validator("questionText", "resumeContent", mode="before")
+    @classmethod
+    def clean_text(cls, value):
+        return normalize_if_str(value)
+
+class AudioAnalysisResult(BaseModel):
+    """음성 답변 분석 응답: STT 결과 + 분석 결과 + 단계별 소요 시간"""
+    answerText: str
+    analysis: AnswerAnalysisResult
+    timingsMs: Dict[str, float]
+
+class BatchAnswerItem(BaseModel):
+    """세션 배치 분석 요청의 답변 한 건 (세션 공통 값은 InterviewBatchDispatch에 한 번만)"""
+    answerId: int = Field(default=0)
+    questionId: int
+    questionText: str
+    transcript: str = Field(..., description="A팀 Voice AI의 STT 결과")
+    audioDurationMs: Optional[int] = Field(default=None, ge=0, description="녹음 길이(ms)")
+
+    @field_validator("questionText", "transcript", mode="before")
+    @classmethod
+    def clean_text(cls, value):
+        return normalize_if_str(value)
+
+class InterviewBatchDispatch(BaseModel):
+    """한 면접 세션(InterviewMeta.id)의 답변들을 한 번에 분석하는 요청"""
+    meta: InterviewMeta
+    resumeContent: str
+    answers: List[BatchAnswerItem] = Field(..., min_length=1)
+
+    @field_validator("resumeContent", mode="before")
+    @classmethod
+    def clean_resume_content(cls, value):
+        return normalize_if_str(value)
+
+class BatchAnswerResult(BaseModel):
+    """답변 한 건의 배치 분석 결과 (성공 시 result, 실패 시 error)"""
+    answerId: int
+    questionId: int
+    result: Optional[AnswerAnalysisResult] = None
+    error: Optional[str] = None
+
+class InterviewBatchResult(BaseModel):
+    """세션 배치 분석 응답"""
+    interviewId: int
+    results: List[BatchAnswerResult]
+    succeeded: int
+    failed: int
+
 # ==============================================================================
 # 3. 유틸리티 함수 (LLM 프롬프트 구성)
 # ==============================================================================
 
+def speech_features_of(dispatch: AnswerDispatch) -> SpeechFeatures:
+    return extract_speech_features(dispatch.transcript, dispatch.audioDurationMs)
+
+
+def apply_speech_features(result: AnswerAnalysisResult, features: SpeechFeatures) -> AnswerAnalysisResult:
+    """모델이 전사문을 세어 낸 값 대신 로컬 계산값으로 확정합니다. (간투사 수, 녹음 길이가 있으면 답변 시간)"""
+    result.fillerCount = features.filler_count
+    if features.duration_ms:
+        result.timeMs = features.duration_ms
+    return result
+
+
 def create_fine_tuning_example(dispatch: AnswerDispatch, analysis: AnswerAnalysisResult) -> Dict[str, Any]:
     """답변-분석 쌍을 OpenAI JSONL 형식으로 변환합니다."""
 
@@ -78,8 +218,9 @@ def create_fine_tuning_example(dispatch: AnswerDispatch, analysis: AnswerAnalysi
         f"--- 평가 요청 ---\n"
         f"자기소개서(원문): {dispatch.resumeContent}\n"
         f"질문: {dispatch.questionText}\n"
-        f"답변(transcript): {dispatch.transcript}\n\n"
-        f"위 답변을 평가하고, JSON 스키마에 맞춰 결과를 출력해주세요."
+        f"답변(transcript): {dispatch.transcript}\n"
+        + (f"발화 지표(자동 계산): {speech_features_of(dispatch).to_hint()}\n" if INTERVIEW_SPEECH_HINTS else "")
+        + "\n위 답변을 평가하고, JSON 스키마에 맞춰 결과를 출력해주세요."
     )
     assistant_content = analysis.model_dump_json()
 
@@ -91,14 +232,40 @@ def create_fine_tuning_example(dispatch: AnswerDispatch, analysis: AnswerAnalysi
         ]
     }
 
+def build_analysis_messages(dispatch: AnswerDispatch) -> List[Dict[str, Any]]:
+    """분석 요청용 메시지 (온라인 엔드포인트와 오프라인 배치 작업이 동일한 프롬프트를 사용)"""
+    return create_fine_tuning_example(
+        dispatch,
+        analysis=AnswerAnalysisResult.model_construct()
+    )['messages']
+
 # ==============================================================================
 # 4. 면접 분석 핵심 로직 (LLM 호출)
 # ==============================================================================
 
-def run_analysis_with_finetuned_model(dispatch: AnswerDispatch) -> AnswerAnalysisResult:
+async def apply_resume_budget(client: AsyncOpenAI, dispatch: AnswerDispatch) -> AnswerDispatch:
+    """자기소개서가 예산을 넘으면 캐시된 요약문(없으면 앞뒤만 남긴 원문)으로 바꾼 dispatch를 반환합니다."""
+    original = count_tokens(dispatch.resumeContent)
+    if original <= INTERVIEW_RESUME_TOKEN_BUDGET:
+        record_budget("interview_analysis", original, original)
+        return dispatch
+
+    digest = await resume_digester.digest(client, dispatch.resumeContent)
+    condensed, _, sent = fit_to_budget(digest or dispatch.resumeContent, INTERVIEW_RESUME_TOKEN_BUDGET)
+    record_budget("interview_analysis", original, sent)
+    return dispatch.model_copy(update={"resumeContent": condensed})
+
+async def run_analysis_with_finetuned_model(dispatch: AnswerDispatch) -> AnswerAnalysisResult:
+    """파인튜닝된 모델을 호출합니다. 같은 요청이 이미 분석 중이면(더블 클릭/재시도) 그 결과를 함께 기다립니다."""
+    key = fingerprint(CUSTOM_FINETUNED_MODEL_ID, dispatch.model_dump(mode="json"))
+    return await analysis_flight.do(key, lambda: _run_analysis(dispatch))
+
+
+async def _run_analysis(dispatch: AnswerDispatch) -> AnswerAnalysisResult:
     """파인튜닝된 모델을 호출합니다. (더 이상 Mock 사용 X)"""
 
     # 1. OpenAI 클라이언트 / 모델 설정 체크
+    client = get_interview_client()
     if not client:
         # 키가 아예 없으면 바로 500 에러
         raise HTTPException(status_code=500, detail="OpenAI 클라이언트가 설정되지 않았습니다.")
@@ -107,40 +274,66 @@ def run_analysis_with_finetuned_model(dispatch: AnswerDispatch) -> AnswerAnalysi
         # 모델 ID가 없으면 바로 500 에러
         raise HTTPException(status_code=500, detail="INTERVIEW_FINEDTUNED_MODEL_ID 환경 변수가 설정되지 않았습니다.")
 
-    # 2. 메시지 구성 (프롬프트 구성)
-    messages = create_fine_tuning_example(
-        dispatch,
-        analysis=AnswerAnalysisResult.model_construct()
-    )['messages']
+    # 2. 메시지 구성 (프롬프트 구성, 긴 자기소개서는 요약문으로 대체)
+    dispatch = await apply_resume_budget(client, dispatch)
+    messages = build_analysis_messages(dispatch)
+
+    # 2-1. 캐시 조회 (동일 프롬프트 + 모델이면 LLM 호출 없이 반환)
+    cache_key = make_cache_key(
+        CUSTOM_FINETUNED_MODEL_ID, messages,
+        temperature=0.0, response_format="json_object"
+    )
+    cached_output = await analysis_cache.get(cache_key)
+    if cached_output is not None:
+        logger.info("분석 캐시 적중: Answer ID %s (Session ID: %s)", dispatch.answerId, dispatch.meta.id)
+        # 캐시 키에 녹음 길이가 없으므로 발화 지표는 이 요청 값으로 다시 확정합니다.
+        return apply_speech_features(
+            AnswerAnalysisResult.model_validate_json(cached_output), speech_features_of(dispatch)
+        )
 
     # 3. LLM 호출 시도 (필수, 실패하면 바로 500 에러)
     try:
-        print(f"LLM 호출: {CUSTOM_FINETUNED_MODEL_ID} (Session ID: {dispatch.meta.id})")
-        response = client.chat.completions.create(
-            model=CUSTOM_FINETUNED_MODEL_ID,
-            response_format={"type": "json_object"},
-            messages=messages,
-            temperature=0.0
-        )
+        logger.debug("LLM 호출: %s (Session ID: %s)", CUSTOM_FINETUNED_MODEL_ID, dispatch.meta.id)
+        async with analysis_semaphore:
+            # 429/5xx/타임아웃은 지수 백오프로 재시도, 제공자 장애가 이어지면 브레이커가 바로 503을 돌려줍니다.
+            response = await call_upstream(
+                INTERVIEW_KEY_ENV, "interview_analysis",
+                lambda: client.chat.completions.create(
+                    model=CUSTOM_FINETUNED_MODEL_ID,
+                    response_format={"type": "json_object"},
+                    messages=messages,
+                    temperature=0.0
+                ),
+                INTERVIEW_RETRY_POLICY,
+                model=CUSTOM_FINETUNED_MODEL_ID, tokens=estimate_tokens(messages),
+            )
         raw_llm_output = response.choices[0].message.content
-        logger.info(f"LLM 응답 원문: {raw_llm_output[:50]}...")
-        #print(f"LLM 응답 원문: {raw_llm_output}")
+        record_usage("interview_analysis", CUSTOM_FINETUNED_MODEL_ID, response.usage)
+    except OverloadedError:
+        raise
     except Exception as e:
-        logger.error(f"LLM 호출 실패: {type(e).__name__} - {e}", exc_info=True)
-        #print(f"LLM 호출 실패: {e}")
+        logger.error("LLM 호출 실패: %s - %s", type(e).__name__, e, exc_info=True)
         # 🔸 여기서 더 이상 Mock으로 대체하지 않고 그대로 500 에러
         raise HTTPException(status_code=500, detail=f"면접 LLM 호출에 실패했습니다. (내부 로그 확인 필요: {type(e).__name__})")
 
     # 4. JSON 유효성 검증
     try:
-        logger.info(f"DEBUG: LLM 원본 출력 (JSON):\n{raw_llm_output}")
+        # 원문 전체는 LOG_PAYLOAD_SAMPLE_RATE 비율로만 남깁니다. (DEBUG 레벨)
+        log_payload(logger, "LLM 원본 출력 (JSON)", raw_llm_output, answer_id=dispatch.answerId)
         analysis_result = AnswerAnalysisResult.model_validate_json(raw_llm_output)
-        return analysis_result
     except ValidationError as e:
-        logger.error(f"LLM 출력 JSON 스키마 오류 발생. Pydantic 오류 상세:", exc_info=True)
-        logger.error(f"DEBUG: 문제의 원본 JSON: {raw_llm_output}")
+        logger.error("LLM 출력 JSON 스키마 오류 발생. Pydantic 오류 상세:", exc_info=True)
+        # 오류 원인 파악용이므로 샘플링 없이 남기되 길이는 LOG_PAYLOAD_MAX_CHARS로 자릅니다.
+        log_payload(logger, "문제의 원본 JSON", raw_llm_output,
+                    level=logging.ERROR, sample_rate=1.0, answer_id=dispatch.answerId)
         raise HTTPException(status_code=500, detail=f"LLM이 유효하지 않은 JSON을 반환했습니다. (Pydantic 오류: {str(e)[:50]}...)")
 
+    # 5. 검증을 통과한 결과만 캐시에 저장 (요청마다 다른 발화 지표를 덮어쓰기 전의 모델 출력)
+    await analysis_cache.set(cache_key, analysis_result.model_dump_json())
+
+    # 6. 간투사 수/답변 시간은 전사문과 녹음 길이로 정확히 계산되므로 로컬 값으로 확정
+    return apply_speech_features(analysis_result, speech_features_of(dispatch))
+
 
 # ==============================================================================
 # 5. FastAPI 엔드포인트 정의 (A팀이 호출할 API)
@@ -151,8 +344,113 @@ async def analyze_interview_answer(dispatch_data: AnswerDispatch):
     """
     HTTP POST 요청을 받아 면접 답변 분석을 실행하는 메인 엔드포인트입니다.
     """
-    print(f"[{datetime.now()}] 분석 요청 수신: Answer ID {dispatch_data.answerId} (Session ID: {dispatch_data.meta.id})")
+    logger.info("분석 요청 수신: Answer ID %s (Session ID: %s)", dispatch_data.answerId, dispatch_data.meta.id)
+
+    analysis_result = await run_analysis_with_finetuned_model(dispatch_data)
+
+    return analysis_result
 
-    analysis_result = run_analysis_with_finetuned_model(dispatch_data)
 
-    return analysis_result
\ No newline at end of file
+
+@interview_router.post("/analysis/interview/audio", response_model=AudioAnalysisResult)
+async def analyze_interview_audio(
+    response: Response,
+    dispatch: str = Form(..., description="AudioAnswerDispatch JSON (transcript 제외)"),
+    file: UploadFile = File(...),
+):
+    """
+    녹음 파일을 받아 같은 프로세스에서 STT → 답변 분석까지 한 번에 실행합니다.
+    (/voice/analyze → /interview/analysis/interview/run 두 번 호출하던 것을 한 번으로)
+    """
+    # 1. 요청 검증: STT 전에 끝내 잘못된 요청에 Whisper를 호출하지 않습니다.
+    try:
+        request = AudioAnswerDispatch.model_validate_json(dispatch)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    file_size = validate_audio_upload(file)
+    logger.info("음성 분석 요청 수신: Answer ID %s (Session ID: %s), 파일명=%s", request.answerId, request.meta.id, file.filename)
+
+    duration_ms = request.audioDurationMs
+    if duration_ms is None:
+        duration_sec = probe_duration_sec(file.file, file.filename)
+        duration_ms = round(duration_sec * 1000) if duration_sec is not None else None
+
+    # 2. STT
+    started = time.perf_counter()
+    text = await transcribe_file(file, file_size)
+    stt_ms = (time.perf_counter() - started) * 1000
+
+    # 3. 분석: 이미 검증된 값들로 조립하므로 전사문 정규화만 하고 재검증은 생략합니다.
+    answer = AnswerDispatch.model_construct(
+        answerId=request.answerId,
+        questionText=request.questionText,
+        transcript=normalize_text(text),
+        resumeContent=request.resumeContent,
+        meta=request.meta,
+        audioDurationMs=duration_ms,
+    )
+    analysis_started = time.perf_counter()
+    analysis = await run_analysis_with_finetuned_model(answer)
+    analysis_ms = (time.perf_counter() - analysis_started) * 1000
+    total_ms = (time.perf_counter() - started) * 1000
+
+    response.headers["Server-Timing"] = f"stt;dur={stt_ms:.1f}, analysis;dur={analysis_ms:.1f}, total;dur={total_ms:.1f}"
+    return AudioAnalysisResult(
+        answerText=text,
+        analysis=analysis,
+        timingsMs={"stt": round(stt_ms, 1), "analysis": round(analysis_ms, 1), "total": round(total_ms, 1)},
+    )
+
+
+@interview_router.post("/analysis/interview/batch", response_model=InterviewBatchResult)
+async def analyze_interview_batch(batch: InterviewBatchDispatch):
+    """
+    한 세션의 답변들을 동시에 분석합니다. (N번의 HTTP 왕복 → 1번)
+    - 공통 resumeContent는 한 번만 검증/정규화합니다. (InterviewBatchDispatch 검증기)
+    - 답변별 실패는 전체를 실패시키지 않고 해당 항목의 error로 돌려줍니다.
+    """
+    logger.info("배치 분석 요청 수신: Session ID %s, 답변 %s건", batch.meta.id, len(batch.answers))
+
+    if len(batch.answers) > INTERVIEW_BATCH_MAX_ANSWERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 분석할 수 있는 답변은 최대 {INTERVIEW_BATCH_MAX_ANSWERS}건입니다."
+        )
+
+    resume_content = batch.resumeContent
+    if not resume_content:
+        raise HTTPException(status_code=400, detail="resumeContent가 비어 있습니다.")
+
+    batch_semaphore = asyncio.Semaphore(INTERVIEW_BATCH_CONCURRENCY)
+
+    async def analyze_one(item: BatchAnswerItem) -> BatchAnswerResult:
+        # 이미 검증된 값들로 조립하므로 model_construct로 재검증을 생략합니다.
+        dispatch = AnswerDispatch.model_construct(
+            answerId=item.answerId,
+            questionText=item.questionText,
+            transcript=item.transcript,
+            resumeContent=resume_content,
+            audioDurationMs=item.audioDurationMs,
+            meta=batch.meta.model_copy(update={"questionId": item.questionId}),
+        )
+        try:
+            async with batch_semaphore:
+                result = await run_analysis_with_finetuned_model(dispatch)
+            return BatchAnswerResult(answerId=item.answerId, questionId=item.questionId, result=result)
+        except HTTPException as e:
+            return BatchAnswerResult(answerId=item.answerId, questionId=item.questionId, error=str(e.detail))
+        except OverloadedError as e:
+            # 브레이커가 열리거나 호출 한도 대기를 넘겨도 배치 전체를 503으로 만들지 않고 해당 답변만 실패로 돌려줍니다.
+            return BatchAnswerResult(answerId=item.answerId, questionId=item.questionId, error=str(e))
+
+    # 세션 전체 일괄 분석은 답변 하나씩 들어오는 실시간 분석보다 뒤로 양보합니다. (core.rate_limit 우선순위)
+    with request_priority(BATCH):
+        results = await asyncio.gather(*[analyze_one(item) for item in batch.answers])
+    failed = sum(1 for r in results if r.error is not None)
+
+    return InterviewBatchResult(
+        interviewId=batch.meta.id,
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed,
+    )
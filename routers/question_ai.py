@@ -1,80 +1,294 @@
-import os
-from typing import List
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
-import openai
-from openai import OpenAI
-
-question_router = APIRouter()
-
-QUESTION_KEY = os.environ.get("QUESTION_VOICE_OPENAI_KEY")
-
-try:
-    question_client = OpenAI(api_key=QUESTION_KEY)
-    print("Question Router OpenAI 클라이언트 초기화 완료.")
-except Exception:
-    print("OpenAI API Key가 설정되지 않았습니다. 분석은 Mock 모드로 작동합니다.")
-    question_client = None
-
-class QuestionRequest(BaseModel):
-    """클라이언트로부터 받아야 하는 요청 데이터 구조"""
-    major: str = Field(..., description="지원자의 전공")
-    job_title: str = Field(..., description="지원 직무")
-    cover_letter: str = Field("", description="자기소개서 내용")
-
-class QuestionResponse(BaseModel):
-    """클라이언트에게 응답할 데이터 구조"""
-    question: List[str]
-
-# 3. 질문 생성 함수
-def generate_interview_questions(major, job_title, cover_letter=""):
-    base_prompt = f"""
-    당신은 전문 면접관입니다. 지원자가 **{major}** 학과를 졸업하고 **{job_title}** 직무에 지원한다고 가정합니다.
-    """
-    if cover_letter and cover_letter.strip():
-        base_prompt += f"""
-        아래 자기소개서를 참고하여, 자소서 심층 질문 4개 + 직무 역량 질문 3개로 총 7개 질문을 리스트 형태로 생성해주세요.
-
-        --- 자기소개서 ---
-        {cover_letter}
-        --- 자기소개서 ---
-        """
-    else:
-        base_prompt += """
-        이 지원자를 평가하기 위한 전문적인 면접 질문 5가지를 리스트 형태로 생성해주세요.
-        """
-    base_prompt += "\n질문은 한 줄에 하나씩 번호 없이 출력."
-
-    try:
-        resp = question_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "사용자의 전공/직무/자소서를 바탕으로 면접 질문을 생성하는 AI"},
-                {"role": "user", "content": base_prompt}
-            ],
-            temperature=0.7
-        )
-        questions_text = resp.choices[0].message.content.strip()
-        return [q.strip() for q in questions_text.split("\n") if q.strip()]
-    except Exception as e:
-        print(f"API 호출 오류: {e}")
-        return None
-
-# 4. 엔드포인트
-@question_router.post("/api/questions", response_model=QuestionResponse)
-def get_questions(data: QuestionRequest):
-    major = data.major
-    job_title = data.job_title
-    cover_letter = data.cover_letter
-
-    if not major or not job_title:
-        raise HTTPException(status_code=400, detail="학과(major)와 직무(job_title)를 모두 제공해야 합니다.")
-
-    qs = generate_interview_questions(major, job_title, cover_letter)
-    if qs:
-        return {"question": qs}
-    raise HTTPException(status_code=500, detail="면접 질문 생성에 실패했습니다.")
-# 5. 서버 실행 (여기 없으면 python question_ai.py 실행 시 바로 종료됨)
-#if __name__ == "__main__":
-#    print("✅ Flask question_ai 서버 시작: http://localhost:5002")
+import os
+import re
+import logging
+import tempfile
+import threading
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from core.openai_clients import get_async_client
+from core.concurrency import ConcurrencyLimiter, OverloadedError
+from core.prompt_templates import PromptTemplate
+from core.token_metrics import record_usage
+from core.question_bank import QuestionBank
+from core.token_budget import fit_to_budget, record_budget
+from core.text_normalize import normalize_if_str
+from core.upstream import RetryPolicy, call_upstream
+from core.rate_limit import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+question_router = APIRouter()
+
+# Voice 라우터와 같은 키를 쓰므로 레지스트리에서 커넥션 풀도 같은 키 단위로 관리됩니다.
+QUESTION_KEY_ENV = "QUESTION_VOICE_OPENAI_KEY"
+
+QUESTION_MODEL = os.environ.get("QUESTION_MODEL", "gpt-3.5-turbo")
+# gpt-3.5-turbo는 json_schema(Structured Outputs)를 지원하지 않으므로 기본은 json_object 모드 + Pydantic 검증입니다.
+# json_schema를 지원하는 모델(gpt-4o-mini 등)로 바꾸면 QUESTION_JSON_SCHEMA=1로 스키마를 강제할 수 있습니다.
+QUESTION_JSON_SCHEMA = os.environ.get("QUESTION_JSON_SCHEMA", "0") == "1"
+
+# LLM을 호출하는 질문 요청의 동시 실행 수 / 대기열 길이. 대기열이 차면 즉시 503 + Retry-After로 응답합니다.
+question_limiter = ConcurrencyLimiter(
+    "question_generation",
+    max_concurrency=int(os.environ.get("QUESTION_MAX_CONCURRENCY", 32)),
+    max_queue=int(os.environ.get("QUESTION_MAX_QUEUE", 64)),
+    queue_timeout_sec=float(os.environ.get("QUESTION_QUEUE_TIMEOUT_SEC", 10)),
+)
+
+# 업스트림 재시도 정책 (QUESTION_UPSTREAM_TIMEOUT_SEC / _MAX_ATTEMPTS / _DEADLINE_SEC로 조정)
+# 형식 수리 재시도(QUESTION_MAX_ATTEMPTS)와는 별개로, 429/5xx/타임아웃에 대해서만 적용됩니다.
+QUESTION_RETRY_POLICY = RetryPolicy.from_env("QUESTION", timeout_sec=20, max_attempts=3, deadline_sec=30)
+
+# 자소서 입력 토큰 예산 (넘으면 가운데를 생략)
+QUESTION_COVER_LETTER_TOKEN_BUDGET = int(os.environ.get("QUESTION_COVER_LETTER_TOKEN_BUDGET", 2000))
+
+# 자소서 유무에 따른 질문 수
+GENERAL_QUESTION_COUNT = 5
+COVER_LETTER_QUESTION_COUNT = 7
+
+# 자소서 없는 요청에 응답할 질문 수
+BANK_SAMPLE_SIZE = GENERAL_QUESTION_COUNT
+
+# (전공, 직무)별 질문 은행. 빈 문자열로 설정하면 비활성화되어 항상 LLM을 호출합니다.
+# 기본 위치는 작업 디렉터리(저장소)가 아니라 임시 디렉터리입니다.
+question_bank = QuestionBank(
+    sqlite_path=os.environ.get(
+        "QUESTION_BANK_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "question_bank.sqlite3")
+    ),
+    stale_sec=float(os.environ.get("QUESTION_BANK_STALE_SEC", 7 * 86400)),
+    min_pool=int(os.environ.get("QUESTION_BANK_MIN_POOL", 15)),
+    max_pool=int(os.environ.get("QUESTION_BANK_MAX_POOL", 60)),
+)
+
+class QuestionRequest(BaseModel):
+    """클라이언트로부터 받아야 하는 요청 데이터 구조"""
+    major: str = Field(..., description="지원자의 전공")
+    job_title: str = Field(..., description="지원 직무")
+    cover_letter: str = Field("", description="자기소개서 내용")
+
+    @field_validator("major", "job_title", "cover_letter", mode="before")
+    @classmethod
+    def clean_text(cls, value):
+        return normalize_if_str(value)
+
+class QuestionResponse(BaseModel):
+    """클라이언트에게 응답할 데이터 구조"""
+    question: List[str]
+
+class GeneratedQuestions(BaseModel):
+    """질문 생성 LLM 출력 스키마 ({"questions": [...]})"""
+    questions: List[str] = Field(..., description="면접 질문 목록 (항목 하나 = 질문 하나)")
+
+    @field_validator("questions")
+    @classmethod
+    def clean_questions(cls, value: List[str]) -> List[str]:
+        """번호/글머리표를 떼고, 제목·빈 항목·중복은 버립니다. (개수 검사는 parse_questions에서)"""
+        cleaned, seen = [], set()
+        for item in value:
+            question = _LIST_MARKER_RE.sub("", item).strip()
+            if len(question) < _MIN_QUESTION_CHARS or question.endswith(":"):
+                continue
+            if question not in seen:
+                seen.add(question)
+                cleaned.append(question)
+        return cleaned
+
+
+# 항목 앞의 번호/글머리표 ("1.", "2)", "Q3:", "-", "•")
+_LIST_MARKER_RE = re.compile(r"^\s*(?:(?:Q|질문)?\s*\d+\s*[.):]|[-*•])\s*", re.IGNORECASE)
+_MIN_QUESTION_CHARS = 8
+
+QUESTION_SCHEMA_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "interview_questions",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"questions": {"type": "array", "items": {"type": "string"}}},
+            "required": ["questions"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+QUESTION_SYSTEM = """당신은 전문 면접관입니다. 사용자 메시지에 지원자의 전공, 지원 직무(와 자기소개서)가 주어집니다.
+이 지원자를 평가하기 위한 면접 질문을 생성합니다.
+반드시 {"questions": ["질문1", "질문2", ...]} 형식의 JSON 객체 하나만 출력합니다.
+- 배열의 각 항목은 완결된 질문 한 문장입니다.
+- 번호, 글머리표, 제목/머리말, 빈 항목, 설명 문장은 넣지 않습니다."""
+
+GENERAL_QUESTION_PROMPT = PromptTemplate(
+    "question_general",
+    QUESTION_SYSTEM,
+    """전공: $major
+지원 직무: $job_title
+이 지원자를 평가하기 위한 전문적인 면접 질문 $count개를 생성해주세요.""",
+)
+
+COVER_LETTER_QUESTION_PROMPT = PromptTemplate(
+    "question_cover_letter",
+    QUESTION_SYSTEM,
+    """전공: $major
+지원 직무: $job_title
+아래 자기소개서를 참고하여, 자소서 심층 질문 4개 + 직무 역량 질문 3개로 총 $count개 질문을 생성해주세요.
+
+--- 자기소개서 ---
+$cover_letter
+--- 자기소개서 ---""",
+)
+
+# 최초 호출 + 형식 오류 시 수리(repair) 재시도 1회
+QUESTION_MAX_ATTEMPTS = 2
+
+# 시도 단위 카운터 (형식 오류로 버려지는 모델 호출량 측정용)
+_generation_lock = threading.Lock()
+_generation_counters = {
+    "requests": 0,
+    "attempts": 0,
+    "valid_first_attempt": 0,
+    "repaired": 0,
+    "invalid_outputs": 0,
+    "failed": 0,
+    "api_errors": 0,
+}
+
+
+def _count(name: str) -> None:
+    with _generation_lock:
+        _generation_counters[name] += 1
+
+
+def parse_questions(raw: str, expected: int) -> List[str]:
+    """LLM 출력(JSON)을 검증해 질문 목록을 반환합니다. 형식이 틀리면 ValueError (ValidationError 포함)"""
+    questions = GeneratedQuestions.model_validate_json(raw).questions
+    if len(questions) < expected:
+        raise ValueError(f"유효한 질문이 {expected}개 필요하지만 {len(questions)}개만 있습니다.")
+    return questions[:expected]
+
+
+# 3. 질문 생성 함수
+async def generate_interview_questions(major, job_title, cover_letter="") -> Optional[List[str]]:
+    if cover_letter and cover_letter.strip():
+        expected = COVER_LETTER_QUESTION_COUNT
+        cover_letter, original, sent = fit_to_budget(cover_letter, QUESTION_COVER_LETTER_TOKEN_BUDGET, QUESTION_MODEL)
+        record_budget("question_generation", original, sent)
+        messages = COVER_LETTER_QUESTION_PROMPT.render(
+            major=major, job_title=job_title, cover_letter=cover_letter, count=str(expected)
+        )
+    else:
+        expected = GENERAL_QUESTION_COUNT
+        messages = GENERAL_QUESTION_PROMPT.render(major=major, job_title=job_title, count=str(expected))
+
+    question_client = get_async_client(QUESTION_KEY_ENV)
+    if question_client is None:
+        logger.warning("OpenAI API Key가 설정되지 않았습니다. 질문 생성을 건너뜁니다.")
+        return None
+
+    _count("requests")
+    response_format = QUESTION_SCHEMA_FORMAT if QUESTION_JSON_SCHEMA else {"type": "json_object"}
+    for attempt in range(1, QUESTION_MAX_ATTEMPTS + 1):
+        try:
+            _count("attempts")
+            resp = await call_upstream(
+                QUESTION_KEY_ENV, "question_generation",
+                lambda: question_client.chat.completions.create(
+                    model=QUESTION_MODEL,
+                    messages=messages,
+                    response_format=response_format,
+                    temperature=0.7
+                ),
+                QUESTION_RETRY_POLICY,
+                model=QUESTION_MODEL, tokens=estimate_tokens(messages),
+            )
+            record_usage("question_generation", QUESTION_MODEL, resp.usage)
+            raw = resp.choices[0].message.content or ""
+        except OverloadedError:
+            # 제공자 장애(브레이커 열림)나 호출 한도 대기 초과는 500 대신 503 + Retry-After로 돌려줍니다. (main_api 예외 핸들러)
+            _count("api_errors")
+            raise
+        except Exception as e:
+            logger.error("API 호출 오류: %s - %s", type(e).__name__, e)
+            _count("api_errors")
+            return None
+
+        try:
+            questions = parse_questions(raw, expected)
+        except (ValidationError, ValueError) as e:
+            _count("invalid_outputs")
+            logger.warning("질문 생성 출력 형식 오류 (시도 %s/%s): %.200s", attempt, QUESTION_MAX_ATTEMPTS, e)
+            # 수리 재시도: 잘못된 출력과 오류 내용을 보여주고 형식만 고쳐 다시 출력하게 합니다.
+            messages = messages + [
+                {"role": "assistant", "content": raw},
+                {"role": "user", "content": (
+                    f"위 응답은 형식이 올바르지 않습니다: {str(e)[:300]}\n"
+                    f'질문 {expected}개를 {{"questions": [...]}} 형식의 JSON 객체로만 다시 출력해주세요.'
+                )},
+            ]
+            continue
+
+        _count("valid_first_attempt" if attempt == 1 else "repaired")
+        return questions
+
+    _count("failed")
+    return None
+
+def generation_stats():
+    with _generation_lock:
+        counters = dict(_generation_counters)
+    wasted = counters["invalid_outputs"] + counters["api_errors"]
+    counters["wasted_attempt_ratio"] = round(wasted / counters["attempts"], 4) if counters["attempts"] else 0.0
+    return counters
+
+async def get_bank_questions(major, job_title, background_tasks: BackgroundTasks):
+    """
+    자소서가 없는 요청: 질문 은행에서 무작위로 뽑고, 풀이 오래되었거나 작으면 응답 후 백그라운드에서 보충합니다.
+    풀이 비어 있으면 LLM을 직접 호출하고, 그 결과로 풀을 채웁니다.
+    """
+    qs, needs_refill = await question_bank.sample(major, job_title, BANK_SAMPLE_SIZE)
+    if qs:
+        if needs_refill:
+            background_tasks.add_task(question_bank.refill, major, job_title, generate_interview_questions)
+        return qs
+
+    async with question_limiter.slot():
+        qs = await generate_interview_questions(major, job_title)
+    if qs and question_bank.enabled:
+        background_tasks.add_task(question_bank.add, major, job_title, qs)
+    return qs
+
+# 4. 엔드포인트
+@question_router.post("/api/questions", response_model=QuestionResponse)
+async def get_questions(data: QuestionRequest, background_tasks: BackgroundTasks):
+    major = data.major
+    job_title = data.job_title
+    cover_letter = data.cover_letter
+
+    if not major or not job_title:
+        raise HTTPException(status_code=400, detail="학과(major)와 직무(job_title)를 모두 제공해야 합니다.")
+
+    if cover_letter and cover_letter.strip():
+        async with question_limiter.slot():
+            qs = await generate_interview_questions(major, job_title, cover_letter)
+    else:
+        qs = await get_bank_questions(major, job_title, background_tasks)
+    if qs:
+        return {"question": qs}
+    raise HTTPException(status_code=500, detail="면접 질문 생성에 실패했습니다.")
+
+@question_router.get("/api/questions/generation/stats")
+def get_question_generation_stats():
+    """질문 생성 시도/형식 오류/수리 카운터를 반환합니다."""
+    return generation_stats()
+
+@question_router.get("/api/questions/limiter/stats")
+def get_question_limiter_stats():
+    """동시 실행/대기 중인 요청 수와 부하 차단(503) 횟수를 반환합니다."""
+    return question_limiter.stats()
+
+# 5. 서버 실행 (여기 없으면 python question_ai.py 실행 시 바로 종료됨)
+#if __name__ == "__main__":
+#    print("✅ Flask question_ai 서버 시작: http://localhost:5002")
 #    app.run(host="0.0.0.0", port=5002, debug=True)
\ No newline at end of file
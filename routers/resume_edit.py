@@ -5,55 +5,85 @@ Resume Feedback API
 """
 
 import os
-from datetime import datetime
-from fastapi import FastAPI, APIRouter, HTTPException
-from pydantic import BaseModel, Field, validator
-from openai import OpenAI, AsyncOpenAI
+import json
+import time
+import asyncio
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from openai import AsyncOpenAI
 import logging
 
-logging.basicConfig(level=logging.INFO, # INFO 레벨 이상 로그 출력
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    datefmt='%Y-%m-%d %H:%M:%S')
+from core.openai_clients import get_async_client
+from core.pipeline import Stage, run_pipeline
+from core.prompt_templates import PromptTemplate
+from core.token_metrics import record_usage
+from core.token_budget import fit_to_budget, record_budget
+from core.text_normalize import normalize_if_str
+from core.upstream import RetryPolicy, call_upstream
+from core.rate_limit import estimate_tokens
+from core.singleflight import SingleFlight, fingerprint
+from core.resume_history import ResumeHistory, split_segments
+
+# 로깅 구성은 main_api의 setup_logging(core.logging_setup)이 한 곳에서 합니다.
 logger = logging.getLogger(__name__)
 
 resume_router = APIRouter()
 
-# OpenAI Key 가져오기
-RESUME_KEY = os.environ.get("RESUME_OPENAI_KEY")
+# OpenAI Key 환경 변수 (core.openai_clients 레지스트리가 호출 시점에 읽습니다)
+RESUME_KEY_ENV = "RESUME_OPENAI_KEY"
+RESUME_MODEL = "gpt-4o-mini"
 
-try:
-    resume_client = AsyncOpenAI(api_key=RESUME_KEY)
-    print("Resume Router OpenAI 클라이언트 초기화 완료.")
-except Exception as e:
-    print("❌ OpenAI API Key 초기화 실패 → Mock 모드로 작동합니다.")
-    print(e)
-    resume_client = None
+# 파이프라인 단계별 타임아웃(초)
+RESUME_STAGE_TIMEOUT_SEC = float(os.environ.get("RESUME_STAGE_TIMEOUT_SEC", 90))
+
+# 업스트림 재시도 정책 (RESUME_UPSTREAM_TIMEOUT_SEC / _MAX_ATTEMPTS / _DEADLINE_SEC로 조정)
+# 재시도까지 포함해 단계 타임아웃 안에서 끝나도록 전체 한도를 단계 타임아웃에 맞춥니다.
+RESUME_RETRY_POLICY = RetryPolicy.from_env(
+    "RESUME", timeout_sec=40, max_attempts=3, deadline_sec=RESUME_STAGE_TIMEOUT_SEC,
+)
+
+# 진행 중인 같은 이력서 피드백 요청 합치기 (스트리밍 엔드포인트는 클라이언트별 스트림이라 합치지 않습니다)
+# 피드백 → 재생성 두 단계가 순서대로 돌 수 있으므로 단계 타임아웃 두 배만큼 기다립니다.
+feedback_flight = SingleFlight("resume_feedback", wait_timeout_sec=RESUME_STAGE_TIMEOUT_SEC * 2 + 10)
+
+# 이력서 입력 토큰 예산. 이력서는 피드백/재생성/토스 재생성 세 호출에 모두 들어가므로 한 번 잘라 함께 씁니다.
+RESUME_INPUT_TOKEN_BUDGET = int(os.environ.get("RESUME_INPUT_TOKEN_BUDGET", 4000))
+RESUME_PROMPT_USES = 3
+
+# 수정 후 재검토: 사용자별 마지막 제출의 항목(segment)별 결과를 보관하고 바뀐 항목만 다시 분석합니다.
+# 항목마다 피드백/재생성 호출이 따로 나가고 응답이 항목별 블록으로 바뀌므로 기본은 꺼 둡니다.
+# RESUME_HISTORY_SQLITE_PATH에 SQLite 파일 경로를 지정하면 켜집니다. (비우면 이력서 전체를 한 번에 분석)
+resume_history = ResumeHistory(
+    sqlite_path=os.environ.get("RESUME_HISTORY_SQLITE_PATH", ""),
+    ttl_sec=float(os.environ.get("RESUME_HISTORY_TTL_SEC", 30 * 86400)),
+)
+RESUME_SEGMENT_MIN_CHARS = int(os.environ.get("RESUME_SEGMENT_MIN_CHARS", 250))
+RESUME_SEGMENT_MAX_CHARS = int(os.environ.get("RESUME_SEGMENT_MAX_CHARS", 800))
+
+# 단계 실패/타임아웃 시 대신 채워 넣을 문구
+STAGE_FALLBACK_TEXT = "AI 분석 중 오류가 발생했습니다. 내용을 다시 시도해 주세요."
+
+
+def get_resume_client() -> Optional[AsyncOpenAI]:
+    """공유 AsyncOpenAI 클라이언트 (키가 없으면 None → Mock 텍스트 반환)"""
+    return get_async_client(RESUME_KEY_ENV)
 
 
 # ------------------------------- DTO ---------------------------------
 
 class ResumeInput(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     userId: int
     resume_content: str = Field(alias="resumeContent")
 
-    class Config:
-        allow_population_by_field_name = True
-
-    @validator('resume_content', pre=True)
+    @field_validator('resume_content', mode='before')
+    @classmethod
     def clean_resume_content(cls, value):
-        if not isinstance(value, str):
-            return value
-        
-        value = value.replace('“', '"').replace('”', '"')
-        value = value.replace('‘', ''').replace('’', ''')
-
-        value = value.replace('\u200b', ' ')
-        value = value.replace('\xa0', ' ')
-        value = value.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-
-        value = ' '.join(value.split())
-
-        return value
+        # 따옴표 통일, 제로폭/NBSP 공백 정리, 개행/탭/연속 공백 → 공백 하나 (core.text_normalize)
+        return normalize_if_str(value)
 
 class FeedbackResponse(BaseModel):
     userId: int
@@ -187,160 +217,437 @@ system_message = """
 """
 
 
+# ------------------------------- PROMPT TEMPLATES ---------------------------------
+# 고정 지시문은 system(앞), 이력서/피드백처럼 요청마다 바뀌는 값은 user(뒤)에 둡니다.
+# → 세 호출 모두 동일한 prefix로 시작하므로 provider 측 prompt caching이 적용됩니다.
+#   (토스 재생성 지시문은 일반 재생성 지시문 뒤에 덧붙여 두 호출이 prefix를 공유합니다)
+
+REGEN_INSTRUCTIONS = """사용자 메시지에 **사용자가 제출한 원본 이력서 내용**과 **AI가 생성한 상세 피드백**이 주어집니다.
+이 피드백을 100% 반영하여 원본 이력서 내용을 개선해 주세요. 응답은 오직 **개선된 이력서 내용**만 포함해야 합니다. 줄을 띄어쓰지 말고 한 줄로 이어서 작성해주세요. 이름, 전화번호, 이메일, 학력, 학점 등은 작성하지 않습니다. 오로지 이력서에 작성된 경험 및 활동에 해당하는 부분만 개선합니다."""
+
+TOSS_INSTRUCTIONS = """이 자소서는 토스 기업의 인재상을 반영하여 작성되어야합니다. 토스 인재상 핵심 가치는 다음과 같습니다.
+1) 깊은 몰입 (Deep Focus & Ownership)
+- 각자의 방식으로 문제에 깊게 몰입하고 주도적으로 해결함
+- 맡은 일에 대해 스스로 결정하고 끝까지 책임지는 태도
+- 지시를 기다리지 않고 필요하면 먼저 움직이는 사람
+
+2) DRI 기반 책임감 있는 전문가
+- 맡은 일에 대한 최종 의사결정권(DRI)을 가지고 판단함
+- 결과에 대한 모든 책임을 스스로 짐
+- 필요한 정보를 수집해 전문가로서 합리적 결정을 내릴 수 있는 사람
+
+3) 높은 윤리성과 자율성
+- 자율을 악용하지 않고 스스로 기준을 지킬 줄 아는 사람
+- 불필요한 규칙 없이도 스스로 일을 통제하고 정직하게 수행함
+- 신뢰를 기반으로 협력할 수 있는 도덕성 보유
+
+4) 투명한 정보 공유
+- 정보 비대칭을 없애기 위해 정보를 모두에게 개방
+- 숨기거나 정치적으로 움직이지 않으며, 모두가 동일한 정보 기반에서 일함
+- 협업을 위해 필요한 정보를 능동적으로 찾아 공유
+
+5) 빠른 실패와 학습
+- 실패를 두려워하지 않고 빠르게 시도하고 개선하는 사람
+- 실패에서 배운 점을 구조적으로 정리하고 다음 실행에 반영
+- 빠른 시도 → 실패 → 학습 → 재도전의 사이클을 긍정적으로 받아들임
+
+이 인재상은 자기소개서 개선 시 다음과 같이 활용되어야합니다.
+- 지원자가 맡은 일에 대한 주도성과 책임감을 보여주는 표현 강화
+- 불필요한 장식 대신 '몰입·책임·자율·투명·학습'의 키워드를 반영한 경험 강조
+- 프로젝트나 활동에서의 '결정 경험, 빠른 실험, 실패 복기, 자율적 행동' 등을 구체적으로 서술하도록 유도"""
+
+REGEN_USER_TEMPLATE = """--- 원본 이력서 ---
+$resume
+
+--- 피드백 내용 ---
+$feedback"""
+
+FEEDBACK_PROMPT = PromptTemplate(
+    "resume_feedback",
+    system=system_message,
+    user_template="아래는 사용자가 제출한 이력서(자기소개서) 내용입니다. 위 가이드라인에 따라 한국어로 상세 피드백을 작성해 주세요.\n\n$resume",
+)
+
+# 항목 단위 피드백: 전체 피드백 지시문 뒤에 덧붙여 같은 prefix를 공유합니다.
+SEGMENT_INSTRUCTIONS = """## 항목 단위 검토
+이번 사용자 메시지에는 이력서 전체가 아니라 한 부분(경험/활동 항목 하나, 또는 기본 정보·기술 스택 등)만 주어집니다.
+- 종합 평가와 전체 구조 체크리스트는 생략하고, 이 부분에 대한 우선순위별 개선 사항, 상세 피드백(Before/After), 실행 체크리스트만 작성해 주세요.
+- 주어지지 않은 다른 항목을 추측해 언급하지 않습니다."""
+
+SEGMENT_FEEDBACK_PROMPT = PromptTemplate(
+    "resume_feedback_segment",
+    system=system_message + "\n\n" + SEGMENT_INSTRUCTIONS,
+    user_template="아래는 사용자가 제출한 이력서(자기소개서)의 한 부분입니다. 위 가이드라인에 따라 한국어로 상세 피드백을 작성해 주세요.\n\n$resume",
+)
+
+REGEN_PROMPT = PromptTemplate(
+    "resume_regen",
+    system=REGEN_INSTRUCTIONS,
+    user_template=REGEN_USER_TEMPLATE,
+)
+
+TOSS_REGEN_PROMPT = PromptTemplate(
+    "resume_regen_toss",
+    system=REGEN_INSTRUCTIONS + "\n\n" + TOSS_INSTRUCTIONS,
+    user_template=REGEN_USER_TEMPLATE,
+)
+
+
 # ------------------------------- OPENAI CALL ---------------------------------
 
-async def generate_feedback_async(resume_text: str) -> str:
-    """OpenAI API 호출 → 피드백 생성"""
+async def generate_feedback_async(resume_text: str, template: PromptTemplate = FEEDBACK_PROMPT) -> str:
+    """OpenAI API 호출 → 피드백 생성 (실패하면 예외: 파이프라인이 의존 단계를 건너뜁니다)"""
 
-    logger.info(f"generate_feedback_async 시작: Content 길이={len(resume_text)}")
+    logger.info("generate_feedback_async 시작: Content 길이=%s", len(resume_text))
 
     # API KEY 없으면 Mock 텍스트 반환
+    resume_client = get_resume_client()
     if resume_client is None:
         return "현재 OpenAI Key가 없어 테스트용 더미 피드백을 반환합니다."
 
-    # system + user 프롬프트를 하나의 문자열로 합쳐서 사용
-    prompt = (
-        system_message
-        + "\n\n"
-        + "아래는 사용자가 제출한 이력서(자기소개서) 내용입니다. 위 가이드라인에 따라 한국어로 상세 피드백을 작성해 주세요.\n\n"
-        + resume_text
+    messages = template.render(resume=resume_text)
+    response = await call_upstream(
+        RESUME_KEY_ENV, template.name,
+        lambda: resume_client.chat.completions.create(
+            model=RESUME_MODEL,
+            messages=messages
+        ),
+        RESUME_RETRY_POLICY,
+        model=RESUME_MODEL, tokens=estimate_tokens(messages),
     )
+    tokens = record_usage(template.name, RESUME_MODEL, response.usage)
+    logger.info("generate_feedback_async: OpenAI 호출 성공 (입력 %s / 캐시 %s 토큰)", tokens['input_tokens'], tokens['cached_input_tokens'])
+    return response.choices[0].message.content
 
-    try:
-        response = await resume_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        logger.info("generate_feedback_async: OpenAI 호출 성공")
-        return response.choices[0].message.content
-    except Exception as e:
-        print(" OpenAI 호출 중 오류:", e)
-        logger.error(f"generate_feedback_async: OpenAI 호출 중 오류 발생", exc_info=True)
-        return "AI 분석 중 오류가 발생했습니다. 내용을 다시 입력해 주세요."
-
-# 자기소개서 재생성 함수    
-async def regenerate_resume_async(original_resume_text: str, feedback_text: str) -> str:
-    """
-    주어진 피드백을 바탕으로 이력서 내용을 재생성하고 개선합니다.
-    """
-    logger.info("regenerate_resume_async 시작")
+
+async def _regenerate_async(template: PromptTemplate, original_resume_text: str, feedback_text: str) -> str:
+    """피드백을 바탕으로 이력서를 재생성합니다. (Responses API, 고정 지시문은 instructions로 맨 앞에)"""
 
     # API KEY 없으면 Mock 텍스트 반환
+    resume_client = get_resume_client()
     if resume_client is None:
         return "현재 OpenAI Key가 없어 테스트용 더미 재생성 이력서를 반환합니다."
 
-    # 재생성 프롬프트 구성: 원본 이력서 + 피드백을 함께 제공하여 개선을 요청합니다.
-    prompt = (
-        "아래는 **사용자가 제출한 원본 이력서 내용**입니다.\n\n"
-        + "--- 원본 이력서 ---\n"
-        + original_resume_text
-        + "\n\n"
-        + "아래는 **AI가 생성한 상세 피드백**입니다. 이 피드백을 100% 반영하여 원본 이력서 내용을 개선해 주세요. 응답은 오직 **개선된 이력서 내용**만 포함해야 합니다. 줄을 띄어쓰지 말고 한 줄로 이어서 작성해주세요. 이름, 전화번호, 이메일, 학력, 학점 등은 작성하지 않습니다. 오로지 이력서에 작성된 경험 및 활동에 해당하는 부분만 개선합니다.\n\n"
-        + "--- 피드백 내용 ---\n"
-        + feedback_text
+    user_input = template.render_user(resume=original_resume_text, feedback=feedback_text)
+    response = await call_upstream(
+        RESUME_KEY_ENV, template.name,
+        lambda: resume_client.responses.create(
+            model=RESUME_MODEL,
+            instructions=template.system,
+            input=user_input
+        ),
+        RESUME_RETRY_POLICY,
+        model=RESUME_MODEL, tokens=estimate_tokens(template.system + user_input),
     )
+    tokens = record_usage(template.name, RESUME_MODEL, response.usage)
+    logger.info("%s: OpenAI 호출 성공 (입력 %s / 캐시 %s 토큰)", template.name, tokens['input_tokens'], tokens['cached_input_tokens'])
+    return response.output[0].content[0].text
+
+
+# 자기소개서 재생성 함수
+async def regenerate_resume_async(original_resume_text: str, feedback_text: str) -> str:
+    """
+    주어진 피드백을 바탕으로 이력서 내용을 재생성하고 개선합니다.
+    """
+    logger.info("regenerate_resume_async 시작")
+    return await _regenerate_async(REGEN_PROMPT, original_resume_text, feedback_text)
+
 
-    try:
-        # OpenAI API 호출 (gpt-4o-mini 그대로 사용)
-        response = await resume_client.responses.create(
-            model="gpt-4o-mini",
-            input=prompt
-        )
-        logger.info("regenerate_resume_async: OpenAI 호출 성공")
-        # 응답 구조는 사용하신 OpenAI 라이브러리 버전에 따라 다를 수 있습니다.
-        # 기존 코드와 동일한 구조를 따릅니다.
-        return response.output[0].content[0].text
-    
-    except Exception as e:
-        print("OpenAI 호출 중 오류:", e)
-        logger.error(f"regenerate_resume_async: OpenAI 호출 중 오류 발생", exc_info=True)
-        return "AI 분석 중 오류가 발생했습니다. 내용을 다시 시도해 주세요."
-    
 #자기소개서 토스 인재상 재생성 함수
 async def regenerate_toss_resume_async(original_resume_text: str, feedback_text: str) -> str:
     """
-    주어진 피드백을 바탕으로 이력서 내용을 재생성하고 개선합니다.
+    주어진 피드백을 바탕으로 토스 인재상에 맞춰 이력서 내용을 재생성하고 개선합니다.
     """
     logger.info("regenerate_toss_resume_async 시작")
+    return await _regenerate_async(TOSS_REGEN_PROMPT, original_resume_text, feedback_text)
 
-    # API KEY 없으면 Mock 텍스트 반환
+# ------------------------------- STREAMING ---------------------------------
+
+async def stream_feedback_async(resume_text: str) -> AsyncIterator[str]:
+    """generate_feedback_async의 스트리밍 버전: 토큰(delta)이 도착하는 대로 yield"""
+
+    resume_client = get_resume_client()
     if resume_client is None:
-        return "현재 OpenAI Key가 없어 테스트용 더미 재생성 이력서를 반환합니다."
+        yield "현재 OpenAI Key가 없어 테스트용 더미 피드백을 반환합니다."
+        return
+
+    # 재시도는 스트림이 열릴 때(응답 헤더)까지만 합니다. 이미 보낸 토큰이 있으면 다시 보낼 수 없으므로.
+    messages = FEEDBACK_PROMPT.render(resume=resume_text)
+    stream = await call_upstream(
+        RESUME_KEY_ENV, FEEDBACK_PROMPT.name,
+        lambda: resume_client.chat.completions.create(
+            model=RESUME_MODEL,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True}  # 마지막 청크에 usage 포함
+        ),
+        RESUME_RETRY_POLICY,
+        model=RESUME_MODEL, tokens=estimate_tokens(messages),
+    )
+    async for chunk in stream:
+        if chunk.usage:
+            record_usage(FEEDBACK_PROMPT.name, RESUME_MODEL, chunk.usage)
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
 
-    # 재생성 프롬프트 구성: 원본 이력서 + 피드백을 함께 제공하여 개선을 요청합니다.
-    prompt = (
-        "아래는 **사용자가 제출한 원본 이력서 내용**입니다.\n\n"
-        + "--- 원본 이력서 ---\n"
-        + original_resume_text
-        + "\n\n"
-        + """아래는 **AI가 생성한 상세 피드백**입니다. 이 피드백을 100% 반영하여 원본 이력서 내용을 개선해 주세요. 
-        응답은 오직 **개선된 이력서 내용**만 포함해야 합니다. 줄을 띄어쓰지 말고 한 줄로 이어서 작성해주세요. 
-        이름, 전화번호, 이메일, 학력, 학점 등은 작성하지 않습니다. 오로지 이력서에 작성된 경험 및 활동에 해당하는 부분만 개선합니다.
-        이 자소서는 토스 기업의 인재상을 반영하여 작성되어야합니다. 토스 인재상 핵심 가치는 다음과 같습니다.
-        1) 깊은 몰입 (Deep Focus & Ownership)
-        - 각자의 방식으로 문제에 깊게 몰입하고 주도적으로 해결함
-        - 맡은 일에 대해 스스로 결정하고 끝까지 책임지는 태도
-        - 지시를 기다리지 않고 필요하면 먼저 움직이는 사람
-        
-        2) DRI 기반 책임감 있는 전문가
-        - 맡은 일에 대한 최종 의사결정권(DRI)을 가지고 판단함
-        - 결과에 대한 모든 책임을 스스로 짐
-        - 필요한 정보를 수집해 전문가로서 합리적 결정을 내릴 수 있는 사람
-        
-        3) 높은 윤리성과 자율성
-        - 자율을 악용하지 않고 스스로 기준을 지킬 줄 아는 사람
-        - 불필요한 규칙 없이도 스스로 일을 통제하고 정직하게 수행함
-        - 신뢰를 기반으로 협력할 수 있는 도덕성 보유
-
-        4) 투명한 정보 공유
-        - 정보 비대칭을 없애기 위해 정보를 모두에게 개방
-        - 숨기거나 정치적으로 움직이지 않으며, 모두가 동일한 정보 기반에서 일함
-        - 협업을 위해 필요한 정보를 능동적으로 찾아 공유
-
-        5) 빠른 실패와 학습
-        - 실패를 두려워하지 않고 빠르게 시도하고 개선하는 사람
-        - 실패에서 배운 점을 구조적으로 정리하고 다음 실행에 반영
-        - 빠른 시도 → 실패 → 학습 → 재도전의 사이클을 긍정적으로 받아들임
-
-        이 인재상은 자기소개서 개선 시 다음과 같이 활용되어야합니다.
-        - 지원자가 맡은 일에 대한 주도성과 책임감을 보여주는 표현 강화
-        - 불필요한 장식 대신 '몰입·책임·자율·투명·학습'의 키워드를 반영한 경험 강조
-        - 프로젝트나 활동에서의 '결정 경험, 빠른 실험, 실패 복기, 자율적 행동' 등을 구체적으로 서술하도록 유도\n\n"""
-        + "--- 피드백 내용 ---\n"
-        + feedback_text
+async def _stream_responses_text(template: PromptTemplate, **values: str) -> AsyncIterator[str]:
+    """Responses API 스트리밍에서 출력 텍스트 delta만 골라 yield"""
+
+    resume_client = get_resume_client()
+    if resume_client is None:
+        yield "현재 OpenAI Key가 없어 테스트용 더미 재생성 이력서를 반환합니다."
+        return
+
+    user_input = template.render_user(**values)
+    stream = await call_upstream(
+        RESUME_KEY_ENV, template.name,
+        lambda: resume_client.responses.create(
+            model=RESUME_MODEL,
+            instructions=template.system,
+            input=user_input,
+            stream=True
+        ),
+        RESUME_RETRY_POLICY,
+        model=RESUME_MODEL, tokens=estimate_tokens(template.system + user_input),
     )
+    async for event in stream:
+        if event.type == "response.output_text.delta":
+            yield event.delta
+        elif event.type == "response.completed":
+            record_usage(template.name, RESUME_MODEL, event.response.usage)
+
+
+def stream_regenerate_resume_async(original_resume_text: str, feedback_text: str) -> AsyncIterator[str]:
+    """regenerate_resume_async의 스트리밍 버전"""
+    return _stream_responses_text(REGEN_PROMPT, resume=original_resume_text, feedback=feedback_text)
 
+
+def stream_regenerate_toss_resume_async(original_resume_text: str, feedback_text: str) -> AsyncIterator[str]:
+    """regenerate_toss_resume_async의 스트리밍 버전"""
+    return _stream_responses_text(TOSS_REGEN_PROMPT, resume=original_resume_text, feedback=feedback_text)
+
+
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 한 건을 직렬화합니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_resume_pipeline(user_id: int, resume_text: str) -> AsyncIterator[str]:
+    """
+    피드백을 먼저 스트리밍하고, 완성된 피드백으로 두 재생성을 동시에 스트리밍합니다.
+    - event: delta  → {"section": ..., "text": 토큰}
+    - event: done   → {"section": ...}
+    - event: error  → {"section": ..., "message": 대체 문구}
+    - event: end    → {"userId": ...}
+    """
+
+    # 1) 피드백 스트리밍 (재생성 단계의 입력이므로 전체 텍스트를 모읍니다)
+    feedback_parts = []
+    try:
+        async for delta in stream_feedback_async(resume_text):
+            feedback_parts.append(delta)
+            yield _sse("delta", {"section": "feedback", "text": delta})
+    except Exception:
+        logger.error("stream_resume_pipeline: 피드백 스트리밍 중 오류 발생", exc_info=True)
+        # 피드백이 없으면 재생성도 의미가 없으므로 의존 단계는 건너뜁니다.
+        for section in ("feedback", "regen_resume", "regen_toss_resume"):
+            yield _sse("error", {"section": section, "message": STAGE_FALLBACK_TEXT})
+        yield _sse("end", {"userId": user_id})
+        return
+    yield _sse("done", {"section": "feedback"})
+
+    feedback = "".join(feedback_parts)
+
+    # 2) 두 재생성 스트림을 하나의 큐로 합쳐 도착 순서대로 전달
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump(section: str, source: AsyncIterator[str]):
+        try:
+            async for delta in source:
+                await queue.put(_sse("delta", {"section": section, "text": delta}))
+            await queue.put(_sse("done", {"section": section}))
+        except Exception:
+            logger.error("stream_resume_pipeline: %s 스트리밍 중 오류 발생", section, exc_info=True)
+            await queue.put(_sse("error", {"section": section, "message": STAGE_FALLBACK_TEXT}))
+        finally:
+            await queue.put(None)
+
+    tasks = [
+        asyncio.create_task(pump("regen_resume", stream_regenerate_resume_async(resume_text, feedback))),
+        asyncio.create_task(pump("regen_toss_resume", stream_regenerate_toss_resume_async(resume_text, feedback))),
+    ]
     try:
-        # OpenAI API 호출 (gpt-4o-mini 그대로 사용)
-        response = await resume_client.responses.create(
-            model="gpt-4o-mini",
-            input=prompt
+        remaining = len(tasks)
+        while remaining:
+            item = await queue.get()
+            if item is None:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        # 클라이언트가 연결을 끊으면 남은 업스트림 스트림도 정리합니다.
+        for task in tasks:
+            task.cancel()
+
+    yield _sse("end", {"userId": user_id})
+
+
+def budget_resume_text(resume_text: str) -> Tuple[str, int]:
+    """예산을 넘는 이력서는 가운데를 생략합니다. → (프롬프트에 넣을 텍스트, 이번 요청에서 절감한 입력 토큰 수)"""
+    text, original, sent = fit_to_budget(resume_text, RESUME_INPUT_TOKEN_BUDGET, RESUME_MODEL)
+    saved = record_budget("resume_feedback", original * RESUME_PROMPT_USES, sent * RESUME_PROMPT_USES)
+    return text, saved
+
+
+async def run_feedback_pipeline(resume_text: str, feedback_prompt: PromptTemplate = FEEDBACK_PROMPT) -> dict:
+    """피드백 생성 → (일반 재생성 ∥ 토스 인재상 재생성). 단계별 결과와 Server-Timing 값을 dict로 반환합니다."""
+
+    # 두 재생성 단계는 피드백 결과에만 의존하므로 동시에 실행합니다.
+    result = await run_pipeline([
+        Stage(
+            "feedback",
+            lambda deps: generate_feedback_async(resume_text, feedback_prompt),
+            timeout=RESUME_STAGE_TIMEOUT_SEC,
+            fallback=STAGE_FALLBACK_TEXT,
+        ),
+        Stage(
+            "regen_resume",
+            lambda deps: regenerate_resume_async(resume_text, deps["feedback"]),
+            depends_on=("feedback",),
+            timeout=RESUME_STAGE_TIMEOUT_SEC,
+            fallback=STAGE_FALLBACK_TEXT,
+        ),
+        Stage(
+            "regen_toss_resume",
+            lambda deps: regenerate_toss_resume_async(resume_text, deps["feedback"]),
+            depends_on=("feedback",),
+            timeout=RESUME_STAGE_TIMEOUT_SEC,
+            fallback=STAGE_FALLBACK_TEXT,
+        ),
+    ])
+
+    logger.info("%s 파이프라인 완료: 단계별 지연(ms)=%s, 전체=%.1fms", feedback_prompt.name, result.latencies(), result.total_ms)
+    for stage in result.stages.values():
+        if not stage.ok:
+            logger.warning("resume_feedback 단계 '%s' %s: %s", stage.name, stage.status, stage.error)
+
+    return {
+        "feedback": result.output("feedback"),
+        "regen_resume": result.output("regen_resume"),
+        "regen_toss_resume": result.output("regen_toss_resume"),
+        "server_timing": result.server_timing(),
+        # 실패한 단계는 대체 문구가 들어 있으므로 항목 결과로 보관하지 않습니다.
+        "ok": all(stage.ok for stage in result.stages.values()),
+    }
+
+
+def _segment_key(segment: str, feedback_prompt: PromptTemplate) -> str:
+    """항목 지문: 모델이나 지시문이 바뀌면(배포) 이전 결과를 쓰지 않습니다."""
+    return fingerprint(
+        RESUME_MODEL, feedback_prompt.prefix_id, REGEN_PROMPT.prefix_id, TOSS_REGEN_PROMPT.prefix_id, segment,
+    )
+
+
+def _merge_feedback(segments: List[str], feedbacks: List[str]) -> str:
+    if len(segments) == 1:
+        return feedbacks[0]
+    parts = []
+    for i, (segment, feedback) in enumerate(zip(segments, feedbacks), 1):
+        title = segment if len(segment) <= 30 else segment[:30] + "…"
+        parts.append(f"## 📝 항목 {i}: {title}\n\n{feedback}")
+    return "\n\n".join(parts)
+
+
+async def run_incremental_pipeline(user_id: int, resume_text: str) -> dict:
+    """
+    이력서를 항목으로 나눠, 이 사용자의 이전 제출과 지문이 같은 항목은 저장된 결과를 쓰고
+    바뀐 항목만 run_feedback_pipeline으로 동시에 분석합니다. 반환 형식은 run_feedback_pipeline과 같습니다.
+    """
+    started = time.perf_counter()
+    segments = split_segments(resume_text, RESUME_SEGMENT_MIN_CHARS, RESUME_SEGMENT_MAX_CHARS)
+    # 한 항목뿐이면 이력서 전체 피드백(종합 평가 포함)과 같으므로 전체 지시문을 씁니다.
+    feedback_prompt = FEEDBACK_PROMPT if len(segments) == 1 else SEGMENT_FEEDBACK_PROMPT
+    keys = [_segment_key(segment, feedback_prompt) for segment in segments]
+
+    previous = await resume_history.load(user_id)
+    changed = {key: segment for key, segment in zip(keys, segments) if key not in previous}
+    outputs = await asyncio.gather(*[
+        run_feedback_pipeline(segment, feedback_prompt) for segment in changed.values()
+    ])
+    fresh = dict(zip(changed, outputs))
+
+    results = {key: previous.get(key) or fresh[key] for key in keys}
+    reused = sum(1 for key in keys if key in previous)
+    resume_history.record(len(keys), reused, revision=bool(previous))
+    await resume_history.save(user_id, {
+        key: {name: output[name] for name in ("feedback", "regen_resume", "regen_toss_resume")}
+        for key, output in results.items()
+        if key in previous or output["ok"]
+    })
+
+    total_ms = (time.perf_counter() - started) * 1000
+    logger.info("resume_feedback 항목 단위 분석: userId=%s, 항목 %s개 중 재사용 %s / 분석 %s, %.1fms",
+                user_id, len(keys), reused, len(changed), total_ms)
+    return {
+        "feedback": _merge_feedback(segments, [results[key]["feedback"] for key in keys]),
+        "regen_resume": " ".join(results[key]["regen_resume"] for key in keys),
+        "regen_toss_resume": " ".join(results[key]["regen_toss_resume"] for key in keys),
+        "server_timing": f'segments;desc="reused {reused}/{len(keys)}", total;dur={total_ms:.1f}',
+        "ok": all(output["ok"] for output in outputs),
+    }
+
+
+async def create_feedback(req: ResumeInput) -> Tuple[FeedbackResponse, str, int]:
+    """→ (응답, Server-Timing 값, 절감한 입력 토큰 수). 동기 엔드포인트와 비동기 작업(/jobs)이 함께 씁니다."""
+    resume_text, tokens_saved = budget_resume_text(req.resume_content)
+    # 같은 이력서가 처리 중이면(더블 클릭/타임아웃 재시도) 파이프라인을 다시 돌리지 않고 그 결과를 함께 받습니다.
+    if resume_history.enabled:
+        # 항목 결과를 사용자 기록에 남기므로 사용자가 다르면 합치지 않습니다.
+        outputs = await feedback_flight.do(
+            fingerprint(RESUME_MODEL, "incremental", req.userId, resume_text),
+            lambda: run_incremental_pipeline(req.userId, resume_text),
         )
-        logger.info("regenerate_toss_resume_async: OpenAI 호출 성공")
-        # 응답 구조는 사용하신 OpenAI 라이브러리 버전에 따라 다를 수 있습니다.
-        # 기존 코드와 동일한 구조를 따릅니다.
-        return response.output[0].content[0].text
-    
-    except Exception as e:
-        print("OpenAI 호출 중 오류:", e)
-        logger.error(f"regenerate_toss_resume_async: OpenAI 호출 중 오류 발생", exc_info=True)
-        return "AI 분석 중 오류가 발생했습니다. 내용을 다시 시도해 주세요."
+    else:
+        outputs = await feedback_flight.do(
+            fingerprint(RESUME_MODEL, resume_text),
+            lambda: run_feedback_pipeline(resume_text),
+        )
+    logger.info("resume_feedback 완료: userId=%s", req.userId)
+
+    feedback = FeedbackResponse(
+        userId=req.userId,
+        original_resume=req.resume_content,
+        feedback=outputs["feedback"],
+        regen_resume=outputs["regen_resume"],
+        regen_toss_resume=outputs["regen_toss_resume"]
+    )
+    return feedback, outputs["server_timing"], tokens_saved
+
 
 # ------------------------------- ENDPOINT ---------------------------------
 
 @resume_router.post("/resume/feedback", response_model=FeedbackResponse)
-async def resume_feedback(req: ResumeInput):
+async def resume_feedback(req: ResumeInput, response: Response):
     """스프링 → 파이썬: 피드백 생성 후 즉시 반환"""
 
-    feedback = await generate_feedback_async(req.resume_content)
-    regenresume = await regenerate_resume_async(req.resume_content, feedback)
-    regentossresume = await regenerate_toss_resume_async(req.resume_content, feedback)
-    
-    return FeedbackResponse(
-        userId=req.userId,
-        original_resume=req.resume_content,
-        feedback=feedback,
-        regen_resume=regenresume,
-        regen_toss_resume=regentossresume
+    feedback, server_timing, tokens_saved = await create_feedback(req)
+    response.headers["Server-Timing"] = server_timing
+    response.headers["X-Input-Tokens-Saved"] = str(tokens_saved)
+    return feedback
+
+
+@resume_router.post("/resume/feedback/stream")
+async def resume_feedback_stream(req: ResumeInput):
+    """스프링 → 파이썬: 피드백/재생성 결과를 토큰 단위로 SSE 스트리밍"""
+
+    resume_text, tokens_saved = budget_resume_text(req.resume_content)
+    return StreamingResponse(
+        stream_resume_pipeline(req.userId, resume_text),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # 프록시(nginx) 버퍼링 비활성화
+            "X-Input-Tokens-Saved": str(tokens_saved),
+        },
     )
-
@@ -1,122 +1,228 @@
-# voice_ai.py
-# ================================================================
-# 음성 STT 서버 (FastAPI + OpenAI Whisper)
-# ================================================================
-
-import os
-import json
-import logging
-from io import BytesIO  # ✅ 파일 데이터를 바이트 스트림으로 처리하기 위해 사용
-
-from fastapi import UploadFile, File, Form, HTTPException, APIRouter
-from fastapi.responses import Response
-from pydantic import BaseModel
-from openai import OpenAI
-from openai import OpenAIError # 💡 OpenAI API 관련 예외 처리를 위해 추가
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-
-# -----------------------------
-# 0. 환경 변수 / OpenAI 설정
-# -----------------------------
-
-voice_router = APIRouter()
-
-# 🚨 주의: 전역 초기화 코드 (VOICE_KEY, client 정의 블록)는 
-# 타이밍 문제 해결을 위해 삭제되었습니다.
-
-
-# -----------------------------
-# 2. 응답 DTO (STT 결과)
-# -----------------------------
-class SttResult(BaseModel):
-    answerText: str  # STT 결과 텍스트만 반환
-
-# -----------------------------
-# 3. 헬스체크 & 파비콘
-# -----------------------------
-@voice_router.get("/health")
-async def health():
-    return {"ok": True}
-
-@voice_router.get("/favicon.ico")
-async def favicon():
-    return Response(status_code=204)
-
-# -----------------------------
-# 4. 핵심 API: /analyze
-# -----------------------------
-@voice_router.post("/analyze", response_model=SttResult)
-async def analyze(
-    meta: str = Form(...),
-    file: UploadFile = File(...),
-):
-    """
-    🎧 음성 파일을 Whisper에 보내서 텍스트로 변환
-    - meta: 인터뷰 / 질문 정보 (백엔드에서 사용하는 용도)
-    - file: .m4a / .mp3 / .wav / .webm / .ogg 등
-    """
-
-    # 1) meta JSON 파싱
-    try:
-        meta_obj = json.loads(meta)
-        logger.info(f"STT 요청 수신: Interview ID={meta_obj.get('interviewId')}, 파일명={file.filename}")
-    except Exception as e:
-        logger.error(f"메타 JSON 파싱 오류: {e}")
-        # ⚠️ (추가) 요청을 보내는 클라이언트 측에서 유효한 JSON 문자열("{"interviewId": 0}")을 보내야 합니다.
-        raise HTTPException(status_code=400, detail=f"invalid meta json: {e}")
-
-    interview_id = meta_obj.get("interviewId")
-    question_id = meta_obj.get("questionId")
-    user_id = meta_obj.get("userId")  # 없어도 됨 (null 허용)
-
-    # 2) 파일 기본 검증
-    if not file or not file.filename:
-        logger.error("파일 누락 오류 발생")
-        raise HTTPException(status_code=400, detail="file missing")
-
-    lower_name = file.filename.lower()
-    if not lower_name.endswith((".m4a", ".mp3", ".wav", ".webm", ".ogg")):
-        logger.error(f"지원하지 않는 오디오 타입: {file.filename}")
-        raise HTTPException(status_code=400, detail="unsupported audio type")
-
-    # 3) Whisper 호출 (실제 STT)
-    try:
-        # 💡 [핵심 해결] 지연 초기화: 함수 호출 시점에 키를 읽어 클라이언트 생성
-        local_voice_key = os.environ.get("QUESTION_VOICE_OPENAI_KEY")
-        if not local_voice_key:
-            logger.error("QUESTION_VOICE_OPENAI_KEY 환경 변수가 설정되지 않았습니다.")
-            raise HTTPException(status_code=500, detail="Whisper 호출 실패: OpenAI API Key 설정 누락")
-        
-        # 🔑 클라이언트 생성 (OpenAI API Key 누락 오류 해결)
-        client = OpenAI(api_key=local_voice_key) 
-        
-        # ✅ 업로드 파일 바이트 읽어서 BytesIO로 감싸기
-        contents = await file.read()
-        audio_bytes = BytesIO(contents)
-        audio_bytes.name = file.filename  # 확장자 포함 이름을 달아줌
-
-        logger.info(f"Whisper API 호출 시도: 모델=whisper-1, 파일 크기={len(contents)} bytes") 
-
-        transcription = client.audio.transcriptions.create(
-            model="whisper-1",
-            file=audio_bytes,
-            language="ko",
-        )
-
-        text = getattr(transcription, "text", None) or str(transcription)
-
-        logger.info(f"Whisper 호출 성공: 텍스트 길이={len(text)}")
-
-    except OpenAIError as e:
-        # OpenAI API 호출 자체에서 발생한 오류 처리 (예: 잘못된 키, 모델)
-        logger.error(f"Whisper API 오류: {e.status_code} - {e.response.text}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Whisper API 오류: {e}")
-    except Exception as e:
-        logger.error(f"Whisper 호출 실패: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Whisper 호출 실패: {e}")
-
-    # 4) 최종 응답
+# voice_ai.py
+# ================================================================
+# 음성 STT 서버 (FastAPI + OpenAI Whisper)
+# ================================================================
+
+import os
+import json
+import asyncio
+import logging
+
+from fastapi import UploadFile, File, Form, HTTPException, APIRouter
+from fastapi.responses import Response
+from pydantic import BaseModel
+from openai import OpenAIError # 💡 OpenAI API 관련 예외 처리를 위해 추가
+
+from core.openai_clients import get_async_client
+from core.audio_preprocess import AudioDecodeError, AudioTooLongError, preprocess_audio
+from core.long_audio import LONG_AUDIO_MAX_SEC, probe_duration_sec, transcribe_long_audio
+from core.concurrency import OverloadedError
+from core.upstream import RetryPolicy, call_upstream
+
+# 로깅 구성은 main_api의 setup_logging(core.logging_setup)이 한 곳에서 합니다.
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# 0. 환경 변수 / OpenAI 설정
+# -----------------------------
+
+voice_router = APIRouter()
+
+# Whisper API 한 번에 보낼 수 있는 최대 크기
+WHISPER_MAX_BYTES = 25 * 1024 * 1024
+
+# 긴 녹음 분할 병렬 전사 사용 여부와 기준
+# - .wav는 헤더의 길이가 VOICE_LONG_AUDIO_SEC를 넘으면,
+#   그 외 포맷은 파일 크기가 VOICE_LONG_AUDIO_MIN_BYTES를 넘으면 분할 전사합니다.
+VOICE_LONG_AUDIO = os.environ.get("VOICE_LONG_AUDIO", "0") == "1"
+VOICE_LONG_AUDIO_SEC = float(os.environ.get("VOICE_LONG_AUDIO_SEC", 90))
+VOICE_LONG_AUDIO_MIN_BYTES = int(os.environ.get("VOICE_LONG_AUDIO_MIN_BYTES", 2 * 1024 * 1024))
+
+# 업로드 최대 크기. main_api의 UploadSizeLimitMiddleware가 스트리밍 중에 강제합니다.
+# (분할 전사를 켜면 Whisper 제한 25MB보다 큰 파일도 받을 수 있으므로 기본값을 늘립니다)
+VOICE_MAX_UPLOAD_BYTES = int(os.environ.get(
+    "VOICE_MAX_UPLOAD_BYTES",
+    (200 if VOICE_LONG_AUDIO else 25) * 1024 * 1024
+))
+
+# 🚨 주의: 전역 초기화 코드 (VOICE_KEY, client 정의 블록)는 
+# 타이밍 문제 해결을 위해 삭제되었습니다.
+# → 클라이언트는 core.openai_clients 레지스트리가 첫 호출 시점에 키를 읽어 한 번만 생성하고 재사용합니다.
+VOICE_KEY_ENV = "QUESTION_VOICE_OPENAI_KEY"
+
+# Whisper 전송 전 전처리 (모노 16kHz 다운믹스 + 앞/뒤 무음 제거 + 압축 재인코딩) 사용 여부
+VOICE_PREPROCESS = os.environ.get("VOICE_PREPROCESS", "0") == "1"
+
+# Whisper 재시도 정책 (VOICE_UPSTREAM_TIMEOUT_SEC / _MAX_ATTEMPTS / _DEADLINE_SEC로 조정)
+# 업로드가 크므로 시도당 타임아웃을 길게, 재시도는 한 번만 합니다.
+VOICE_RETRY_POLICY = RetryPolicy.from_env("VOICE", timeout_sec=120, max_attempts=2, deadline_sec=240)
+
+
+# -----------------------------
+# 2. 응답 DTO (STT 결과)
+# -----------------------------
+class SttResult(BaseModel):
+    answerText: str  # STT 결과 텍스트만 반환
+
+# -----------------------------
+# 3. 헬스체크 & 파비콘
+# -----------------------------
+@voice_router.get("/health")
+async def health():
+    return {"ok": True}
+
+@voice_router.get("/favicon.ico")
+async def favicon():
+    return Response(status_code=204)
+
+# -----------------------------
+# 3-1. STT 헬퍼
+# -----------------------------
+def _is_long_audio(fileobj, filename: str, file_size: int) -> bool:
+    if file_size > WHISPER_MAX_BYTES:
+        return True
+    duration = probe_duration_sec(fileobj, filename)
+    if duration is not None:
+        return duration > VOICE_LONG_AUDIO_SEC
+    return file_size > VOICE_LONG_AUDIO_MIN_BYTES
+
+
+async def transcribe_upload(client, fileobj, filename: str, file_size: int) -> str:
+    """
+    업로드 파일 핸들을 Whisper로 전사합니다.
+    - 긴 녹음(VOICE_LONG_AUDIO=1): 무음 경계로 분할해 동시에 전사 후 이어 붙임
+    - 그 외: (선택) 전처리 후 한 번에 전송. 전처리에 실패하면 원본 그대로 전송
+    """
+    if VOICE_LONG_AUDIO and _is_long_audio(fileobj, filename, file_size):
+        try:
+            text, n_chunks = await transcribe_long_audio(client, fileobj, filename, upstream=VOICE_KEY_ENV)
+            logger.info("분할 전사 사용: 조각 %s개", n_chunks)
+            return text
+        except AudioTooLongError:
+            raise HTTPException(status_code=413, detail=f"녹음이 너무 깁니다. (최대 {LONG_AUDIO_MAX_SEC:.0f}초)")
+        except AudioDecodeError as e:
+            logger.warning("분할 전사용 디코딩 실패 → 단일 전송: %s", e)
+            fileobj.seek(0)
+
+    upload_name, upload_file, processed = filename, fileobj, None
+    if VOICE_PREPROCESS:
+        try:
+            processed = await asyncio.to_thread(preprocess_audio, fileobj, filename)
+            upload_name, upload_file = processed.filename, processed.file
+            logger.info("오디오 전처리 완료: %s", processed.summary())
+        except AudioDecodeError as e:
+            logger.warning("오디오 전처리 실패 → 원본 전송: %s", e)
+            fileobj.seek(0)
+
+    try:
+        upload_size = processed.bytes_after if processed else file_size
+        if upload_size > WHISPER_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Whisper 업로드 제한({WHISPER_MAX_BYTES} bytes)을 초과했습니다.")
+
+        def send():
+            upload_file.seek(0)  # 재시도마다 처음부터 다시 보냅니다.
+            return client.audio.transcriptions.create(
+                model="whisper-1",
+                file=(upload_name, upload_file),  # 확장자 포함 이름을 달아줌
+                language="ko",
+            )
+
+        logger.info("Whisper API 호출 시도: 모델=whisper-1, 파일 크기=%s bytes", upload_size)
+        transcription = await call_upstream(VOICE_KEY_ENV, "voice_stt", send, VOICE_RETRY_POLICY, model="whisper-1")
+    finally:
+        if processed:
+            processed.file.close()
+
+    return getattr(transcription, "text", None) or str(transcription)
+
+
+def parse_meta(meta: str) -> dict:
+    """meta 폼 필드(JSON 문자열)를 파싱합니다. 잘못된 JSON이면 400."""
+    try:
+        return json.loads(meta)
+    except Exception as e:
+        logger.error("메타 JSON 파싱 오류: %s", e)
+        # ⚠️ (추가) 요청을 보내는 클라이언트 측에서 유효한 JSON 문자열("{"interviewId": 0}")을 보내야 합니다.
+        raise HTTPException(status_code=400, detail=f"invalid meta json: {e}")
+
+
+def validate_audio_upload(file: UploadFile) -> int:
+    """파일 누락/확장자/크기를 검사하고 파일 크기(bytes)를 반환합니다. 파일 핸들은 처음 위치로 되돌립니다."""
+    if not file or not file.filename:
+        logger.error("파일 누락 오류 발생")
+        raise HTTPException(status_code=400, detail="file missing")
+
+    lower_name = file.filename.lower()
+    if not lower_name.endswith((".m4a", ".mp3", ".wav", ".webm", ".ogg")):
+        logger.error("지원하지 않는 오디오 타입: %s", file.filename)
+        raise HTTPException(status_code=400, detail="unsupported audio type")
+
+    # ✅ 업로드 파일을 메모리로 다시 읽지 않고, 스풀된 파일 핸들을 그대로 사용
+    #    (UploadFile은 1MB를 넘으면 디스크 임시 파일로 넘어가므로 RSS가 파일 크기만큼 늘지 않습니다)
+    file_size = file.size
+    if file_size is None:
+        file.file.seek(0, os.SEEK_END)
+        file_size = file.file.tell()
+    if file_size > VOICE_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"업로드 파일이 너무 큽니다. (최대 {VOICE_MAX_UPLOAD_BYTES} bytes)")
+    file.file.seek(0)
+    return file_size
+
+
+async def transcribe_file(file: UploadFile, file_size: int) -> str:
+    """검증된 업로드 파일을 전사합니다. 키 누락/Whisper 오류는 500, 과부하(OverloadedError)는 그대로 올립니다."""
+    try:
+        # 💡 [핵심 해결] 지연 초기화: 레지스트리가 호출 시점에 키를 읽어 공유 클라이언트를 반환
+        client = get_async_client(VOICE_KEY_ENV)
+        if client is None:
+            logger.error("QUESTION_VOICE_OPENAI_KEY 환경 변수가 설정되지 않았습니다.")
+            raise HTTPException(status_code=500, detail="Whisper 호출 실패: OpenAI API Key 설정 누락")
+
+        # 스풀된 업로드 파일 핸들을 그대로 전달 (메모리로 다시 읽지 않음)
+        text = await transcribe_upload(client, file.file, file.filename, file_size)
+
+        logger.info("Whisper 호출 성공: 텍스트 길이=%s", len(text))
+        return text
+
+    except (HTTPException, OverloadedError):
+        raise
+    except OpenAIError as e:
+        # OpenAI API 호출 자체에서 발생한 오류 처리 (예: 잘못된 키, 모델)
+        # 연결 오류(APIConnectionError)에는 status_code/response가 없습니다.
+        logger.error("Whisper API 오류: %s - %s", getattr(e, "status_code", None), e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Whisper API 오류: {e}")
+    except Exception as e:
+        logger.error("Whisper 호출 실패: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Whisper 호출 실패: {e}")
+
+# -----------------------------
+# 4. 핵심 API: /analyze
+# -----------------------------
+@voice_router.post("/analyze", response_model=SttResult)
+async def analyze(
+    meta: str = Form(...),
+    file: UploadFile = File(...),
+):
+    """
+    🎧 음성 파일을 Whisper에 보내서 텍스트로 변환
+    - meta: 인터뷰 / 질문 정보 (백엔드에서 사용하는 용도)
+    - file: .m4a / .mp3 / .wav / .webm / .ogg 등
+    """
+
+    # 1) meta JSON 파싱
+    meta_obj = parse_meta(meta)
+    logger.info("STT 요청 수신: Interview ID=%s, 파일명=%s", meta_obj.get('interviewId'), file.filename)
+
+    interview_id = meta_obj.get("interviewId")
+    question_id = meta_obj.get("questionId")
+    user_id = meta_obj.get("userId")  # 없어도 됨 (null 허용)
+
+    # 2) 파일 기본 검증 (누락/확장자/크기)
+    file_size = validate_audio_upload(file)
+
+    # 3) Whisper 호출 (실제 STT)
+    text = await transcribe_file(file, file_size)
+
+    # 4) 최종 응답
     return SttResult(answerText=text)
\ No newline at end of file
@@ -0,0 +1,191 @@
+# test_audio_preprocess.py
+# ================================================================
+# core.audio_preprocess 오프라인 검증 (합성 파형)
+# - 44.1kHz 스테레오 WAV → downmix / resample / trim_silence / 전체 전처리
+# - ffmpeg가 있으면 moov atom이 파일 끝에 있는 m4a(iOS 녹음과 같은 형태)를 만들어 디코딩까지 확인합니다.
+# ================================================================
+
+import io
+import subprocess
+import wave
+
+import numpy as np
+import pytest
+
+from core.audio_preprocess import (
+    FFMPEG_BIN, TARGET_SAMPLE_RATE, AudioDecodeError, decode_audio, downmix, frame_rms_db,
+    preprocess_audio, resample, trim_silence,
+)
+
+SRC_RATE = 44100
+
+
+def tone(seconds: float, freq: float = 440.0, rate: int = SRC_RATE, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * rate)) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def silence(seconds: float, rate: int = SRC_RATE) -> np.ndarray:
+    return np.zeros(int(seconds * rate), dtype=np.float32)
+
+
+def wav_bytes(samples: np.ndarray, rate: int = SRC_RATE) -> io.BytesIO:
+    """(n,) 또는 (n, channels) float → 16-bit PCM WAV"""
+    channels = 1 if samples.ndim == 1 else samples.shape[1]
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+    buf.seek(0)
+    return buf
+
+
+def dominant_freq(samples: np.ndarray, rate: int) -> float:
+    spectrum = np.abs(np.fft.rfft(samples))
+    return float(np.argmax(spectrum)) * rate / samples.size
+
+
+def speech_like_stereo() -> np.ndarray:
+    """앞 1초 무음 + 2초 440Hz + 뒤 1.5초 무음, 오른쪽 채널은 절반 크기"""
+    left = np.concatenate([silence(1.0), tone(2.0), silence(1.5)])
+    return np.stack([left, left * 0.5], axis=1)
+
+
+# ------------------------------------------------------------------
+# 신호 처리
+# ------------------------------------------------------------------
+
+def test_downmix_averages_channels():
+    stereo = np.stack([np.ones(100, np.float32), np.zeros(100, np.float32)], axis=1)
+    mono = downmix(stereo)
+    assert mono.shape == (100,)
+    assert mono.dtype == np.float32
+    assert np.allclose(mono, 0.5)
+
+
+def test_downmix_passes_mono_through():
+    mono = tone(0.1)
+    assert downmix(mono) is mono
+
+
+def test_resample_44k_to_16k_keeps_length_and_pitch():
+    src = tone(1.0, freq=440.0)
+    out = resample(src, SRC_RATE, TARGET_SAMPLE_RATE)
+    assert out.size == TARGET_SAMPLE_RATE
+    assert dominant_freq(out, TARGET_SAMPLE_RATE) == pytest.approx(440.0, abs=2.0)
+    assert np.max(np.abs(out)) == pytest.approx(0.5, rel=0.05)
+
+
+def test_resample_drops_content_above_new_nyquist():
+    # 10kHz는 16kHz 샘플링의 나이퀴스트(8kHz)보다 높으므로 접혀 들어오지 않고 사라져야 합니다.
+    out = resample(tone(1.0, freq=10000.0), SRC_RATE, TARGET_SAMPLE_RATE)
+    assert np.max(np.abs(out)) < 0.01
+
+
+def test_resample_same_rate_and_empty():
+    src = tone(0.1, rate=TARGET_SAMPLE_RATE)
+    assert np.array_equal(resample(src, TARGET_SAMPLE_RATE, TARGET_SAMPLE_RATE), src)
+    assert resample(np.zeros(0, np.float32), SRC_RATE).size == 0
+
+
+def test_trim_silence_keeps_voiced_part_with_padding():
+    rate = TARGET_SAMPLE_RATE
+    samples = np.concatenate([silence(1.0, rate), tone(2.0, rate=rate), silence(1.5, rate)])
+    trimmed, start, end = trim_silence(samples, rate, padding_ms=200)
+    assert trimmed.size == end - start
+    # 말소리(1.0~3.0초)는 모두 남고, 경계 바깥은 여유 구간(0.2초 + 한 프레임) 이내로만 남습니다.
+    assert start <= 1.0 * rate <= start + 0.25 * rate
+    assert end - 0.25 * rate <= 3.0 * rate <= end
+
+
+def test_trim_silence_all_silence_returns_empty():
+    trimmed, start, end = trim_silence(silence(1.0, TARGET_SAMPLE_RATE), TARGET_SAMPLE_RATE)
+    assert trimmed.size == 0
+    assert (start, end) == (0, 0)
+
+
+def test_frame_rms_db_of_full_scale_sine():
+    db = frame_rms_db(tone(0.3, rate=TARGET_SAMPLE_RATE, amplitude=1.0), TARGET_SAMPLE_RATE, frame_ms=30)
+    # 사인파 RMS = 1/√2 → 약 -3dBFS (마지막 불완전 프레임 제외)
+    assert np.allclose(db[:-1], -3.01, atol=0.1)
+
+
+# ------------------------------------------------------------------
+# 전체 전처리 (WAV, ffmpeg 없이)
+# ------------------------------------------------------------------
+
+def test_preprocess_stereo_44k_wav_to_trimmed_16k_mono():
+    src = wav_bytes(speech_like_stereo())
+    result = preprocess_audio(src, "answer.wav", codec="wav")
+    try:
+        assert result.filename == "answer.wav"
+        assert result.duration_before_sec == pytest.approx(4.5, abs=0.01)
+        assert 2.0 <= result.duration_after_sec <= 2.6
+        assert result.bytes_after < result.bytes_before
+
+        with wave.open(result.file, "rb") as w:
+            assert (w.getnchannels(), w.getframerate(), w.getsampwidth()) == (1, TARGET_SAMPLE_RATE, 2)
+            out = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2").astype(np.float32) / 32768
+        # 두 채널 평균: (0.5 + 0.25) / 2
+        assert np.max(np.abs(out)) == pytest.approx(0.375, rel=0.05)
+    finally:
+        result.file.close()
+
+
+def test_preprocess_all_silence_keeps_full_length():
+    result = preprocess_audio(wav_bytes(silence(2.0)), "silent.wav", codec="wav")
+    try:
+        assert result.duration_after_sec == pytest.approx(2.0, abs=0.01)
+    finally:
+        result.file.close()
+
+
+def test_decode_audio_rejects_garbage_wav_without_ffmpeg(monkeypatch):
+    monkeypatch.setattr("core.audio_preprocess.FFMPEG_BIN", None)
+    with pytest.raises(AudioDecodeError):
+        decode_audio(io.BytesIO(b"not a wav file"), "broken.wav")
+
+
+# ------------------------------------------------------------------
+# ffmpeg 경로 (설치되어 있을 때만)
+# ------------------------------------------------------------------
+
+needs_ffmpeg = pytest.mark.skipif(not FFMPEG_BIN, reason="ffmpeg가 설치되어 있지 않습니다.")
+
+
+def encode_m4a(wav: io.BytesIO, tmp_path) -> io.BytesIO:
+    """AAC m4a. 기본 mp4 muxer는 moov atom을 파일 끝에 씁니다. (+faststart 없음)"""
+    src, dst = tmp_path / "in.wav", tmp_path / "out.m4a"
+    src.write_bytes(wav.getvalue())
+    subprocess.run([FFMPEG_BIN, "-nostdin", "-loglevel", "error", "-i", str(src), "-c:a", "aac", "-b:a", "64k", str(dst)],
+                   check=True)
+    data = dst.read_bytes()
+    # moov가 mdat 뒤에 있어야 파이프(앞에서부터 읽기)로는 디코딩할 수 없는 형태입니다.
+    assert data.find(b"moov") > data.find(b"mdat")
+    # 업로드 스풀처럼 경로가 없는 메모리 버퍼로 넘깁니다.
+    return io.BytesIO(data)
+
+
+@needs_ffmpeg
+def test_ffmpeg_decodes_m4a_with_trailing_moov(tmp_path):
+    m4a = encode_m4a(wav_bytes(speech_like_stereo()), tmp_path)
+    samples, rate = decode_audio(m4a, "answer.m4a")
+    assert rate == TARGET_SAMPLE_RATE
+    assert samples.ndim == 1
+    assert samples.size / rate == pytest.approx(4.5, abs=0.1)
+    assert dominant_freq(samples, rate) == pytest.approx(440.0, abs=5.0)
+
+
+@needs_ffmpeg
+def test_preprocess_m4a_round_trip_to_opus(tmp_path):
+    m4a = encode_m4a(wav_bytes(speech_like_stereo()), tmp_path)
+    result = preprocess_audio(m4a, "answer.m4a", codec="opus")
+    try:
+        assert result.filename == "answer.ogg"
+        assert 2.0 <= result.duration_after_sec <= 2.6
+        samples, rate = decode_audio(result.file, result.filename)
+        assert samples.size / rate == pytest.approx(result.duration_after_sec, abs=0.1)
+    finally:
+        result.file.close()
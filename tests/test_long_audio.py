@@ -0,0 +1,172 @@
+# test_long_audio.py
+# ================================================================
+# core.long_audio 검증
+# - merge_overlap / stitch: 조각 경계의 겹친 전사문 이어 붙이기
+# - plan_chunks: 무음 경계에서 자르기, 길이 상한, 겹침 구간
+# - decode_mono: 구간 단위 WAV 디코딩/리샘플 결과가 전체 한 번 리샘플과 같은지, 길이 상한
+# ================================================================
+
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from core.audio_preprocess import TARGET_SAMPLE_RATE, AudioTooLongError, decode_wav, downmix, resample
+from core.long_audio import decode_mono, merge_overlap, plan_chunks, stitch
+
+RATE = TARGET_SAMPLE_RATE
+
+
+# ------------------------------------------------------------------
+# merge_overlap / stitch
+# ------------------------------------------------------------------
+
+def test_exact_overlap_kept_once():
+    left = "저는 백엔드 개발을 맡았고 결제 모듈을"
+    right = "결제 모듈을 개선해 응답 시간을 줄였습니다."
+    assert merge_overlap(left, right) == "저는 백엔드 개발을 맡았고 결제 모듈을 개선해 응답 시간을 줄였습니다."
+
+
+def test_exact_overlap_ignores_punctuation_and_case():
+    assert merge_overlap("Spring Boot 기반으로 API를", "spring boot, 기반으로 API를 설계했습니다") == (
+        "Spring Boot 기반으로 API를 설계했습니다"
+    )
+
+
+def test_fuzzy_overlap_with_different_spacing():
+    left = "저는 백엔드 개발을 맡았고 결제모듈을 개선해"
+    right = "결제 모듈을 개선해 응답 시간을 줄였습니다."
+    assert merge_overlap(left, right) == "저는 백엔드 개발을 맡았고 결제모듈을 개선해 응답 시간을 줄였습니다."
+
+
+def test_fuzzy_overlap_ending_mid_word_prefers_right():
+    # 왼쪽 조각 끝에서 잘린 "개선했" 대신 오른쪽 조각의 "개선해"를 씁니다.
+    left = "저는 백엔드 개발을 맡았고 결제모듈을 개선했"
+    right = "결제 모듈을 개선해 응답 시간을 줄였습니다."
+    assert merge_overlap(left, right) == "저는 백엔드 개발을 맡았고 결제모듈을 개선해 응답 시간을 줄였습니다."
+
+
+def test_fuzzy_overlap_with_different_particle():
+    left = "팀원과 함께 프로젝트를 진행하면서 배포"
+    right = "프로젝트에서 진행하면서 배포 자동화를 했습니다."
+    assert merge_overlap(left, right) == "팀원과 함께 프로젝트를 진행하면서 배포 자동화를 했습니다."
+
+
+def test_coincidental_single_word_overlap():
+    # 한 단어가 우연히 같아도 그 단어 하나는 정확히 겹친 것으로 보고 한 번만 남깁니다.
+    assert merge_overlap("아 네", "네 그렇습니다") == "아 네 그렇습니다"
+    # 짧은 공통 글자(_MIN_OVERLAP_CHARS 미만)는 겹침으로 보지 않습니다.
+    assert merge_overlap("저는 협업을", "협업이 중요합니다") == "저는 협업을 협업이 중요합니다"
+
+
+def test_no_overlap_concatenates():
+    assert merge_overlap("그래서 저는 협업을", "중요하게 생각합니다.") == "그래서 저는 협업을 중요하게 생각합니다."
+
+
+def test_same_phrase_far_from_seam_is_not_treated_as_overlap():
+    # 창(_FUZZY_WINDOW_WORDS) 밖에서 같은 말이 나와도 겹침으로 보고 지우지 않습니다.
+    filler = " ".join(f"단어{i}" for i in range(15))
+    left = f"응답 시간을 줄였습니다 {filler}"
+    right = "응답 시간을 줄이는 것이 목표였습니다"
+    assert merge_overlap(left, right) == f"{left} {right}"
+
+
+def test_empty_sides():
+    assert merge_overlap("", " 첫 조각 ") == "첫 조각"
+    assert merge_overlap("첫 조각", "") == "첫 조각"
+    assert merge_overlap("", "") == ""
+
+
+def test_stitch_skips_empty_chunks():
+    assert stitch(["a b c", "", "c d", None]) == "a b c d"
+
+
+# ------------------------------------------------------------------
+# plan_chunks
+# ------------------------------------------------------------------
+
+def tone_with_gaps(seconds: float, gaps_at: list, gap_sec: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    samples = (0.3 * np.sin(2 * np.pi * 300 * t)).astype(np.float32)
+    for at in gaps_at:
+        samples[int(at * RATE):int((at + gap_sec) * RATE)] = 0
+    return samples
+
+
+def test_short_audio_is_one_chunk():
+    samples = tone_with_gaps(60, [])
+    chunks = plan_chunks(samples, RATE, target_sec=45, max_sec=60, overlap_sec=1.5)
+    assert len(chunks) == 1
+    assert (chunks[0].start, chunks[0].end) == (0, samples.size)
+
+
+def test_cuts_at_silence_within_allowed_range():
+    # 허용 구간은 [45*0.75, 60] = [33.75, 60]초. 그 안의 무음(40초)에서 잘라야 합니다.
+    samples = tone_with_gaps(100, [20, 40, 80])
+    chunks = plan_chunks(samples, RATE, target_sec=45, max_sec=60, overlap_sec=0)
+    first_cut = chunks[0].end
+    assert 40 * RATE <= first_cut <= 40.5 * RATE
+    # 두 번째 조각부터는 이어서 시작하고, 전체를 빠짐없이 덮습니다.
+    assert chunks[1].start == first_cut
+    assert chunks[-1].end == samples.size
+
+
+def test_every_chunk_within_max_length_plus_overlap():
+    samples = tone_with_gaps(400, [])  # 무음이 없으면 가장 조용한 프레임(아무 곳)에서라도 자름
+    overlap = 1.5
+    chunks = plan_chunks(samples, RATE, target_sec=45, max_sec=60, overlap_sec=overlap)
+    assert len(chunks) >= 7
+    for chunk in chunks:
+        assert chunk.end - chunk.start <= (60 + 2 * overlap) * RATE
+    assert [c.index for c in chunks] == list(range(len(chunks)))
+
+
+def test_chunks_overlap_by_overlap_sec_and_stay_in_bounds():
+    samples = tone_with_gaps(150, [40, 85, 130])
+    chunks = plan_chunks(samples, RATE, target_sec=45, max_sec=60, overlap_sec=1.5)
+    assert chunks[0].start == 0
+    assert chunks[-1].end == samples.size
+    for left, right in zip(chunks, chunks[1:]):
+        assert left.end - right.start == pytest.approx(3 * RATE, abs=1)
+
+
+def test_plan_chunks_accepts_int16_samples():
+    samples = tone_with_gaps(100, [40])
+    as_int16 = (samples * 32767).astype(np.int16)
+    assert plan_chunks(as_int16, RATE) == plan_chunks(samples, RATE)
+
+
+# ------------------------------------------------------------------
+# decode_mono (구간 단위 WAV 디코딩)
+# ------------------------------------------------------------------
+
+def stereo_wav(seconds: float, rate: int = 44100) -> io.BytesIO:
+    t = np.arange(int(seconds * rate)) / rate
+    left = 0.4 * np.sin(2 * np.pi * 440 * t) * (np.sin(2 * np.pi * 0.1 * t) > 0)
+    data = np.stack([left, left * 0.5], axis=1)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes((data * 32767).astype("<i2").tobytes())
+    buf.seek(0)
+    return buf
+
+
+def test_windowed_decode_matches_full_resample():
+    buf = stereo_wav(70)  # 30초 구간 3개
+    windowed = decode_mono(buf, "long.wav")
+    buf.seek(0)
+    samples, rate = decode_wav(buf)
+    reference = resample(downmix(samples), rate, RATE)
+
+    assert windowed.dtype == np.int16
+    assert windowed.size == reference.size
+    assert np.max(np.abs(windowed / 32768 - reference)) < 0.01
+
+
+def test_decode_mono_rejects_too_long_audio():
+    with pytest.raises(AudioTooLongError):
+        decode_mono(stereo_wav(5), "long.wav", max_sec=3)
@@ -0,0 +1,80 @@
+# test_sqlite_store.py
+# ================================================================
+# core.sqlite_store / core.metrics.EventCounters 검증
+# - connect: 정상 종료 시 commit, 예외 시 rollback (기본 / BEGIN IMMEDIATE 모두)
+# - init_schema: WAL 모드 전환, 여러 번 불러도 그대로
+# - EventCounters: stats()용 dict 값과 component_events_total 값이 함께 오르는지
+# ================================================================
+
+import sqlite3
+
+import pytest
+from prometheus_client import REGISTRY
+
+from core.metrics import EventCounters
+from core.sqlite_store import connect, init_schema
+
+SCHEMA = "CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v TEXT NOT NULL)"
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    init_schema(path, SCHEMA)
+    return path
+
+
+def rows(path):
+    with connect(path) as conn:
+        return conn.execute("SELECT k, v FROM kv ORDER BY k").fetchall()
+
+
+def test_init_schema_enables_wal_and_is_idempotent(path):
+    init_schema(path, SCHEMA)
+    with connect(path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+@pytest.mark.parametrize("immediate", [False, True])
+def test_connect_commits_or_rolls_back(path, immediate):
+    with connect(path, immediate=immediate) as conn:
+        conn.execute("INSERT INTO kv VALUES ('a', '1')")
+    with pytest.raises(RuntimeError):
+        with connect(path, immediate=immediate) as conn:
+            conn.execute("INSERT INTO kv VALUES ('b', '2')")
+            raise RuntimeError("중간 실패")
+    assert rows(path) == [("a", "1")]
+
+
+def test_immediate_holds_write_lock(path):
+    with connect(path, immediate=True):
+        other = sqlite3.connect(path, timeout=0)
+        try:
+            with pytest.raises(sqlite3.OperationalError):
+                other.execute("BEGIN IMMEDIATE")
+        finally:
+            other.close()
+
+
+def test_row_factory(path):
+    with connect(path) as conn:
+        conn.execute("INSERT INTO kv VALUES ('a', '1')")
+    with connect(path, row_factory=sqlite3.Row) as conn:
+        row = conn.execute("SELECT k, v FROM kv").fetchone()
+    assert row["v"] == "1"
+
+
+def test_event_counters_mirror_to_prometheus():
+    def exported(event):
+        return REGISTRY.get_sample_value(
+            "component_events_total", {"component": "test", "name": "t1", "event": event},
+        ) or 0.0
+
+    counters = EventCounters("test", ("hits", "misses"), name="t1")
+    before = exported("hits")
+    counters["hits"] += 1
+    counters["hits"] += 2
+    assert counters == {"hits": 3, "misses": 0}
+    assert {**counters, "ratio": 1.0}["hits"] == 3
+    assert exported("hits") - before == 3
+    assert exported("misses") == 0
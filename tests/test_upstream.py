@@ -0,0 +1,258 @@
+# test_upstream.py
+# ================================================================
+# core.upstream 재시도 / 타임아웃 / 서킷 브레이커 검증
+# - 가짜 OpenAI 서버(benchmarks.fake_openai_server)를 로컬 스레드로 띄우고 장애를 주입합니다.
+#   (429 + Retry-After, 5xx, 응답 지연) → 시도 횟수, 대기 시간, 브레이커 상태 전이를 확인합니다.
+# - 브레이커 업스트림 이름은 테스트마다 달리해 모듈 전역 브레이커 상태가 섞이지 않게 합니다.
+# ================================================================
+
+import time
+import socket
+import asyncio
+
+import openai
+import pytest
+
+from benchmarks import fake_openai_server as fake
+from core import upstream
+from core.upstream import (
+    BREAKER_CLOSED, BREAKER_HALF_OPEN, BREAKER_OPEN,
+    CircuitBreaker, CircuitOpenError, RetryPolicy, UpstreamTimeoutError, call_upstream, get_breaker,
+)
+
+FAST = RetryPolicy(timeout_sec=2.0, max_attempts=3, base_delay_sec=0.01, max_delay_sec=0.05)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    port = _free_port()
+    server = fake.start_in_thread(port, latency=0.0)
+    yield f"http://127.0.0.1:{port}/v1"
+    server.should_exit = True
+
+
+@pytest.fixture(autouse=True)
+def reset_faults():
+    fake.configure_faults(rate=0.0, statuses=[500, 503], retry_after=None, hang_rate=0.0, hang_sec=30, max_rps=0)
+    yield
+    fake.configure_faults(rate=0.0, hang_rate=0.0)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def chat(base_url: str, name: str, policy: RetryPolicy = FAST, before_send=None):
+    """가짜 서버에 chat.completions 한 건을 call_upstream으로 보냅니다. (SDK 재시도는 끔)"""
+    client = openai.AsyncOpenAI(api_key="sk-fake", base_url=base_url, max_retries=0)
+    try:
+        def factory():
+            if before_send:
+                before_send()
+            return client.chat.completions.create(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "안녕하세요"}],
+            )
+        return await call_upstream(name, "test_upstream", factory, policy, model="gpt-4o-mini")
+    finally:
+        await client.close()
+
+
+def requests_sent(before: int) -> int:
+    return fake.FAULT_COUNTS["requests"] - before
+
+
+# ------------------------------------------------------------------
+# 재시도 (가짜 서버 장애 주입)
+# ------------------------------------------------------------------
+
+def test_success_without_retry(base_url):
+    before = fake.FAULT_COUNTS["requests"]
+    response = run(chat(base_url, "test-ok"))
+    assert response.choices[0].message.content
+    assert requests_sent(before) == 1
+    assert get_breaker("test-ok").state == BREAKER_CLOSED
+
+
+def test_5xx_retried_up_to_max_attempts(base_url):
+    fake.configure_faults(rate=1.0, statuses=[503])
+    before = fake.FAULT_COUNTS["requests"]
+    with pytest.raises(openai.InternalServerError):
+        run(chat(base_url, "test-5xx"))
+    assert requests_sent(before) == FAST.max_attempts
+    stats = get_breaker("test-5xx").stats()
+    assert stats["failures"] == FAST.max_attempts
+
+
+def test_transient_5xx_then_success(base_url):
+    fake.configure_faults(rate=1.0, statuses=[500])
+    attempts = []
+
+    def heal_after_first():
+        attempts.append(1)
+        if len(attempts) == 2:
+            fake.configure_faults(rate=0.0)
+
+    before = fake.FAULT_COUNTS["requests"]
+    run(chat(base_url, "test-transient", before_send=heal_after_first))
+    assert requests_sent(before) == 2
+
+
+def test_429_waits_for_retry_after_and_does_not_trip_breaker(base_url):
+    fake.configure_faults(rate=1.0, statuses=[429], retry_after="0.3")
+    breaker = CircuitBreaker("test-429", min_calls=1, failure_ratio=0.1)
+    upstream._breakers["test-429"] = breaker
+
+    before = fake.FAULT_COUNTS["requests"]
+    started = time.monotonic()
+    with pytest.raises(openai.RateLimitError):
+        run(chat(base_url, "test-429"))
+    elapsed = time.monotonic() - started
+
+    assert requests_sent(before) == FAST.max_attempts
+    # 재시도 두 번 모두 Retry-After(0.3초) 이상 기다립니다. (백오프 최대값 0.05초보다 김)
+    assert elapsed >= 2 * 0.3
+    # 429는 제공자가 살아 있다는 신호이므로 브레이커 실패로 세지 않습니다.
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.stats()["failures"] == 0
+
+
+def test_non_retryable_status_is_raised_immediately(base_url):
+    fake.configure_faults(rate=1.0, statuses=[400])
+    before = fake.FAULT_COUNTS["requests"]
+    with pytest.raises(openai.BadRequestError):
+        run(chat(base_url, "test-400"))
+    assert requests_sent(before) == 1
+    # 응답을 받았으므로 브레이커에는 성공으로 기록됩니다.
+    assert get_breaker("test-400").stats()["successes"] == 1
+
+
+def test_timeout_retried_then_upstream_timeout_error(base_url):
+    fake.configure_faults(hang_rate=1.0, hang_sec=1.0)
+    policy = RetryPolicy(timeout_sec=0.2, max_attempts=2, base_delay_sec=0.01, max_delay_sec=0.01)
+    before = fake.FAULT_COUNTS["requests"]
+    started = time.monotonic()
+    with pytest.raises(UpstreamTimeoutError):
+        run(chat(base_url, "test-timeout", policy))
+    assert requests_sent(before) == 2
+    # 시도마다 timeout_sec에서 끊기므로 서버 지연(1초)만큼 기다리지 않습니다.
+    assert time.monotonic() - started < 1.0
+
+
+def test_deadline_stops_retries_early(base_url):
+    fake.configure_faults(rate=1.0, statuses=[503], retry_after="0.5")
+    policy = RetryPolicy(timeout_sec=2.0, max_attempts=5, base_delay_sec=0.01, max_delay_sec=0.01, deadline_sec=0.3)
+    before = fake.FAULT_COUNTS["requests"]
+    with pytest.raises(openai.InternalServerError):
+        run(chat(base_url, "test-deadline", policy))
+    # 다음 시도까지 Retry-After 0.5초를 기다리면 전체 한도(0.3초)를 넘으므로 한 번만 보냅니다.
+    assert requests_sent(before) == 1
+
+
+# ------------------------------------------------------------------
+# 백오프
+# ------------------------------------------------------------------
+
+@pytest.mark.parametrize("attempt", [1, 2, 3, 4, 5, 8])
+def test_backoff_within_full_jitter_bounds(attempt):
+    policy = RetryPolicy(base_delay_sec=0.5, max_delay_sec=4.0)
+    cap = min(policy.max_delay_sec, policy.base_delay_sec * 2 ** (attempt - 1))
+    delays = [policy.backoff(attempt) for _ in range(500)]
+    assert all(0 <= d <= cap for d in delays)
+    # full jitter: 상한 근처까지 고르게 퍼집니다.
+    assert max(delays) > cap * 0.8
+
+
+def test_retry_policy_from_env(monkeypatch):
+    monkeypatch.setenv("TESTX_UPSTREAM_TIMEOUT_SEC", "7")
+    monkeypatch.setenv("UPSTREAM_MAX_ATTEMPTS", "0")
+    policy = RetryPolicy.from_env("TESTX", timeout_sec=20, max_attempts=3, deadline_sec=30)
+    assert policy.timeout_sec == 7
+    assert policy.max_attempts == 1  # 최소 한 번은 시도
+    assert policy.deadline_sec == 30
+
+
+# ------------------------------------------------------------------
+# 서킷 브레이커
+# ------------------------------------------------------------------
+
+def test_breaker_open_half_open_close_transitions():
+    breaker = CircuitBreaker("test-transitions", window_sec=10, min_calls=4, failure_ratio=0.5, open_sec=0.1)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_success()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == BREAKER_CLOSED  # 최소 호출 수 전에는 열리지 않음
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == BREAKER_OPEN  # 4건 중 2건 실패 (비율 0.5)
+
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after_sec >= 1
+
+    time.sleep(0.12)
+    breaker.before_call()  # open_sec이 지나면 시험 호출 한 건만 허용
+    assert breaker.state == BREAKER_HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.stats()["window_calls"] == 0  # 장애 구간 기록은 비움
+    breaker.before_call()
+
+
+def test_breaker_half_open_failure_reopens():
+    breaker = CircuitBreaker("test-reopen", window_sec=10, min_calls=1, failure_ratio=0.5, open_sec=0.05)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == BREAKER_OPEN
+
+    time.sleep(0.06)
+    breaker.before_call()
+    assert breaker.state == BREAKER_HALF_OPEN
+    breaker.record_failure()
+    assert breaker.state == BREAKER_OPEN
+    assert breaker.stats()["opened"] == 2
+
+
+def test_breaker_release_frees_probe_slot():
+    breaker = CircuitBreaker("test-release", window_sec=10, min_calls=1, failure_ratio=0.5, open_sec=0.01)
+    breaker.before_call()
+    breaker.record_failure()
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.release()  # 취소/429로 판정 없이 끝난 시험 호출
+    breaker.before_call()
+    assert breaker.state == BREAKER_HALF_OPEN
+
+
+def test_outage_opens_breaker_then_rejects_without_calling(base_url):
+    upstream._breakers["test-outage"] = CircuitBreaker(
+        "test-outage", window_sec=10, min_calls=3, failure_ratio=0.5, open_sec=0.3,
+    )
+    fake.configure_faults(rate=1.0, statuses=[503])
+    with pytest.raises(openai.InternalServerError):
+        run(chat(base_url, "test-outage"))
+    assert get_breaker("test-outage").state == BREAKER_OPEN
+
+    # 열린 동안에는 업스트림(과 속도 제한 버킷)에 가지 않고 바로 503
+    before = fake.FAULT_COUNTS["requests"]
+    with pytest.raises(CircuitOpenError):
+        run(chat(base_url, "test-outage"))
+    assert requests_sent(before) == 0
+
+    # 장애가 풀리고 open_sec이 지나면 시험 호출 한 건으로 닫힙니다.
+    fake.configure_faults(rate=0.0)
+    time.sleep(0.35)
+    run(chat(base_url, "test-outage"))
+    assert get_breaker("test-outage").state == BREAKER_CLOSED
+    assert requests_sent(before) == 1